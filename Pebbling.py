@@ -1,16 +1,25 @@
 import streamlit as st
-import os
 import json
 import datetime
 import pandas as pd
-import requests
-from bs4 import BeautifulSoup
-import re
-import smtplib
-from email.mime.text import MIMEText
-from email.mime.multipart import MIMEMultipart
 from pathlib import Path
-from supabase import create_client, Client
+from pebbling.client import create_supabase_client
+from pebbling.cache import CardCache
+from pebbling.cards import daily_card_row, tiqiao_card_row
+from pebbling.mirror import CardMirror, MirroredRepository, DEFAULT_MIRROR_PATH, DEFAULT_SYNC_SECONDS, DEFAULT_RECONCILE_SECONDS
+from pebbling.importer import (
+    normalise_daily_frame, normalise_tiqiao_frame, plan_daily_import, plan_tiqiao_import,
+    find_existing_by_hash, write_import_plan, upload_file_id, DEFAULT_BATCH_SIZE,
+)
+from pebbling.mailer import sender_from_config, DEFAULT_CARDS_PER_MAIL
+from pebbling.jobs import (
+    PushJobRunner, create_push_job, get_job, list_jobs, is_resumable, ACTIVE_STATUSES, DONE, FAILED,
+    CARD_RENDERERS, PUSH_COLUMNS, INCREMENTAL_MODE, create_incremental_push_jobs,
+)
+from pebbling.deliveries import INCREMENTAL_STATUSES
+from pebbling.scraper import PageFetcher
+from pebbling.sources import SOURCES, fill_recent_days
+from pebbling.stats import daily_counts, push_counts
 
 # --- Configuration ---
 st.set_page_config(layout="wide")
@@ -51,6 +60,16 @@ except Exception as e: # 捕获其他潜在错误
     st.error(f"详细信息: {type(e).__name__} - {e}")
     st.stop()
 
+# --- Mail Senders ---
+# 每个发件账号在进程内共用一个 SmtpSender，已登录的连接跨 rerun 复用；
+# secrets.toml 的 [smtp] 段可改 host / port / ssl，指向本地 SMTP 替身调试
+SMTP_CONFIG = dict(st.secrets.get("smtp", {}))
+MAIL_CARDS_PER_MAIL = int(SMTP_CONFIG.get("cards_per_mail", DEFAULT_CARDS_PER_MAIL))
+
+@st.cache_resource
+def get_mail_sender(sender, password, smtp_config):
+    return sender_from_config(sender, password, smtp_config)
+
 # --- Secrets 加载成功后，代码继续向下执行 ---
 # ================================================
 # SECTION 1: DAILY WORD CARD (每日词卡)
@@ -58,13 +77,79 @@ except Exception as e: # 捕获其他潜在错误
 
 SUPABASE_URL = st.secrets["supabase"]["url"]
 SUPABASE_KEY = st.secrets["supabase"]["key"]
-supabase: Client = create_client(SUPABASE_URL, SUPABASE_KEY)
+
+@st.cache_resource
+def get_supabase_client(url, key):
+    return create_supabase_client(url, key)
+
+supabase = get_supabase_client(SUPABASE_URL, SUPABASE_KEY)
+
+# --- Card Cache (跨 rerun、跨会话共享) ---
+@st.cache_resource
+def get_card_cache(ttl_seconds):
+    # cache_resource 让同一个 CardCache 实例在所有 rerun 和浏览器会话间共享
+    return CardCache(ttl_seconds)
+
+CARD_CACHE_TTL_SECONDS = float(st.secrets.get("cache", {}).get("ttl_seconds", 60))
+card_cache = get_card_cache(CARD_CACHE_TTL_SECONDS)
+
+# --- Local Mirror (列表读取走本地 SQLite，写入穿透到 Supabase) ---
+# 后台线程定时增量同步；连不上 Supabase 时照常显示本地数据，但不能修改。
+# secrets.toml 的 [mirror] 段可改 path / sync_seconds / reconcile_seconds
+MIRROR_CONFIG = st.secrets.get("mirror", {})
+
+@st.cache_resource
+def get_card_mirror(path, sync_seconds, reconcile_seconds):
+    mirror = CardMirror(path, on_change=card_cache.invalidate)
+    # 启动时完整比对一次；第一次就连不上时用 JSON 快照垫底，后台线程会继续重试
+    if not mirror.refresh(supabase, reconcile=True):
+        for table in mirror.tables:
+            mirror.seed_from_snapshots(table)
+    mirror.start(supabase, sync_seconds, reconcile_seconds)
+    return mirror
+
+card_mirror = get_card_mirror(
+    MIRROR_CONFIG.get("path", str(DEFAULT_MIRROR_PATH)),
+    float(MIRROR_CONFIG.get("sync_seconds", DEFAULT_SYNC_SECONDS)),
+    float(MIRROR_CONFIG.get("reconcile_seconds", DEFAULT_RECONCILE_SECONDS)),
+)
+# 数据读写都走仓库对象（pebbling.cards / pebbling.mirror），维护脚本用的是同一套代码
+card_repos = {table: MirroredRepository(supabase, table, card_mirror) for table in card_mirror.tables}
+
+# --- Card Repository (每次 rerun 共享一份快照) ---
+# Streamlit 每次 rerun 都会从头执行脚本，这个字典也随之重建，
+# 因此同一次 rerun 内的所有标签页、推送按钮和编辑回调共用同一份数据；
+# 快照缺失时先查进程级缓存，缓存也未命中才读本地镜像。
+# 写入后需调用 invalidate_card_snapshot，它会先增量同步镜像，再让缓存失效。
+# key 与 CardCache 一致：元组第一个元素是表名，其余是查询参数。
+_card_snapshots = {}
+
+def get_card_snapshot(key, fetch):
+    """返回本次 rerun 中 key 对应的快照，首次访问时经由缓存调用 fetch 拉取。"""
+    if key not in _card_snapshots:
+        _card_snapshots[key] = card_cache.get(key, fetch)
+    return _card_snapshots[key]
+
+def invalidate_card_snapshot(table=None):
+    """同步镜像并丢弃快照和缓存，下次读取时重新拉取；table 为 None 时比对并清空全部。"""
+    if table is None:
+        card_mirror.refresh(supabase, reconcile=True)
+    else:
+        # 导入、抓取之类绕过仓库对象的写入也靠这次增量同步进入镜像
+        card_mirror.refresh(supabase, [table])
+    card_cache.invalidate(table)
+    if table is None:
+        _card_snapshots.clear()
+    else:
+        for key in [k for k in _card_snapshots if k[0] == table]:
+            del _card_snapshots[key]
 
 # --- Daily Card Session State ---
 # Top of Script - Revised Initialization
 if "daily_grabbed" not in st.session_state: st.session_state.daily_grabbed = False
 if "daily_edit_index" not in st.session_state: st.session_state.daily_edit_index = None
 if "daily_editing_filename" not in st.session_state: st.session_state.daily_editing_filename = None
+if "daily_edit_card_info" not in st.session_state: st.session_state.daily_edit_card_info = None
 # Add deferred reset flag initialization
 if "should_reset_daily_form" not in st.session_state:
     st.session_state.should_reset_daily_form = False
@@ -78,11 +163,7 @@ for key in daily_form_fields:
     if key not in st.session_state:
         st.session_state[key] = "" if key != "daily_status" else "未审阅"
 # --- Daily Card Utilities ---
-def load_daily_cards():
-    # 按ID降序排列，获取最新的记录
-    res = supabase.table("daily_cards").select("*").order("id", desc=True).execute()
-    cards = res.data if res.data else []
-    
+def _fill_daily_filenames(cards):
     # 自动补全 _filename 字段（如果有 filename 字段则用之，否则用 id/date 拼接）
     for card in cards:
         if "_filename" not in card or not card["_filename"]:
@@ -95,12 +176,15 @@ def load_daily_cards():
 def delete_daily_card(card_id):
     msg = f"尝试删除 id: {card_id} 类型: {str(type(card_id))}"
     st.session_state['last_delete_debug'] = msg
-    res = supabase.table("daily_cards").delete().eq("id", card_id).execute()
-    st.session_state['last_delete_result'] = str(res)
-    if hasattr(res, "error") and res.error:
-        st.session_state['last_delete_error'] = f"Supabase 删除失败: {res.error}"
+    try:
+        deleted = card_repos["daily_cards"].delete(card_id)
+    except RuntimeError as e:
+        st.session_state['last_delete_error'] = str(e)
         st.session_state['last_delete_success'] = False
         return False
+    finally:
+        invalidate_card_snapshot("daily_cards")
+    st.session_state['last_delete_result'] = str(deleted)
     st.session_state['last_delete_error'] = ''
     st.session_state['last_delete_success'] = True
     return True
@@ -108,79 +192,28 @@ def delete_daily_card(card_id):
 # --- 用这个完整的新函数替换掉你原来的 save_daily_card 函数 ---
 def save_daily_card(card_data, is_editing=False, original_card_info=None):
     """保存新的或更新现有的每日词卡。"""
-    if is_editing and original_card_info:
-        card_id = original_card_info.get("id")
-        update_data = {
-            "title": card_data.get("title", ""),
-            "status": card_data.get("status", "未审阅"),
-            "date": card_data.get("date", original_card_info.get("date")),
-            "data": card_data.get("data", {})
-        }
-        res = supabase.table("daily_cards").update(update_data).eq("id", card_id).execute()
-        if hasattr(res, "error") and res.error:
-            st.error(f"Supabase 更新失败: {res.error}")
-            return False
-        return True
-    else:
-        insert_data = {
-            "title": card_data.get("title", ""),
-            "status": card_data.get("status", "未审阅"),
-            "date": card_data.get("date", datetime.date.today().isoformat()),
-            "data": card_data.get("data", {})
-        }
-        res = supabase.table("daily_cards").insert(insert_data).execute()
-        if hasattr(res, "error") and res.error:
-            st.error(f"Supabase 插入失败: {res.error}")
-            return False
-        return True
-
-def safe_strip(value):
-    return str(value).strip() if value is not None else ""
-def remove_daily_duplicates():
-    """查找并删除重复的每日词卡 (基于标题，保留第一个)"""
-    cards = load_daily_cards() # 加载每日词卡数据
-    seen_titles = set()        # 用来存储已经见过的标题 (小写)
-    deleted_count = 0
-    ids_to_keep = set()        # 存储需要保留的卡片 ID
+    repo = card_repos["daily_cards"]
+    try:
+        if is_editing and original_card_info:
+            repo.update(original_card_info.get("id"), daily_card_row(card_data, original_card_info))
+        else:
+            repo.insert(daily_card_row(card_data))
+    except RuntimeError as e:
+        st.error(str(e))
+        return False
+    finally:
+        invalidate_card_snapshot("daily_cards")
+    return True
 
-    # 第一遍：找出每个不重复标题第一次出现的卡片ID
-    for card in cards:
-        # 获取标题，进行清理（去除首尾空格）并转为小写，用于不区分大小写的比较
-        title = safe_strip(card.get('title', '')).lower()
-        card_id = card.get("id")
-
-        # 跳过没有标题或ID的无效卡片数据
-        if not title or card_id is None:
-            st.warning(f"跳过处理每日词卡：缺少标题或ID。卡片数据: {str(card)[:100]}...")
-            continue
-
-        # 如果这个标题是第一次见到，就记录下它的ID，表示要保留这个卡片
-        if title not in seen_titles:
-            seen_titles.add(title)
-            ids_to_keep.add(card_id)
-        # 如果标题已经见过，则这张卡片是重复的，不需要加入ids_to_keep
-
-    # 第二遍：删除那些ID不在保留列表中的卡片文件
-    for card in cards:
-         card_id = card.get("id")
-         # 检查卡片是否有ID，并且这个ID不在要保留的ID集合中
-         if card_id is not None and card_id not in ids_to_keep:
-            filename = card.get("_filename") # 获取要删除的文件名
-            if filename:
-                # 构造完整文件路径，注意使用 DAILY_WORD_PATH
-                filepath = os.path.join(DAILY_WORD_PATH, filename)
-                if os.path.exists(filepath):
-                    try:
-                        os.remove(filepath) # 删除文件
-                        deleted_count += 1
-                    except Exception as e:
-                        # 如果删除失败，显示警告
-                        st.warning(f"删除重复每日词卡文件 {filename} 失败: {e}")
-            else:
-                # 如果找不到文件名，也显示警告
-                st.warning(f"无法删除重复每日词卡 (ID: {card_id})，因为缺少 _filename 信息。")
+# Excel 批量导入每块写入的行数，可在 secrets.toml 的 [import] batch_size 中调整
+IMPORT_BATCH_SIZE = int(st.secrets.get("import", {}).get("batch_size", DEFAULT_BATCH_SIZE))
 
-    return deleted_count # 返回删除的卡片数量
+def remove_daily_duplicates(dry_run=False):
+    """查找并删除 Supabase 中重复的每日词卡 (基于标题的 content_hash，每组保留 id 最小的一张)"""
+    report = card_repos["daily_cards"].remove_duplicates(dry_run=dry_run)
+    if not dry_run:
+        invalidate_card_snapshot("daily_cards")
+    return report
 # --- 新函数结束 ---
 
 # --- Daily Card Callbacks ---
@@ -196,6 +229,12 @@ def daily_start_edit(idx, all_cards):
         st.session_state.daily_source = card.get("data", {}).get("source") or card.get("source", "")
         st.session_state.daily_status = card.get("status", "未审阅")
         st.session_state.daily_editing_filename = card.get("_filename")
+        # 记录原卡片信息，提交时直接使用，不依赖列表索引（分页后索引只在当前窗口内有效）
+        st.session_state.daily_edit_card_info = {
+            "id": card.get("id"),
+            "date": card.get("date"),
+            "filename": card.get("_filename")
+        }
     else:
         st.error("无效的每日词卡编辑索引。")
         daily_cancel_edit()
@@ -204,6 +243,7 @@ def daily_start_edit(idx, all_cards):
 def daily_cancel_edit():
     st.session_state.daily_edit_index = None
     st.session_state.daily_editing_filename = None
+    st.session_state.daily_edit_card_info = None
     st.session_state.daily_grabbed = False
     st.session_state.should_reset_daily_form = True
 # ^^^^ --- 替换结束 --- ^^^^
@@ -211,47 +251,22 @@ def daily_clear_form_state():
     daily_cancel_edit()
 
 # --- Daily Card Scraper ---
+# 抓取器在进程内共用：连接池、磁盘缓存和限速器跨 rerun 复用
+@st.cache_resource
+def get_page_fetcher():
+    return PageFetcher()
+
 def scrape_merriam_webster():
     try:
-        url = "https://www.merriam-webster.com/word-of-the-day"
-        headers = {"User-Agent": "Mozilla/5.0"}
-        res = requests.get(url, headers=headers, timeout=10)
-        soup = BeautifulSoup(res.text, 'html.parser')
-
-        # 词条：优先 .word-and-pronunciation h1，其次 <title>
-        w = ""
-        tag = soup.select_one(".word-and-pronunciation h1")
-        if tag:
-            w = tag.text.strip()
-        else:
-            title_tag = soup.find('title')
-            if title_tag:
-                m = re.search(r"Word of the Day: ([^|]+)", title_tag.text)
-                w = m.group(1).strip() if m else ""
-
-        # 音标
-        phon = soup.select_one('.word-syllables')
-        p = phon.text.strip() if phon else ""
-
-        # 释义
-        defp = soup.select_one('.wod-definition-container > p')
-        d = defp.text.strip() if defp else ""
-
-        # 例句
-        e = ""
-        for ptag in soup.find_all('p'):
-            t = ptag.get_text().strip()
-            if t.startswith('//'):
-                e = t.lstrip('/').strip()
-                break
+        word = SOURCES["merriam_webster"].fetch(get_page_fetcher(), datetime.date.today())
 
         # 写入 session_state
-        st.session_state.daily_title = w
-        st.session_state.daily_phonetic = p
-        st.session_state.daily_definition = d
-        st.session_state.daily_example = e
+        st.session_state.daily_title = word["title"]
+        st.session_state.daily_phonetic = word["phonetic"]
+        st.session_state.daily_definition = word["definition"]
+        st.session_state.daily_example = word["example"]
         st.session_state.daily_note = ""
-        st.session_state.daily_source = url
+        st.session_state.daily_source = word["source"]
         st.session_state.daily_status = "未审阅"
         st.session_state.daily_grabbed = True
 
@@ -266,16 +281,36 @@ st.sidebar.header("📖 每日词卡")
 # --- 在每日词卡的侧边栏部分添加这个 Expander ---
 
 # Daily Card Duplicate Removal Tool
-with st.sidebar.expander("🧹 清理重复每日词卡"):
-    # 创建按钮，注意 key 和 提示信息 都要区分于推敲卡片的按钮
-    if st.button("🚫 删除重复项 (每日)", key="daily_remove_duplicates_button"):
-        deleted_count = remove_daily_duplicates() # 调用刚刚添加的新函数
+def render_duplicate_cleanup(prefix, label, remove, delete_button_label):
+    """重复项清理工具：先预览（只扫描不删除），再一键删除；结果跨 rerun 保留在 session_state。"""
+    preview_key = f"{prefix}_dedupe_preview"
+    result_key = f"{prefix}_dedupe_deleted"
+    if result_key in st.session_state:
+        deleted_count = st.session_state.pop(result_key)
         if deleted_count > 0:
-            st.success(f"成功删除 {deleted_count} 条重复每日词卡！") # 修改提示信息
+            st.success(f"成功删除 {deleted_count} 条重复{label}！")
+        else:
+            st.info(f"未找到重复的{label}。")
+    if st.button("🔍 预览重复项", key=f"{prefix}_preview_duplicates_button"):
+        st.session_state[preview_key] = remove(dry_run=True)
+    preview = st.session_state.get(preview_key)
+    if preview is not None:
+        if preview["duplicates"]:
+            st.info(f"发现 {preview['groups']} 组重复，共 {preview['duplicates']} 条将被删除（每组保留 id 最小的一张）。")
+            for _, ids in preview["largest"]:
+                st.caption(f"保留 ID {ids[0]}，删除 ID {', '.join(str(i) for i in ids[1:])}")
         else:
-            st.info("未找到重复的每日词卡。") # 修改提示信息
+            st.info(f"未找到重复的{label}。")
+    if st.button(delete_button_label, key=f"{prefix}_remove_duplicates_button"):
+        report = remove(dry_run=False)
+        st.session_state.pop(preview_key, None)
+        st.session_state[result_key] = report["deleted"]
         # 清理后刷新界面
         st.rerun()
+
+with st.sidebar.expander("🧹 清理重复每日词卡"):
+    # 注意 key 和 提示信息 都要区分于推敲卡片的按钮
+    render_duplicate_cleanup("daily", "每日词卡", remove_daily_duplicates, "🚫 删除重复项 (每日)")
 # --- 添加侧边栏代码结束 ---
 if st.sidebar.button("📗 抓取 Merriam", key="daily_scrape_button"):
     if scrape_merriam_webster():
@@ -283,6 +318,19 @@ if st.sidebar.button("📗 抓取 Merriam", key="daily_scrape_button"):
         st.sidebar.success("抓取成功！")
     st.rerun()
 
+if st.sidebar.button("📅 填充最近 7 天词卡", key="daily_fill_week_button",
+                     help="并发抓取所有词源最近 7 天的每日一词，去掉已有词条后一次导入"):
+    with st.spinner("正在抓取各词源…"):
+        try:
+            new_cards, fetch_errors = fill_recent_days(supabase, get_page_fetcher(), days=7)
+        except Exception as e:
+            st.sidebar.error(f"填充失败：{e}")
+        else:
+            invalidate_card_snapshot("daily_cards")
+            st.sidebar.success(f"新增 {len(new_cards)} 条每日词卡。")
+            for name, date, error in fetch_errors:
+                st.sidebar.caption(f"⚠️ {SOURCES[name].label} {date}: {error}")
+
 # Daily Card Form
 daily_is_editing = st.session_state.daily_edit_index is not None
 daily_form_header = "编辑每日词卡" if daily_is_editing else "新增每日词卡"
@@ -324,18 +372,8 @@ if daily_submitted:
     # 移除调试信息
     
     # 修正：编辑时传递原卡片信息，确保id正确
-    original_card_info = None
-    if daily_is_editing and st.session_state.daily_edit_index is not None:
-        all_cards = load_daily_cards()
-        idx = st.session_state.daily_edit_index
-        if 0 <= idx < len(all_cards):
-            card = all_cards[idx]
-            original_card_info = {
-                "id": card.get("id"),
-                "date": card.get("date"),
-                "filename": card.get("_filename")
-            }
-    
+    original_card_info = st.session_state.daily_edit_card_info if daily_is_editing else None
+
     save_result = save_daily_card(card_data, is_editing=daily_is_editing, original_card_info=original_card_info)
     
     if save_result:
@@ -354,44 +392,23 @@ if daily_is_editing:
 # Daily Card Excel Upload
 st.sidebar.subheader("📂 批量上传 (每日词卡)")
 daily_uploaded_file = st.sidebar.file_uploader("上传 Excel 文件", type=["xlsx"], key="daily_upload_file")
-if daily_uploaded_file:
+# 上传控件在文件移除前会一直保留文件，每次 rerun 都会走到这里；按 file_id 只导入一次
+if daily_uploaded_file and st.session_state.get("daily_imported_file_id") != upload_file_id(daily_uploaded_file):
     try:
         df = pd.read_excel(daily_uploaded_file, na_filter=False)
-        existing_cards = load_daily_cards()
-        title_to_card = {c.get("title", "").strip().lower(): c for c in existing_cards}
-        imported_count = 0
-        updated_count = 0
-        for idx, row in df.iterrows():
-            title = str(row.get("Word", "")).strip()
-            if not title:
-                continue
-            key = title.lower()
-            card_data = {
-                "title": title,
-                "data": {
-                    "音标": str(row.get("Phonetic", "")).strip(),
-                    "释义": str(row.get("Definition", "")).strip(),
-                    "例句": str(row.get("Example", "")).strip(),
-                    "备注": str(row.get("Note", "")).strip(),
-                    "source": str(row.get("Source URL", "")).strip()
-                }
-            }
-            if key in title_to_card:
-                # 只更新内容，不覆盖status
-                original = title_to_card[key]
-                card_data["status"] = original.get("status", "未审阅")
-                save_daily_card(card_data, is_editing=True, original_card_info={
-                    "id": original.get("id"),
-                    "date": original.get("date"),
-                    "filename": original.get("_filename")
-                })
-                updated_count += 1
-            else:
-                # 新增
-                card_data["status"] = str(row.get("Status", "未审阅")).strip() or "未审阅"
-                save_daily_card(card_data, is_editing=False)
-                imported_count += 1
-        st.sidebar.success(f"导入完成：新增 {imported_count} 条，更新 {updated_count} 条。")
+        frame = normalise_daily_frame(df)
+        existing_by_hash = find_existing_by_hash(supabase, "daily_cards", frame, "id,content_hash,title,status,date,data")
+        inserts, upserts, unchanged_count = plan_daily_import(frame, existing_by_hash)
+        progress_bar = st.sidebar.progress(0.0, text="正在导入每日词卡…")
+        try:
+            imported_count, updated_count = write_import_plan(
+                supabase, "daily_cards", inserts, upserts, IMPORT_BATCH_SIZE,
+                progress=lambda done, total: progress_bar.progress(done / total, text=f"已写入 {done}/{total} 条")
+            )
+        finally:
+            invalidate_card_snapshot("daily_cards")
+        st.session_state.daily_imported_file_id = upload_file_id(daily_uploaded_file)
+        st.sidebar.success(f"导入完成：新增 {imported_count} 条，更新 {updated_count} 条，未变化 {unchanged_count} 条。")
         daily_clear_form_state()
         st.rerun()
     except Exception as e:
@@ -409,99 +426,51 @@ if "tiqiao_edit_index" not in st.session_state:
     st.session_state.tiqiao_edit_index = None
 if "tiqiao_editing_filename" not in st.session_state:
     st.session_state.tiqiao_editing_filename = None
+if "tiqiao_edit_card_info" not in st.session_state:
+    st.session_state.tiqiao_edit_card_info = None
 
 tiqiao_form_fields = ["tiqiao_orig_cn", "tiqiao_orig_en", "tiqiao_meaning", "tiqiao_recommend", "tiqiao_qtype", "tiqiao_status"]
 for key in tiqiao_form_fields:
     if key not in st.session_state:
         st.session_state[key] = "" if key != "tiqiao_status" else "未审阅"
 
-# --- Tiqiao Card Utilities ---
-
-def load_tiqiao_cards():
-    res = supabase.table("tiqiao_cards").select("*").execute()
-    return res.data if res.data else []
-
 # --- Tiqiao Card 删除函数 ---
 def delete_tiqiao_card(card_id):
     msg = f"尝试删除 id: {card_id} 类型: {str(type(card_id))}"
     st.session_state['last_delete_debug'] = msg
-    res = supabase.table("tiqiao_cards").delete().eq("id", card_id).execute()
-    st.session_state['last_delete_result'] = str(res)
-    if hasattr(res, "error") and res.error:
-        st.session_state['last_delete_error'] = f"Supabase 删除失败: {res.error}"
+    try:
+        deleted = card_repos["tiqiao_cards"].delete(card_id)
+    except RuntimeError as e:
+        st.session_state['last_delete_error'] = str(e)
         st.session_state['last_delete_success'] = False
         return False
+    finally:
+        invalidate_card_snapshot("tiqiao_cards")
+    st.session_state['last_delete_result'] = str(deleted)
     st.session_state['last_delete_error'] = ''
     st.session_state['last_delete_success'] = True
     return True
 
 def save_tiqiao_card(card_data, is_editing=False, original_card_info=None):
-    if is_editing and original_card_info:
-        card_id = original_card_info.get("id")
-        update_data = {
-            "status": card_data.get("status", "未审阅"),
-            "date": card_data.get("date", original_card_info.get("date")),
-            "orig_cn": card_data.get("orig_cn", ""),
-            "orig_en": card_data.get("orig_en", ""),
-            "meaning": card_data.get("meaning", ""),
-            "recommend": card_data.get("recommend", ""),
-            "qtype": card_data.get("qtype", "")
-        }
-        res = supabase.table("tiqiao_cards").update(update_data).eq("id", card_id).execute()
-        if hasattr(res, "error") and res.error:
-            st.error(f"Supabase 更新失败: {res.error}")
-            return False
-        return True
-    else:
-        insert_data = {
-            "status": card_data.get("status", "未审阅"),
-            "date": card_data.get("date", datetime.date.today().isoformat()),
-            "orig_cn": card_data.get("orig_cn", ""),
-            "orig_en": card_data.get("orig_en", ""),
-            "meaning": card_data.get("meaning", ""),
-            "recommend": card_data.get("recommend", ""),
-            "qtype": card_data.get("qtype", "")
-        }
-        res = supabase.table("tiqiao_cards").insert(insert_data).execute()
-        if hasattr(res, "error") and res.error:
-            st.error(f"Supabase 插入失败: {res.error}")
-            return False
-        return True
-
-def remove_tiqiao_duplicates():
-    cards = load_tiqiao_cards()
-    seen_content = set()
-    deleted_count = 0
-    ids_to_keep = set()
-
-    # First pass: identify unique cards and their IDs
-    for card in cards:
-        key = (
-            safe_strip(card.get('orig_cn')), safe_strip(card.get('orig_en')),
-            safe_strip(card.get('meaning')), safe_strip(card.get('recommend')),
-            safe_strip(card.get('qtype')),
-        )
-        # Keep the first occurrence
-        if key not in seen_content:
-            seen_content.add(key)
-            ids_to_keep.add(card.get("id"))
-
-    # Second pass: delete cards whose IDs were not marked to keep
-    for card in cards:
-        if card.get("id") not in ids_to_keep:
-            filename = card.get("_filename")
-            if filename:
-                filepath = os.path.join(TIQIAO_DATA_PATH, filename)
-                if os.path.exists(filepath):
-                    try:
-                        os.remove(filepath)
-                        deleted_count += 1
-                    except Exception as e:
-                        st.warning(f"删除重复推敲文件 {filename} 失败: {e}")
-            else:
-                st.warning(f"无法删除重复推敲卡片 (ID: {card.get('id')}): 缺少文件名。")
+    repo = card_repos["tiqiao_cards"]
+    try:
+        if is_editing and original_card_info:
+            repo.update(original_card_info.get("id"), tiqiao_card_row(card_data, original_card_info))
+        else:
+            repo.insert(tiqiao_card_row(card_data))
+    except RuntimeError as e:
+        st.error(str(e))
+        return False
+    finally:
+        invalidate_card_snapshot("tiqiao_cards")
+    return True
 
-    return deleted_count
+def remove_tiqiao_duplicates(dry_run=False):
+    """查找并删除 Supabase 中重复的推敲词卡 (五个文本字段的 content_hash，每组保留 id 最小的一张)"""
+    report = card_repos["tiqiao_cards"].remove_duplicates(dry_run=dry_run)
+    if not dry_run:
+        invalidate_card_snapshot("tiqiao_cards")
+    return report
 
 
 # --- Tiqiao Card Callbacks ---
@@ -516,6 +485,10 @@ def tiqiao_start_edit(idx, all_cards):
         st.session_state.tiqiao_qtype = card.get("qtype", "")
         st.session_state.tiqiao_status = card.get("status", "未审阅")
         st.session_state.tiqiao_editing_filename = card.get("_filename")
+        st.session_state.tiqiao_edit_card_info = {
+            "id": card.get("id"),
+            "date": card.get("date")
+        }
     else:
         st.error("无效的推敲词卡编辑索引。")
         tiqiao_cancel_edit()
@@ -525,6 +498,7 @@ def tiqiao_cancel_edit():
     # 重置编辑索引和文件名状态
     st.session_state.tiqiao_edit_index = None
     st.session_state.tiqiao_editing_filename = None
+    st.session_state.tiqiao_edit_card_info = None
 
     # 直接、明确地重置每个表单字段的 Session State
     st.session_state.tiqiao_orig_cn = ""
@@ -572,7 +546,8 @@ if tiqiao_submitted:
         "status": st.session_state.tiqiao_status
     }
 
-    if save_tiqiao_card(card_data, is_editing=tiqiao_is_editing):
+    original_card_info = st.session_state.tiqiao_edit_card_info if tiqiao_is_editing else None
+    if save_tiqiao_card(card_data, is_editing=tiqiao_is_editing, original_card_info=original_card_info):
         msg = "更新成功！" if tiqiao_is_editing else "添加成功！"
         st.sidebar.success(msg)
         st.session_state.reset_tiqiao_flag = True
@@ -588,51 +563,24 @@ if tiqiao_is_editing:
 
 st.sidebar.subheader("📂 批量上传 (推敲词卡)")
 tiqiao_uploaded_file = st.sidebar.file_uploader("上传 Excel 文件", type=["xlsx"], key="tiqiao_upload_file")
-if tiqiao_uploaded_file:
+if tiqiao_uploaded_file and st.session_state.get("tiqiao_imported_file_id") != upload_file_id(tiqiao_uploaded_file):
     try:
         df = pd.read_excel(tiqiao_uploaded_file, na_filter=False)
-        existing_cards = load_tiqiao_cards()
-        def tiqiao_key(card):
-            return (
-                safe_strip(card.get('orig_cn', '')),
-                safe_strip(card.get('orig_en', '')),
-                safe_strip(card.get('meaning', '')),
-                safe_strip(card.get('recommend', '')),
-                safe_strip(card.get('qtype', ''))
+        frame = normalise_tiqiao_frame(df)
+        existing_by_hash = find_existing_by_hash(supabase, "tiqiao_cards", frame, "id,content_hash")
+        inserts, upserts, unchanged_count = plan_tiqiao_import(frame, existing_by_hash)
+        progress_bar = st.sidebar.progress(0.0, text="正在导入推敲词卡…")
+        try:
+            imported_count, updated_count = write_import_plan(
+                supabase, "tiqiao_cards", inserts, upserts, IMPORT_BATCH_SIZE,
+                progress=lambda done, total: progress_bar.progress(done / total, text=f"已写入 {done}/{total} 条")
             )
-        card_map = {tiqiao_key(c): c for c in existing_cards}
-        imported_count = 0
-        updated_count = 0
-        for _, row in df.iterrows():
-            orig_cn = safe_strip(row.get('原始中文', ''))
-            orig_en = safe_strip(row.get('原始英文', ''))
-            meaning = safe_strip(row.get('真实内涵', ''))
-            recommend = safe_strip(row.get('推荐英文', ''))
-            qtype = safe_strip(row.get('问题类型', ''))
-            key = (orig_cn, orig_en, meaning, recommend, qtype)
-            card_data = {
-                "orig_cn": orig_cn,
-                "orig_en": orig_en,
-                "meaning": meaning,
-                "recommend": recommend,
-                "qtype": qtype
-            }
-            if key in card_map:
-                # 只更新内容，不覆盖status
-                original = card_map[key]
-                card_data["status"] = original.get("status", "未审阅")
-                save_tiqiao_card(card_data, is_editing=True, original_card_info={
-                    "id": original.get("id"),
-                    "date": original.get("date")
-                })
-                updated_count += 1
-            else:
-                # 新增
-                card_data["status"] = safe_strip(row.get("状态", "未审阅")) or "未审阅"
-                save_tiqiao_card(card_data, is_editing=False)
-                imported_count += 1
-        st.sidebar.success(f"导入完成：新增 {imported_count} 条，更新 {updated_count} 条。")
-        tiqiao_clear_form_state()
+        finally:
+            invalidate_card_snapshot("tiqiao_cards")
+        st.session_state.tiqiao_imported_file_id = upload_file_id(tiqiao_uploaded_file)
+        st.sidebar.success(f"导入完成：新增 {imported_count} 条，更新 {updated_count} 条，未变化 {unchanged_count} 条。")
+        # 表单控件已渲染，不能直接改它们的值，交给下次 rerun 开头重置
+        st.session_state.reset_tiqiao_flag = True
         st.rerun()
     except Exception as e:
         st.sidebar.error(f"推敲词卡导入失败: {type(e).__name__} - {e}")
@@ -641,409 +589,458 @@ if tiqiao_uploaded_file:
 
 # Tiqiao Duplicate Removal Tool
 with st.sidebar.expander("🧹 清理重复推敲卡片"):
-    if st.button("🚫 删除重复项", key="tiqiao_remove_duplicates_button"):
-        deleted_count = remove_tiqiao_duplicates()
-        if deleted_count > 0:
-            st.success(f"成功删除 {deleted_count} 条重复推敲卡片！")
-        else:
-            st.info("未找到重复的推敲卡片。")
+    render_duplicate_cleanup("tiqiao", "推敲卡片", remove_tiqiao_duplicates, "🚫 删除重复项")
+
+
+# --- Push Jobs ---
+# 推送在后台线程里执行：按钮只创建 push_jobs 记录并提交，界面随后轮询任务进度，不再整页卡住。
+JOBS_CONFIG = st.secrets.get("jobs", {})
+PUSH_JOB_POLL_SECONDS = float(JOBS_CONFIG.get("poll_seconds", 2))
+
+@st.cache_resource
+def get_push_job_runner(max_workers):
+    return PushJobRunner(max_workers)
+
+push_job_runner = get_push_job_runner(int(JOBS_CONFIG.get("workers", 2)))
+
+def submit_push_job(job_id, table):
+    """把任务交给后台线程；中断或失败的任务也用它续跑，已发送的卡片不会重发。
+    任务正由别的进程执行时后台线程认领不到，直接结束。"""
+    if table == "daily_cards":
+        sender, password = sender_email_daily, app_password_daily
+    else:
+        sender, password = sender_email_tiqiao, app_password_tiqiao
+    push_job_runner.submit(
+        supabase, job_id, get_mail_sender(sender, password, SMTP_CONFIG), CARD_RENDERERS[table],
+        PUSH_COLUMNS[table], MAIL_CARDS_PER_MAIL, on_progress=lambda: card_mirror.refresh(supabase, [table]),
+    )
+
+def start_push_job(table, from_status, subject, recipients, label, incremental=False):
+    """incremental=True 时按收件人各建一条增量任务，只发他们还没收到的卡片。"""
+    if card_mirror.offline:
+        st.warning("当前离线，暂时不能推送。")
+        return
+    if list_jobs(supabase, table, statuses=ACTIVE_STATUSES, from_status=from_status, limit=1):
+        st.warning(f"已有 '{from_status}' 的{label}推送任务未完成，请等待完成或在列表上方续跑。")
+        return
+    if incremental:
+        jobs = create_incremental_push_jobs(supabase, table, from_status, subject, recipients, INCREMENTAL_STATUSES)
+        if not jobs:
+            st.warning(f"所选收件人已经收到全部可推送的{label}。")
+            return
+    else:
+        job = create_push_job(supabase, table, from_status, subject, recipients)
+        if job is None:
+            st.warning(f"没有状态为 '{from_status}' 的{label}。")
+            return
+        jobs = [job]
+    session_ids = st.session_state.setdefault("push_job_ids", {}).setdefault(table, [])
+    for job in jobs:
+        session_ids.append(job["id"])
+        submit_push_job(job["id"], table)
+    st.rerun()
+
+def render_push_jobs(table):
+    """展示进行中的任务和本会话提交的任务；某个任务刚跑完时整页 rerun 刷新列表。"""
+    session_ids = st.session_state.get("push_job_ids", {}).get(table, [])
+    jobs = {job["id"]: job for job in list_jobs(supabase, table, statuses=ACTIVE_STATUSES, limit=5)}
+    for job_id in session_ids:
+        if job_id not in jobs:
+            job = get_job(supabase, job_id)
+            if job:
+                jobs[job_id] = job
+
+    polled_key = f"{table}_polled_job_ids"
+    running = [job_id for job_id in jobs if push_job_runner.is_active(job_id)]
+    finished = set(st.session_state.get(polled_key, [])) - set(running)
+    st.session_state[polled_key] = running
+    if finished:
         st.rerun()
 
+    for job_id, job in sorted(jobs.items()):
+        total = len(job.get("card_ids") or [])
+        sent = len(job.get("sent_ids") or [])
+        updated = len(job.get("updated_ids") or [])
+        if job_id in running:
+            st.progress(sent / total if total else 0.0,
+                        text=f"推送任务 #{job_id}：已发送 {sent}/{total} 张，已更新 {updated} 张状态")
+        elif job["status"] == DONE:
+            if job.get("mode") == INCREMENTAL_MODE:
+                st.success(f"已向 {job['recipients'][0]} 增量推送 {sent} 张，其中 {updated} 张状态改为已推送。")
+            elif updated == total:
+                st.success(f"成功推送并更新 {updated} 条词卡状态！")
+            else:
+                st.warning(f"尝试推送 {total} 条，发送 {sent} 条，成功更新 {updated} 条状态（其余状态已变化或卡片不存在）。")
+            session_ids.remove(job_id)
+        elif is_resumable(job):
+            if job["status"] == FAILED:
+                st.error(f"推送任务 #{job_id} 失败（已发送 {sent}/{total} 张）：{job.get('error')}")
+            else:
+                st.warning(f"推送任务 #{job_id} 已中断（已发送 {sent}/{total} 张）。")
+            st.button("▶️ 续跑", key=f"resume_push_job_{job_id}", on_click=submit_push_job, args=(job_id, table))
+        else:
+            # 心跳未过期：定时推送或另一个页面进程正在执行，不能在这里续跑，否则会重复发送
+            st.info(f"推送任务 #{job_id} 正在其他进程中执行（已发送 {sent}/{total} 张）。")
+
+def show_push_jobs(table):
+    if card_mirror.offline:
+        return  # 推送任务都在服务端，离线时既查不到也跑不了
+    # 只有后台确实有任务在跑时才定时局部刷新
+    poll = PUSH_JOB_POLL_SECONDS if push_job_runner.has_active() else None
+    st.fragment(run_every=poll)(render_push_jobs)(table)
 
 # ================================================
 # SECTION 3: MAIN AREA DISPLAY
 # ================================================
 st.divider()
 st.header("📖 每日词卡列表")
+show_push_jobs("daily_cards")
+
+if card_mirror.offline:
+    st.warning(f"⚠️ 无法连接 Supabase，正在显示本地镜像的数据，暂时不能修改。（{card_mirror.last_error}）")
 
 # --- 在主界面顶部增加刷新按钮 ---
 if st.button("🔄 刷新页面", key="refresh_page_button"):
+    # 与服务端完整比对并丢弃缓存，拿到其他客户端（如修复脚本）写入和删除的最新数据
+    invalidate_card_snapshot()
     st.rerun()
+cache_stats = card_cache.stats()
+st.caption(
+    f"缓存命中 {cache_stats['hits']} 次 · 未命中 {cache_stats['misses']} 次 · "
+    f"命中率 {cache_stats['hit_rate']:.0%} · TTL {CARD_CACHE_TTL_SECONDS:g} 秒"
+)
+
+# --- 计数：状态数在本地镜像里聚合；每日统计在数据库里聚合，只取回汇总行 ---
+STATS_DAYS = 30
+
+def get_status_counts(table):
+    return get_card_snapshot((table, "status_counts"), lambda: card_mirror.status_counts(table))
+
+def status_label(counts):
+    """状态单选的 format_func：在状态后面加上卡片数，如“待推送 (37)”。"""
+    def label(state):
+        count = sum(counts.values()) if state == "所有" else counts.get(state, 0)
+        return f"{state} ({count})"
+    return label
+
+def render_stats_dashboard(table, title):
+    created = get_card_snapshot((table, "daily_counts", STATS_DAYS),
+                                lambda: daily_counts(supabase, table, STATS_DAYS))
+    pushed = get_card_snapshot((table, "push_counts", STATS_DAYS),
+                               lambda: push_counts(supabase, table, STATS_DAYS))
+    st.markdown(f"**{title}**：新增 {sum(created.values())} 张 · 推送 {sum(pushed.values())} 张")
+    st.bar_chart(pd.DataFrame({"新增": created, "推送": pushed}), stack=False)
+
+if st.toggle(f"📈 最近 {STATS_DAYS} 天统计", key="show_stats_dashboard"):
+    if card_mirror.offline:
+        st.info("离线时无法读取每日统计。")
+    else:
+        col_daily, col_tiqiao = st.columns(2)
+        with col_daily:
+            render_stats_dashboard("daily_cards", "每日词卡")
+        with col_tiqiao:
+            render_stats_dashboard("tiqiao_cards", "推敲词卡")
+
+# --- 列表分页渲染：每次只查询、只渲染当前这一页 ---
+LIST_PAGE_SIZE_OPTIONS = [20, 50, 100, 200]
+LIST_VIEW_MODES = ["卡片", "表格"]
+
+def load_card_page(table, status, page, page_size):
+    """取列表第 page 页（从 1 开始），返回 (cards, total)。"""
+    offset = (page - 1) * page_size
+    cards, total = get_card_snapshot(
+        (table, "page", status, offset, page_size),
+        lambda: card_repos[table].page(offset, page_size, status)
+    )
+    if table == "daily_cards":
+        _fill_daily_filenames(cards)
+    return cards, total
+
+def load_search_page(table, query, status, page, page_size):
+    """取搜索结果（按相关度排序）第 page 页，返回 (cards, total)，与 load_card_page 相同。
+
+    只取回当前页的匹配行；本地镜像用 FTS5 检索，与服务端的 search_cards 语义相同。
+    """
+    offset = (page - 1) * page_size
+    cards, total = get_card_snapshot(
+        (table, "search", query, status, offset, page_size),
+        lambda: card_repos[table].search(query, status, page_size, offset)
+    )
+    if table == "daily_cards":
+        _fill_daily_filenames(cards)
+    return cards, total
+
+def reset_list_pages(prefix):
+    # 搜索词变了：各状态的搜索结果都回到第一页
+    for key in [k for k in st.session_state if k.startswith(f"{prefix}_search_page_tab") and not k.endswith("_jump")]:
+        st.session_state[key] = 1
+
+def render_list_controls(prefix):
+    """列表区公共设置：搜索框、每页条数和显示方式（卡片 / 紧凑表格）。"""
+    col_search, col_size, col_mode = st.columns([2, 1, 1])
+    col_search.text_input("🔍 搜索", key=f"{prefix}_search", on_change=reset_list_pages, args=(prefix,),
+                          placeholder="词条、释义、例句…" if prefix == "daily" else "中文、英文、内涵、问题类型…")
+    col_size.selectbox("每页条数", LIST_PAGE_SIZE_OPTIONS, index=1, key=f"{prefix}_page_size")
+    col_mode.radio("显示方式", LIST_VIEW_MODES, horizontal=True, key=f"{prefix}_view_mode")
+
+def jump_to_card(prefix, table, status, page_key, query=""):
+    # 跳转输入框的回调：在下次渲染前把页码设到目标卡片所在页
+    raw = st.session_state.get(f"{page_key}_jump", "").strip()
+    if not raw:
+        return
+    if not raw.isdigit():
+        st.session_state[f"{page_key}_jump_error"] = f"请输入数字 ID：{raw}"
+        return
+    card_id = int(raw)
+    if query:
+        ids = [card["id"] for card in card_repos[table].search(query, status, limit=None)[0]]
+        position = ids.index(card_id) if card_id in ids else None
+    else:
+        position = card_repos[table].locate(card_id, status)
+    if position is None:
+        st.session_state[f"{page_key}_jump_error"] = f"当前列表中没有 ID {card_id}。"
+        return
+    st.session_state[page_key] = position // st.session_state[f"{prefix}_page_size"] + 1
+    st.session_state[f"{prefix}_highlight_id"] = card_id
+
+def render_card_list(prefix, table, state, tab_index, render_cards, start_edit, delete_card, table_row):
+    """渲染一个状态下的当前页：页码选择、按 ID 跳转，然后按显示方式渲染卡片或表格。"""
+    status = None if state == "所有" else state
+    page_size = st.session_state[f"{prefix}_page_size"]
+    query = st.session_state.get(f"{prefix}_search", "").strip()
+    # 搜索结果与普通列表各记各的页码，清空搜索框后回到原来那一页
+    page_key = f"{prefix}_{'search_' if query else ''}page_tab{tab_index}"
+    if page_key not in st.session_state:
+        st.session_state[page_key] = 1
+    if query:
+        load_page = lambda page: load_search_page(table, query, status, page, page_size)
+    else:
+        load_page = lambda page: load_card_page(table, status, page, page_size)
+    page = st.session_state[page_key]
+    cards, total = load_page(page)
+    page_count = max(1, -(-total // page_size))
+    if page > page_count:
+        # 删除或改状态后总页数变少，回到最后一页
+        page = st.session_state[page_key] = page_count
+        cards, total = load_page(page)
+
+    col_page, col_jump, col_info = st.columns([1, 1, 2])
+    col_page.number_input("页码", min_value=1, max_value=page_count, step=1, key=page_key)
+    col_jump.text_input("跳转到 ID", key=f"{page_key}_jump", on_change=jump_to_card,
+                        args=(prefix, table, status, page_key, query))
+    col_info.caption(f"{'匹配' if query else '共'} {total} 条 · 第 {page}/{page_count} 页")
+    jump_error = st.session_state.pop(f"{page_key}_jump_error", None)
+    if jump_error:
+        st.warning(jump_error)
+
+    if not cards:
+        st.info(f"无 '{state}' 状态下匹配“{query}”的卡片。" if query else f"无 '{state}' 状态的卡片。")
+    elif st.session_state[f"{prefix}_view_mode"] == "表格":
+        render_card_table(cards, f"{prefix}_table_tab{tab_index}", start_edit, delete_card, table_row)
+    else:
+        render_cards(cards, f"{prefix}_tab{tab_index}", st.session_state.get(f"{prefix}_highlight_id"))
+
+def render_card_table(cards, key, start_edit, delete_card, table_row):
+    """紧凑表格模式：一页卡片一个 st.dataframe，选中一行后再编辑或删除。"""
+    selection = st.dataframe(
+        pd.DataFrame([table_row(card) for card in cards]),
+        hide_index=True,
+        on_select="rerun",
+        selection_mode="single-row",
+        key=key,
+    )
+    selected_rows = selection.selection.rows if selection else []
+    if not selected_rows:
+        st.caption("选中一行后可编辑或删除。")
+        return
+    idx = selected_rows[0]
+    card = cards[idx]
+    col_edit, col_delete = st.columns(2)
+    col_edit.button("✏️ 编辑所选", key=f"{key}_edit", on_click=start_edit, args=(idx, cards))
+    if col_delete.button("🗑️ 删除所选", key=f"{key}_delete"):
+        if delete_card(card.get("id")):
+            st.success(f"删除卡片 ID {card.get('id')} 成功（请点击上方刷新按钮刷新列表）")
+        else:
+            st.error(f"删除卡片 ID {card.get('id')} 失败（请查看上方调试信息）")
+
+def daily_table_row(card):
+    data = card.get("data") or {}
+    return {"ID": card.get("id"), "词条": card.get("title", ""), "释义": data.get("释义", ""),
+            "状态": card.get("status", ""), "日期": card.get("date", "")}
+
+def tiqiao_table_row(card):
+    return {"ID": card.get("id"), "原始中文": card.get("orig_cn", ""), "推荐英文": card.get("recommend", ""),
+            "问题类型": card.get("qtype", ""), "状态": card.get("status", ""), "日期": card.get("date", "")}
+
+def render_daily_cards(cards, key_prefix, highlight_id=None):
+    """卡片模式：一页每日词卡，每张一行 markdown 加编辑/删除按钮。"""
+    for original_idx, card in enumerate(cards):
+        col1, col2 = st.columns([5,1])
+
+        title = card.get('title', '-')
+        if highlight_id is not None and card.get('id') == highlight_id:
+            title = f"📍 {title}"
+        card_id = card.get('id', 'N/A')
+        date = card.get('date', '-')
+        phonetic = (card.get('data') or {}).get('音标') or card.get('phonetic', '-') or '-'
+        definition = (card.get('data') or {}).get('释义') or card.get('definition', '-') or '-'
+        example = (card.get('data') or {}).get('例句') or card.get('example', '-') or '-'
+        note = (card.get('data') or {}).get('备注') or card.get('note', '-') or '-'
+        status_val = card.get('status', '未审阅')
+        source = (card.get('data') or {}).get('source') or card.get('source', '') or ''
+        display_text = f"""
+        **词条**: {title} <span style='color:#888;'>(ID: {card_id})</span> · <span style='color:#888;'>日期: {date}</span><br>
+        **音标**: {phonetic}<br>
+        **释义**: {definition}<br>
+        **例句**: {example}<br>
+        **备注**: {note}<br>
+        **状态**: {status_val}
+        """
+        if source:
+            # 使用 HTML a 标签创建链接
+            display_text += f"<br>**来源**: <a href='{source}' target='_blank'>🔗 Link</a>"
+        else:
+            display_text += f"<br>**来源**: -"
+        # --- 修改结束 ---
+
+        col1.markdown(display_text, unsafe_allow_html=True)
+
+        edit_button_key = f"edit_{key_prefix}_card{card_id}"
+        delete_button_key = f"delete_{key_prefix}_card{card_id}"
+
+        col2.button("✏️", key=edit_button_key, on_click=daily_start_edit, args=(original_idx, cards))
+        if col2.button("🗑️", key=delete_button_key):
+            if delete_daily_card(card.get("id")):
+                st.success(f"删除词卡 ID {card.get('id')} 成功（请点击上方刷新按钮刷新列表）")
+            else:
+                st.error(f"删除词卡 ID {card.get('id')} 失败（请查看上方调试信息）")
+
+def render_tiqiao_cards(cards, key_prefix, highlight_id=None):
+    """卡片模式：一页推敲词卡，每张一行 markdown 加编辑/删除按钮。"""
+    for original_idx, card in enumerate(cards):
+        col1, col2 = st.columns([5,1])
+
+        card_id = card.get('id', 'N/A')
+        data = card.get("data", {}) or {}
+        orig_cn = data.get('orig_cn') or card.get('orig_cn', '-')
+        if highlight_id is not None and card_id == highlight_id:
+            orig_cn = f"📍 {orig_cn}"
+        orig_en = data.get('orig_en') or card.get('orig_en', '-')
+        meaning = data.get('meaning') or card.get('meaning', '-')
+        recommend = data.get('recommend') or card.get('recommend', '-')
+        qtype = data.get('qtype') or card.get('qtype', '-')
+        status = card.get('status', '未审阅')
+        date = card.get('date', '-')
+
+        # --- 使用 <br> 强制换行 ---
+        display_text = f"""
+        **原始中文**: {orig_cn} `(ID: {card_id})`<br>
+        **原始英文**: {orig_en}<br>
+        **真实内涵**: {meaning}<br>
+        **推荐英文**: {recommend}<br>
+        **问题类型**: {qtype}<br>
+        **状态**: {status}<br>
+        **日期**: {date}
+        """
+        # --- 修改结束 ---
+
+        col1.markdown(display_text, unsafe_allow_html=True)
+
+        edit_button_key = f"edit_{key_prefix}_card{card_id}"
+        delete_button_key = f"delete_{key_prefix}_card{card_id}"
+
+        col2.button("✏️", key=edit_button_key, on_click=tiqiao_start_edit, args=(original_idx, cards))
+        if col2.button("🗑️", key=delete_button_key):
+             if delete_tiqiao_card(card.get("id")):
+                  st.success(f"删除推敲卡片 ID {card.get('id')} 成功（请点击上方刷新按钮刷新列表）")
+             else:
+                  st.error(f"删除推敲卡片 ID {card.get('id')} 失败（请查看上方调试信息）")
+        
 
 # --- Daily Card Main Area Display ---
+render_list_controls("daily")
+
 daily_states = ["所有","未审阅","已审阅","待推送","已推送"]
-daily_tabs = st.tabs(daily_states)
+# st.tabs 每次 rerun 都会执行全部五个标签页；改用单选，只构建当前选中的状态视图，
+# 选择保存在 session_state["daily_status_view"] 中，rerun 后保持不变
+state = st.radio("状态", daily_states, horizontal=True, key="daily_status_view",
+                 format_func=status_label(get_status_counts("daily_cards")), label_visibility="collapsed")
+i = daily_states.index(state)
+
+with st.container():
+    st.subheader(f"状态：{state}")
+    
 
-for i, state in enumerate(daily_states):
-    with daily_tabs[i]:
-        st.subheader(f"状态：{state}")
-        
-        # 在每个标签页中重新加载数据
-        all_daily_cards = load_daily_cards()
-
-        if state=="待推送":
-            # 每日词卡推送收件人选择，使用 [recipients] 里的邮箱
-            selected_recipients = st.multiselect(
-                "选择推送收件人",
-                recipient_list,
-                default=[recipient_list[0]] if recipient_list else [],
-                key=f"daily_recipients_{i}"
-            )
-            if st.button("📬 推送待处理每日词卡", key=f"daily_push_email_tab{i}"):
-                cards_to_push = [c for c in load_daily_cards() if c.get("status") in ["待推送", "未审阅"]]
-                if not cards_to_push:
-                    st.warning("没有状态为 '待推送' 或 '未审阅' 的每日词卡。")
-                else:
-                    body = ""
-                    for c in cards_to_push:
-                        data = c.get('data') or {}
-                        body += (
-                            f"【{c.get('title','')}】\n"
-                            f"日期: {c.get('date', '-') }\n"
-                            f"音标: {data.get('音标') or c.get('phonetic', '-') or '-'}\n"
-                            f"释义: {data.get('释义') or c.get('definition', '-') or '-'}\n"
-                            f"例句: {data.get('例句') or c.get('example', '-') or '-'}\n"
-                            f"备注: {data.get('备注') or c.get('note', '-') or '-'}\n"
-                            f"来源: {data.get('source') or c.get('source', '') or ''}\n\n"
-                        )
-                    if not selected_recipients:
-                        st.warning("请选择至少一个收件人。")
-                        st.stop()
-                    try:
-                        # --- 邮件准备和发送 ---
-                        msg = MIMEMultipart()
-                        msg["From"] = sender_email_daily
-                        msg["To"] = ", ".join(selected_recipients)
-                        msg["Subject"] = f"每日词卡推送 {datetime.date.today()}"
-                        msg.attach(MIMEText(body, "plain", "utf-8"))
-
-                        with smtplib.SMTP_SSL("smtp.feishu.cn", 465) as s:
-                            s.login(sender_email_daily, app_password_daily)
-                            if not selected_recipients:
-                                st.warning("请选择至少一个收件人。")
-                                st.stop()
-                            s.sendmail(sender_email_daily, selected_recipients, msg.as_string())
-
-                        # --- 邮件发送成功后，更新卡片状态 ---
-                        saved_count = 0
-                        all_cards_reloaded = load_daily_cards() # 加载最新数据
-                        updates_to_perform = []
-                        for idx, card in enumerate(all_cards_reloaded):
-                            if not card:
-                                continue
-                            if card.get("status") in ["待推送", "未审阅"]:
-                                data = card.get("data") or {}
-                                updates_to_perform.append({
-                                    'original_info': {
-                                        "id": card.get("id"),
-                                        "date": card.get("date"),
-                                        "filename": card.get("_filename")
-                                    },
-                                    'updated_data': {
-                                        "title": card.get("title"),
-                                        "data": data,
-                                        "status": "已推送"
-                                    },
-                                    'original_index': idx
-                                })
-                        for update in updates_to_perform:
-                            if save_daily_card(
-                                update['updated_data'],
-                                is_editing=True,
-                                original_card_info=update['original_info']
-                            ):
-                                saved_count += 1
-                            else:
-                                st.warning(f"更新卡片 ID {update['original_info'].get('id')} 状态失败。")
-
-                        # 显示最终结果 (确保这部分有正确的缩进)
-                        if saved_count == len(updates_to_perform):
-                             st.success(f"成功推送并更新 {saved_count} 条词卡状态！")
-                        else:
-                             st.warning(f"尝试推送 {len(updates_to_perform)} 条，成功更新 {saved_count} 条状态。")
-                        st.rerun() # 更新成功后刷新页面
-
-                    # --- 必须要有 except 来捕获错误 ---
-                    except Exception as e:
-                        # (确保 except 和 try 对齐，并且内部代码有缩进)
-                        st.error(f"邮件推送或状态更新失败：{e}")
-# --- try...except 代码块替换结束 ---
-
-        if state == "已审阅":
-            selected_recipients = st.multiselect(
-                "选择推送收件人",
-                recipient_list,
-                default=[recipient_list[0]] if recipient_list else [],
-                key=f"daily_reviewed_recipients_{i}"
-            )
-            if st.button("📬 推送已审阅每日词卡", key=f"daily_push_reviewed_email_tab{i}"):
-                cards_to_push = [c for c in load_daily_cards() if c.get("status") == "已审阅"]
-                if not cards_to_push:
-                    st.warning("没有状态为 '已审阅' 的每日词卡。")
-                else:
-                    body = ""
-                    for c in cards_to_push:
-                        data = c.get('data') or {}
-                        body += (
-                            f"【{c.get('title','')}】\n"
-                            f"日期: {c.get('date', '-') }\n"
-                            f"音标: {data.get('音标') or c.get('phonetic', '-') or '-'}\n"
-                            f"释义: {data.get('释义') or c.get('definition', '-') or '-'}\n"
-                            f"例句: {data.get('例句') or c.get('example', '-') or '-'}\n"
-                            f"备注: {data.get('备注') or c.get('note', '-') or '-'}\n"
-                            f"来源: {data.get('source') or c.get('source', '') or ''}\n\n"
-                        )
-                    if not selected_recipients:
-                        st.warning("请选择至少一个收件人。")
-                        st.stop()
-                    try:
-                        msg = MIMEMultipart()
-                        msg["From"] = sender_email_daily
-                        msg["To"] = ", ".join(selected_recipients)
-                        msg["Subject"] = f"每日词卡推送 {datetime.date.today()}"
-                        msg.attach(MIMEText(body, "plain", "utf-8"))
-
-                        with smtplib.SMTP_SSL("smtp.feishu.cn", 465) as s:
-                            s.login(sender_email_daily, app_password_daily)
-                            if not selected_recipients:
-                                st.warning("请选择至少一个收件人。")
-                                st.stop()
-                            s.sendmail(sender_email_daily, selected_recipients, msg.as_string())
-
-                        # --- 邮件发送成功后，更新卡片状态 ---
-                        saved_count = 0
-                        all_cards_reloaded = load_daily_cards()
-                        updates_to_perform = []
-                        for idx, card in enumerate(all_cards_reloaded):
-                            if not card:
-                                continue
-                            if card.get("status") == "已审阅":
-                                data = card.get("data") or {}
-                                updates_to_perform.append({
-                                    'original_info': {
-                                        "id": card.get("id"),
-                                        "date": card.get("date"),
-                                        "filename": card.get("_filename")
-                                    },
-                                    'updated_data': {
-                                        "title": card.get("title"),
-                                        "data": data,
-                                        "status": "已推送"
-                                    },
-                                    'original_index': idx
-                                })
-                        for update in updates_to_perform:
-                            if save_daily_card(
-                                update['updated_data'],
-                                is_editing=True,
-                                original_card_info=update['original_info']
-                            ):
-                                saved_count += 1
-                            else:
-                                st.warning(f"更新卡片 ID {update['original_info'].get('id')} 状态失败。")
-                        if saved_count == len(updates_to_perform):
-                            st.success(f"成功推送并更新 {saved_count} 条词卡状态！")
-                        else:
-                            st.warning(f"尝试推送 {len(updates_to_perform)} 条，成功更新 {saved_count} 条状态。")
-                        st.rerun()
-                    except Exception as e:
-                        st.error(f"邮件推送或状态更新失败：{e}")
-
-        filtered_daily_cards = [
-            (idx, card) for idx, card in enumerate(all_daily_cards)
-            if state == "所有" or card.get("status") == state
-        ]
-        
-        if not filtered_daily_cards:
-            st.info(f"无 '{state}' 状态的每日词卡。")
-        else:
-            for original_idx, card in filtered_daily_cards:
-                col1, col2 = st.columns([5,1])
-
-                title = card.get('title', '-')
-                card_id = card.get('id', 'N/A')
-                date = card.get('date', '-')
-                phonetic = (card.get('data') or {}).get('音标') or card.get('phonetic', '-') or '-'
-                definition = (card.get('data') or {}).get('释义') or card.get('definition', '-') or '-'
-                example = (card.get('data') or {}).get('例句') or card.get('example', '-') or '-'
-                note = (card.get('data') or {}).get('备注') or card.get('note', '-') or '-'
-                status_val = card.get('status', '未审阅')
-                source = (card.get('data') or {}).get('source') or card.get('source', '') or ''
-                display_text = f"""
-                **词条**: {title} <span style='color:#888;'>(ID: {card_id})</span> · <span style='color:#888;'>日期: {date}</span><br>
-                **音标**: {phonetic}<br>
-                **释义**: {definition}<br>
-                **例句**: {example}<br>
-                **备注**: {note}<br>
-                **状态**: {status_val}
-                """
-                if source:
-                    # 使用 HTML a 标签创建链接
-                    display_text += f"<br>**来源**: <a href='{source}' target='_blank'>🔗 Link</a>"
-                else:
-                    display_text += f"<br>**来源**: -"
-                # --- 修改结束 ---
-
-                col1.markdown(display_text, unsafe_allow_html=True)
-
-                edit_button_key = f"edit_daily_tab{i}_card{card_id}"
-                delete_button_key = f"delete_daily_tab{i}_card{card_id}"
-
-                col2.button("✏️", key=edit_button_key, on_click=daily_start_edit, args=(original_idx, all_daily_cards))
-                if col2.button("🗑️", key=delete_button_key):
-                    if delete_daily_card(card.get("id")):
-                        st.success(f"删除词卡 ID {card.get('id')} 成功（请点击上方刷新按钮刷新列表）")
-                    else:
-                        st.error(f"删除词卡 ID {card.get('id')} 失败（请查看上方调试信息）")
+    if state=="待推送":
+        # 每日词卡推送收件人选择，使用 [recipients] 里的邮箱
+        selected_recipients = st.multiselect(
+            "选择推送收件人",
+            recipient_list,
+            default=[recipient_list[0]] if recipient_list else [],
+            key=f"daily_recipients_{i}"
+        )
+        incremental = st.toggle("增量推送：只发每个收件人还没收到的卡片", key=f"daily_incremental_{i}")
+        if st.button("📬 推送待处理每日词卡", key=f"daily_push_email_tab{i}"):
+            if not selected_recipients:
+                st.warning("请选择至少一个收件人。")
+            else:
+                start_push_job("daily_cards", "待推送", f"每日词卡推送 {datetime.date.today()}",
+                               selected_recipients, "每日词卡", incremental)
+
+    if state == "已审阅":
+        selected_recipients = st.multiselect(
+            "选择推送收件人",
+            recipient_list,
+            default=[recipient_list[0]] if recipient_list else [],
+            key=f"daily_reviewed_recipients_{i}"
+        )
+        if st.button("📬 推送已审阅每日词卡", key=f"daily_push_reviewed_email_tab{i}"):
+            if not selected_recipients:
+                st.warning("请选择至少一个收件人。")
+            else:
+                start_push_job("daily_cards", "已审阅", f"每日词卡推送 {datetime.date.today()}",
+                               selected_recipients, "每日词卡")
+
+    render_card_list("daily", "daily_cards", state, i, render_daily_cards, daily_start_edit,
+                     delete_daily_card, daily_table_row)
 
 # ================================================
 # SECTION 4: MAIN AREA DISPLAY
 # ================================================
 st.divider()
 st.header("✍️ 推敲词卡列表")
+show_push_jobs("tiqiao_cards")
+render_list_controls("tiqiao")
+
 tiqiao_states = ["所有","未审阅","已审阅","待推送","已推送"]
-tiqiao_tabs = st.tabs(tiqiao_states)
+# st.tabs 每次 rerun 都会执行全部五个标签页；改用单选，只构建当前选中的状态视图，
+# 选择保存在 session_state["tiqiao_status_view"] 中，rerun 后保持不变
+state = st.radio("状态", tiqiao_states, horizontal=True, key="tiqiao_status_view",
+                 format_func=status_label(get_status_counts("tiqiao_cards")), label_visibility="collapsed")
+i = tiqiao_states.index(state)
+
+with st.container():
+    st.subheader(f"状态：{state}")
+    
+    
+    if state == "待推送":
+        # 推敲词卡推送收件人选择，使用 [recipients] 里的邮箱
+        selected_recipients = st.multiselect(
+            "选择推送收件人",
+            recipient_list,
+            default=[recipient_list[0]] if recipient_list else [],
+            key=f"tiqiao_recipients_{i}"
+        )
+        incremental = st.toggle("增量推送：只发每个收件人还没收到的卡片", key=f"tiqiao_incremental_{i}")
+        if st.button("📬 推送待处理推敲词卡", key=f"tiqiao_push_email_tab{i}"):
+            if not selected_recipients:
+                st.warning("请选择至少一个收件人。")
+            else:
+                start_push_job("tiqiao_cards", "待推送", f"推敲词卡推送 {datetime.date.today()}",
+                               selected_recipients, "推敲词卡", incremental)
+    render_card_list("tiqiao", "tiqiao_cards", state, i, render_tiqiao_cards, tiqiao_start_edit,
+                     delete_tiqiao_card, tiqiao_table_row)
 
-for i, state in enumerate(tiqiao_states):
-    with tiqiao_tabs[i]:
-        st.subheader(f"状态：{state}")
-        
-        # 在每个标签页中重新加载数据
-        all_tiqiao_cards = load_tiqiao_cards()
-        
-# --- 替换推敲词卡列表中的 "待推送" Tab 页处理逻辑 ---
-        if state == "待推送":
-            # 推敲词卡推送收件人选择，使用 [recipients] 里的邮箱
-            selected_recipients = st.multiselect(
-                "选择推送收件人",
-                recipient_list,
-                default=[recipient_list[0]] if recipient_list else [],
-                key=f"tiqiao_recipients_{i}"
-            )
-            if st.button("📬 推送待处理推敲词卡", key=f"tiqiao_push_email_tab{i}"):
-                cards_to_push = [c for c in load_tiqiao_cards() if c.get("status") in ["待推送", "未审阅"]]
-                if not cards_to_push:
-                    st.warning("没有状态为 '待推送' 或 '未审阅' 的推敲词卡。")
-                else:
-                    # --- 准备邮件内容 ---
-                    body = ""
-                    for c in cards_to_push:
-                        data = c.get('data') or {}
-                        body += (
-                            f"【推敲词卡】\n"
-                            f"日期: {c.get('date', '-') }\n"
-                            f"原始中文: {data.get('orig_cn') or c.get('orig_cn', '-') or '-'}\n"
-                            f"原始英文: {data.get('orig_en') or c.get('orig_en', '-') or '-'}\n"
-                            f"真实内涵: {data.get('meaning') or c.get('meaning', '-') or '-'}\n"
-                            f"推荐英文: {data.get('recommend') or c.get('recommend', '-') or '-'}\n"
-                            f"问题类型: {data.get('qtype') or c.get('qtype', '-') or '-'}\n\n"
-                        )
-                    if not selected_recipients:
-                        st.warning("请选择至少一个收件人。")
-                        st.stop()
-                    # --- 发送邮件并更新状态 ---
-                    try: 
-                        # 初始化邮件对象
-                        msg = MIMEMultipart()
-                        msg["From"] = sender_email_tiqiao # 使用推敲邮箱配置
-                        msg["To"] = ", ".join(selected_recipients)
-                        msg["Subject"] = f"推敲词卡推送 {datetime.date.today()}" # 设置主题
-                        msg.attach(MIMEText(body, "plain", "utf-8"))
-
-                        # 建立连接并发送
-                        with smtplib.SMTP_SSL("smtp.feishu.cn", 465) as s:
-                            s.login(sender_email_tiqiao, app_password_tiqiao) # 使用推敲邮箱配置
-                            # 处理可能的多个收件人
-                            if not selected_recipients:
-                                st.warning("请选择至少一个收件人。")
-                                st.stop()
-                            s.sendmail(sender_email_tiqiao, selected_recipients, msg.as_string())
-
-                        # --- 邮件发送成功，开始更新状态 ---
-                        saved_count = 0
-                        all_cards_reloaded = load_tiqiao_cards() # 重新加载以获取最新列表
-                        updates_to_perform = []
-                        for idx, card in enumerate(all_cards_reloaded):
-                            if not card:
-                                continue
-                            if card.get("status") in ["待推送", "未审阅"]:
-                                data = card.get("data", {}) or {}
-                                updates_to_perform.append({
-                                    'original_info': {
-                                        "id": card.get("id"),
-                                        "date": card.get("date"),
-                                        "filename": card.get("_filename")
-                                    },
-                                    'updated_data': {
-                                        "orig_cn": data.get("orig_cn") or card.get("orig_cn"),
-                                        "orig_en": data.get("orig_en") or card.get("orig_en"),
-                                        "meaning": data.get("meaning") or card.get("meaning"),
-                                        "recommend": data.get("recommend") or card.get("recommend"),
-                                        "qtype": data.get("qtype") or card.get("qtype"),
-                                        "status": "已推送"
-                                    }
-                                })
-
-                        # 循环调用保存函数进行更新
-                        for update in updates_to_perform:
-                            if save_tiqiao_card(
-                                update['updated_data'],
-                                is_editing=True,
-                                original_card_info=update['original_info']
-                            ):
-                                saved_count += 1
-                            else:
-                                st.warning(f"更新推敲卡片 ID {update['original_info'].get('id')} 状态失败。")
-                        # --- 状态更新结束 ---
-
-                        # 显示结果
-                        if saved_count == len(updates_to_perform):
-                            st.success(f"成功推送并更新 {saved_count} 条推敲词卡状态！")
-                        else:
-                            st.warning(f"尝试推送 {len(updates_to_perform)} 条，成功更新 {saved_count} 条状态。")
-                        st.rerun() # 刷新界面
-
-                    # --- 捕获错误 ---
-                    except Exception as e:
-                        st.error(f"推敲词卡邮件推送或状态更新失败：{e}")
-# --- 推送逻辑替换结束 ---
-        filtered_tiqiao_cards = [
-            (idx, card) for idx, card in enumerate(all_tiqiao_cards)
-            if state == "所有" or card.get("status") == state
-        ]
-
-        if not filtered_tiqiao_cards:
-            st.info(f"无 '{state}' 状态的推敲词卡。")
-            continue
-
-        for original_idx, card in filtered_tiqiao_cards:
-            col1, col2 = st.columns([5,1])
-
-            card_id = card.get('id', 'N/A')
-            data = card.get("data", {}) or {}
-            orig_cn = data.get('orig_cn') or card.get('orig_cn', '-')
-            orig_en = data.get('orig_en') or card.get('orig_en', '-')
-            meaning = data.get('meaning') or card.get('meaning', '-')
-            recommend = data.get('recommend') or card.get('recommend', '-')
-            qtype = data.get('qtype') or card.get('qtype', '-')
-            status = card.get('status', '未审阅')
-            date = card.get('date', '-')
-
-            # --- 使用 <br> 强制换行 ---
-            display_text = f"""
-            **原始中文**: {orig_cn} `(ID: {card_id})`<br>
-            **原始英文**: {orig_en}<br>
-            **真实内涵**: {meaning}<br>
-            **推荐英文**: {recommend}<br>
-            **问题类型**: {qtype}<br>
-            **状态**: {status}<br>
-            **日期**: {date}
-            """
-            # --- 修改结束 ---
-
-            col1.markdown(display_text, unsafe_allow_html=True)
-
-            edit_button_key = f"edit_tiqiao_tab{i}_card{card_id}"
-            delete_button_key = f"delete_tiqiao_tab{i}_card{card_id}"
-            group_button_key = f"group_tiqiao_tab{i}_card{card_id}"
-
-            col2.button("✏️", key=edit_button_key, on_click=tiqiao_start_edit, args=(original_idx, all_tiqiao_cards))
-            if col2.button("🗑️", key=delete_button_key):
-                 if delete_tiqiao_card(card.get("id")):
-                      st.success(f"删除推敲卡片 ID {card.get('id')} 成功（请点击上方刷新按钮刷新列表）")
-                 else:
-                      st.error(f"删除推敲卡片 ID {card.get('id')} 失败（请查看上方调试信息）")
-            
 # 移除调试信息显示区域，保持代码简洁
 
 # --- 删除后清理调试信息的按钮 ---
@@ -4,14 +4,11 @@
 """
 import os
 import sys
-import toml
-from supabase import create_client
+from pebbling.client import get_client
 import datetime
 
 def load_supabase():
-    secrets = toml.load('.streamlit/secrets.toml')
-    supa = secrets['supabase']
-    return create_client(supa['url'], supa['key'])
+    return get_client()
 
 def test_tiqiao_insert():
     supabase = load_supabase()
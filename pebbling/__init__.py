@@ -0,0 +1 @@
+"""Pebbling 的非界面代码，供 Pebbling.py 和维护脚本共用。"""
@@ -0,0 +1,125 @@
+"""卡片表维护命令行：每项修复都是服务端的一条批量 update。
+
+    python -m pebbling.admin histogram                    # 状态分布
+    python -m pebbling.admin fill-empty --dry-run         # 空状态的卡片有多少张
+    python -m pebbling.admin normalise-statuses --table daily_cards --status 未审阅 --confirm
+    python -m pebbling.admin fix-all --confirm            # 两张表都先规范状态、再补空状态
+"""
+
+import argparse
+
+from pebbling.cards import CARD_TABLES, CARD_STATUSES, DEFAULT_STATUS, EMPTY_LABEL
+from pebbling.client import get_client
+from pebbling.config import load_secrets
+from pebbling.paging import apply_empty_status_filter
+from pebbling.stats import status_counts
+
+
+def _contains_status(status):
+    # “ 未审阅”“未审阅（旧）”之类：包含规范状态但不完全相等
+    return lambda query: query.like("status", f"%{status}%").neq("status", status)
+
+
+# 修复名 -> [(说明, 目标状态, 过滤条件)]
+FIXES = {
+    "fill-empty": [(EMPTY_LABEL, DEFAULT_STATUS, apply_empty_status_filter)],
+    "normalise-statuses": [
+        (f"包含“{status}”", status, _contains_status(status)) for status in CARD_STATUSES
+    ],
+}
+# fix-all 依次执行的修复
+FIX_ALL = ["normalise-statuses", "fill-empty"]
+
+
+def count_matching(client, table, where):
+    """满足 where 的行数，只发一条 count 查询。"""
+    res = where(client.table(table).select("id", count="exact", head=True)).execute()
+    return res.count or 0
+
+
+def update_matching(client, table, where, to_status):
+    """把满足 where 的行一次性改为 to_status，返回改动行数。"""
+    query = client.table(table).update({"status": to_status}, count="exact", returning="minimal")
+    res = where(query).execute()
+    if hasattr(res, "error") and res.error:
+        raise RuntimeError(f"Supabase 批量更新失败: {res.error}")
+    return res.count or 0
+
+
+def run_fix(client, name, tables=CARD_TABLES, dry_run=False, statuses=None):
+    """执行一项修复，返回 [(表, 说明, 目标状态, 行数)]；dry_run 时行数是会被改动的行数。
+
+    statuses 非空时只做目标状态在其中的那几条修复。
+    """
+    results = []
+    for table in tables:
+        for label, to_status, where in FIXES[name]:
+            if statuses and to_status not in statuses:
+                continue
+            if dry_run:
+                count = count_matching(client, table, where)
+            else:
+                count = update_matching(client, table, where, to_status)
+            results.append((table, label, to_status, count))
+    return results
+
+
+def _report(results, dry_run):
+    total = 0
+    for table, label, to_status, count in results:
+        total += count
+        if count:
+            print(f"{'🔍' if dry_run else '✅'} {table}: {label} → {to_status}  {count} 张")
+    print(f"{'待修复' if dry_run else '已修复'} {total} 张卡片")
+    return total
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m pebbling.admin", description="Pebbling 卡片表维护工具")
+    parser.add_argument("--secrets", help="secrets.toml 路径，默认 .streamlit/secrets.toml")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    histogram_parser = subparsers.add_parser("histogram", help="各状态的卡片数")
+    fix_parsers = [
+        subparsers.add_parser("normalise-statuses", help="把包含规范状态的变体（如多余空格）改回规范状态"),
+        subparsers.add_parser("fill-empty", help=f"把空状态改为“{DEFAULT_STATUS}”"),
+        subparsers.add_parser("fix-all", help="依次执行 " + "、".join(FIX_ALL)),
+    ]
+    for sub in [histogram_parser] + fix_parsers:
+        sub.add_argument("--table", choices=CARD_TABLES, action="append", help="只处理这张表，可重复；默认两张都处理")
+    fix_parsers[0].add_argument("--status", choices=CARD_STATUSES, action="append",
+                                help="只修正这个状态的变体，可重复；默认全部规范状态")
+    for sub in fix_parsers:
+        sub.add_argument("--dry-run", action="store_true", help="只统计会被改动的行数，不写入")
+        sub.add_argument("--confirm", action="store_true", help="先统计会被改动的行数，输入 y 确认后才写入")
+    args = parser.parse_args(argv)
+
+    client = get_client(load_secrets(args.secrets))
+    tables = args.table or CARD_TABLES
+
+    if args.command == "histogram":
+        for table in tables:
+            counts = status_counts(client, table)
+            print(f"📊 {table}: 共 {sum(counts.values())} 张")
+            for status, count in sorted(counts.items(), key=lambda item: -item[1]):
+                print(f"  {status}: {count}")
+        return
+
+    names = FIX_ALL if args.command == "fix-all" else [args.command]
+    statuses = getattr(args, "status", None)
+
+    def run(dry_run):
+        return [result for name in names for result in run_fix(client, name, tables, dry_run, statuses)]
+
+    if args.confirm and not args.dry_run:
+        pending = _report(run(True), True)
+        if not pending:
+            return
+        if input(f"\n是否修复这 {pending} 张卡片? (y/n): ").strip().lower() != "y":
+            print("❌ 取消修复")
+            return
+    _report(run(args.dry_run), args.dry_run)
+
+
+if __name__ == "__main__":
+    main()
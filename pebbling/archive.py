@@ -0,0 +1,340 @@
+"""卡片快照的按月归档：每月一个只追加的 JSONL 文件，加一份 id -> (月份, 偏移, 长度) 的索引。
+
+    archive/daily_cards/2025-05.jsonl   # 每行 {"seq": n, "card": {...}}，删除写墓碑行 {"seq": n, "id": id, "deleted": true}
+    archive/daily_cards/index.json      # {"files": {月份: 字节数}, "seq": 下一个序号, "ids": {id: [月份, 偏移, 长度]}}
+
+同一张卡片以 seq 最大的那行为准；索引里的字节数与文件对不上时从数据文件重建。
+
+    python -m pebbling.archive pack daily_cards              # word_cards/ -> archive/daily_cards/
+    python -m pebbling.archive unpack daily_cards out_dir    # 还原成每张卡片一个文件
+    python -m pebbling.archive get daily_cards 42
+    python -m pebbling.archive bench --cards 20000           # 与逐文件目录的基准对比
+"""
+
+import argparse
+import json
+import os
+import random
+import shutil
+import tempfile
+import time
+from pathlib import Path
+
+from pebbling.cards import DAILY_TABLE, TIQIAO_TABLE, CARD_TABLES, ROOT, SNAPSHOT_DIRS
+
+DEFAULT_ARCHIVE_DIR = ROOT / "archive"
+INDEX_NAME = "index.json"
+UNDATED = "undated"
+# 每张卡片一个文件时的文件名：{date}_{前缀}_{id}.json，与仓库里现有的快照一致
+FILE_PREFIXES = {DAILY_TABLE: "word", TIQIAO_TABLE: "tiq"}
+
+
+def month_of(card):
+    date = str(card.get("date") or "")
+    return date[:7] if len(date) >= 7 and date[4] == "-" else UNDATED
+
+
+def _record_id(record):
+    return record["id"] if "id" in record else record["card"]["id"]
+
+
+class CardArchive:
+    """一张卡片表的归档目录；写入方法会立即落盘索引，读方法可以随意调用。"""
+
+    def __init__(self, table, root=DEFAULT_ARCHIVE_DIR):
+        self.table = table
+        self.path = Path(root) / table
+        self.path.mkdir(parents=True, exist_ok=True)
+        self._ids = {}    # id -> (月份, 偏移, 长度)
+        self._files = {}  # 月份 -> 字节数
+        self._seq = 0     # 下一行的序号
+        self._readers = {}  # 月份 -> 打开的只读文件，get 反复查找时复用
+        self._load_index()
+
+    def _month_path(self, month):
+        return self.path / f"{month}.jsonl"
+
+    def _actual_sizes(self):
+        return {p.stem: p.stat().st_size for p in self.path.glob("*.jsonl")}
+
+    def _load_index(self):
+        index_path = self.path / INDEX_NAME
+        if index_path.exists():
+            index = json.loads(index_path.read_text(encoding="utf-8"))
+            if "seq" in index and index.get("files") == self._actual_sizes():
+                self._files = index["files"]
+                self._seq = index["seq"]
+                self._ids = {int(card_id): tuple(loc) for card_id, loc in index["ids"].items()}
+                return
+        self.rebuild_index()
+
+    def _save_index(self):
+        index_path = self.path / INDEX_NAME
+        tmp_path = index_path.with_suffix(".tmp")
+        tmp_path.write_text(json.dumps({
+            "files": self._files,
+            "seq": self._seq,
+            "ids": {str(card_id): list(loc) for card_id, loc in self._ids.items()},
+        }, ensure_ascii=False), encoding="utf-8")
+        os.replace(tmp_path, index_path)
+
+    def _lines(self, month):
+        """逐行产出 (偏移, 长度, 行内容)。"""
+        offset = 0
+        with open(self._month_path(month), "rb") as f:
+            for line in f:
+                yield offset, len(line), line
+                offset += len(line)
+
+    def rebuild_index(self):
+        """从数据文件重建索引：每张卡片取 seq 最大的一行，那一行是墓碑时卡片已删除。"""
+        latest = {}  # id -> (seq, 位置；墓碑为 None)
+        self._files = self._actual_sizes()
+        self._seq = 0
+        for month in sorted(self._files):
+            for offset, length, line in self._lines(month):
+                record = json.loads(line)
+                card_id = _record_id(record)
+                if card_id not in latest or record["seq"] > latest[card_id][0]:
+                    latest[card_id] = (record["seq"], None if record.get("deleted") else (month, offset, length))
+                self._seq = max(self._seq, record["seq"] + 1)
+        self._ids = {card_id: loc for card_id, (_, loc) in latest.items() if loc is not None}
+        self._save_index()
+
+    def __len__(self):
+        return len(self._ids)
+
+    def __contains__(self, card_id):
+        return card_id in self._ids
+
+    def get(self, card_id):
+        """按 id 读一张卡片，不存在时返回 None。"""
+        loc = self._ids.get(card_id)
+        if loc is None:
+            return None
+        month, offset, length = loc
+        f = self._readers.get(month)
+        if f is None:
+            f = self._readers[month] = open(self._month_path(month), "rb")
+        f.seek(offset)
+        return json.loads(f.read(length))["card"]
+
+    def close(self):
+        for f in self._readers.values():
+            f.close()
+        self._readers = {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def scan(self):
+        """按月份顺序产出每张卡片的最新版本。"""
+        for month in sorted(self._files):
+            for offset, length, line in self._lines(month):
+                record = json.loads(line)
+                if self._ids.get(_record_id(record)) == (month, offset, length):
+                    yield record["card"]
+
+    def iter_chunks(self, chunk_size):
+        """逐块产出卡片，接口与 pebbling.transfer 的 iter_*_chunks 相同。"""
+        chunk = []
+        for card in self.scan():
+            chunk.append(card)
+            if len(chunk) >= chunk_size:
+                yield chunk
+                chunk = []
+        if chunk:
+            yield chunk
+
+    def _append_lines(self, by_month):
+        """by_month: {月份: [(id 或 None, 行字节)]}；追加写入并更新索引，id 为 None 的是墓碑行。"""
+        for month, lines in by_month.items():
+            path = self._month_path(month)
+            with open(path, "ab") as f:
+                offset = f.tell()
+                for card_id, data in lines:
+                    f.write(data)
+                    if card_id is not None:
+                        self._ids[card_id] = (month, offset, len(data))
+                    offset += len(data)
+            self._files[month] = path.stat().st_size
+        self._save_index()
+
+    def _line(self, record):
+        record = {"seq": self._seq, **record}
+        self._seq += 1
+        return json.dumps(record, ensure_ascii=False).encode("utf-8") + b"\n"
+
+    def append(self, cards):
+        """追加（或更新）卡片，每张卡片必须有 id；返回写入的张数。
+
+        卡片改到别的月份时旧月份里的那行不用动：新行的 seq 更大，重建索引时自然以新行为准。
+        """
+        # 同一批里重复的 id 只写最后一个版本，免得按月份分组写入后索引指向较旧的那行
+        by_month = {}
+        for card in {card["id"]: card for card in cards}.values():
+            by_month.setdefault(month_of(card), []).append((card["id"], self._line({"card": card})))
+        self._append_lines(by_month)
+        return sum(len(lines) for lines in by_month.values())
+
+    def delete(self, ids):
+        by_month = {}
+        for card_id in ids:
+            loc = self._ids.pop(card_id, None)
+            if loc is not None:
+                by_month.setdefault(loc[0], []).append((None, self._line({"id": card_id, "deleted": True})))
+        self._append_lines(by_month)
+        return sum(len(lines) for lines in by_month.values())
+
+    def _rewrite(self, keep):
+        """按 keep(月份, 偏移, 长度, 记录) 逐个月份重写文件，整个文件都不保留时删掉它。"""
+        for month in sorted(self._files):
+            kept = [line for offset, length, line in self._lines(month)
+                    if keep(month, offset, length, json.loads(line))]
+            tmp_path = self._month_path(month).with_suffix(".tmp")
+            tmp_path.write_bytes(b"".join(kept))
+            if kept:
+                os.replace(tmp_path, self._month_path(month))
+            else:
+                tmp_path.unlink()
+                self._month_path(month).unlink()
+
+    def compact(self):
+        """重写所有月份文件，只保留最新版本；返回回收的字节数。
+
+        分两遍：先去掉旧版本、保留墓碑，再去掉墓碑。中途退出时，已删除的卡片不会因为
+        墓碑先没了、旧版本还在别的月份里而在重建索引后复活。
+        """
+        before = sum(self._files.values())
+        self.close()
+        self._rewrite(lambda month, offset, length, record:
+                      record.get("deleted") or self._ids.get(_record_id(record)) == (month, offset, length))
+        self._rewrite(lambda month, offset, length, record: not record.get("deleted"))
+        self.rebuild_index()
+        return before - sum(self._files.values())
+
+
+def pack_folder(folder, archive, chunk_size=500, workers=8):
+    """把每张卡片一个文件的目录追加进归档，返回张数。"""
+    from pebbling.transfer import iter_folder_chunks
+
+    count = 0
+    for chunk in iter_folder_chunks(folder, chunk_size, workers):
+        count += archive.append(chunk)
+    return count
+
+
+def unpack_archive(archive, folder):
+    """把归档还原成每张卡片一个文件的目录，文件名与仓库里的快照相同，返回张数。"""
+    folder = Path(folder)
+    folder.mkdir(parents=True, exist_ok=True)
+    prefix = FILE_PREFIXES[archive.table]
+    count = 0
+    for card in archive.scan():
+        name = f"{card.get('date') or 'nodate'}_{prefix}_{card['id']}.json"
+        (folder / name).write_text(json.dumps(card, ensure_ascii=False, indent=2), encoding="utf-8")
+        count += 1
+    return count
+
+
+def _timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return time.perf_counter() - start, result
+
+
+def _disk_usage(folder):
+    """目录下文件实际占用的磁盘块，小文件按整块计。"""
+    return sum(p.stat().st_blocks * 512 for p in Path(folder).iterdir())
+
+
+def benchmark(cards=20000, lookups=1000, workdir=None):
+    """在临时目录里生成 cards 张每日词卡，对比逐文件目录与归档的打包体积、全量扫描和按 id 查找。"""
+    from pebbling.transfer import iter_folder_chunks
+
+    workdir = Path(workdir or tempfile.mkdtemp(prefix="pebbling-archive-"))
+    folder = workdir / "word_cards"
+    folder.mkdir(parents=True, exist_ok=True)
+    sample = [{
+        "id": i, "date": f"2025-{i % 12 + 1:02d}-{i % 28 + 1:02d}", "title": f"word{i}", "status": "已推送",
+        "data": {"音标": "wɜːd", "释义": "释义 " * 20, "例句": "An example sentence. " * 3, "备注": "", "source": ""},
+    } for i in range(1, cards + 1)]
+    archive = CardArchive(DAILY_TABLE, workdir / "archive")
+    try:
+        for card in sample:
+            (folder / f"{card['date']}_word_{card['id']}.json").write_text(
+                json.dumps(card, ensure_ascii=False, indent=2), encoding="utf-8")
+        pack_seconds, _ = _timed(lambda: pack_folder(folder, archive))
+        ids = random.Random(0).sample(range(1, cards + 1), min(lookups, cards))
+
+        names_seconds, names = _timed(
+            lambda: {int(name.rsplit("_", 1)[1][:-5]): name for name in os.listdir(folder)})
+        index_seconds, fresh = _timed(lambda: CardArchive(DAILY_TABLE, workdir / "archive"))
+        with fresh:
+            lookup_rows = [
+                ("打开（列目录 / 读索引）", names_seconds, index_seconds),
+                (f"按 id 查找 {len(ids)} 次",
+                 _timed(lambda: [json.loads((folder / names[i]).read_text(encoding="utf-8")) for i in ids])[0],
+                 _timed(lambda: [fresh.get(i) for i in ids])[0]),
+            ]
+        rows = [
+            ("全量扫描", _timed(lambda: sum(len(c) for c in iter_folder_chunks(folder)))[0],
+             _timed(lambda: sum(1 for _ in CardArchive(DAILY_TABLE, workdir / "archive").scan()))[0]),
+            *lookup_rows,
+        ]
+        print(f"{cards} 张卡片：逐文件 {len(os.listdir(folder))} 个文件 "
+              f"{_disk_usage(folder) / 1e6:.1f} MB，归档 {len(archive._files)} 个月份文件 "
+              f"{_disk_usage(archive.path) / 1e6:.1f} MB（打包用时 {pack_seconds:.2f}s）")
+        for name, folder_seconds, archive_seconds in rows:
+            print(f"{name}: 逐文件 {folder_seconds * 1000:.0f} ms，归档 {archive_seconds * 1000:.0f} ms"
+                  f"（{folder_seconds / archive_seconds:.1f}x）")
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m pebbling.archive", description="卡片快照归档工具")
+    parser.add_argument("--archive", default=str(DEFAULT_ARCHIVE_DIR), help="归档根目录")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    pack_parser = subparsers.add_parser("pack", help="逐文件目录 -> 归档")
+    pack_parser.add_argument("table", choices=CARD_TABLES)
+    pack_parser.add_argument("--folder", help="默认仓库里对应的快照目录")
+    unpack_parser = subparsers.add_parser("unpack", help="归档 -> 逐文件目录")
+    unpack_parser.add_argument("table", choices=CARD_TABLES)
+    unpack_parser.add_argument("folder")
+    get_parser = subparsers.add_parser("get", help="按 id 读一张卡片")
+    get_parser.add_argument("table", choices=CARD_TABLES)
+    get_parser.add_argument("id", type=int)
+    compact_parser = subparsers.add_parser("compact", help="去掉旧版本和墓碑行")
+    compact_parser.add_argument("table", choices=CARD_TABLES)
+    bench_parser = subparsers.add_parser("bench", help="与逐文件目录的基准对比")
+    bench_parser.add_argument("--cards", type=int, default=20000)
+    bench_parser.add_argument("--lookups", type=int, default=1000)
+    args = parser.parse_args(argv)
+
+    if args.command == "bench":
+        benchmark(args.cards, args.lookups)
+        return
+    with CardArchive(args.table, args.archive) as archive:
+        _run(args, archive)
+
+
+def _run(args, archive):
+    if args.command == "pack":
+        count = pack_folder(args.folder or SNAPSHOT_DIRS[args.table], archive)
+        print(f"已归档 {count} 张卡片到 {archive.path}（共 {len(archive)} 张）")
+    elif args.command == "unpack":
+        print(f"已还原 {unpack_archive(archive, args.folder)} 张卡片到 {args.folder}")
+    elif args.command == "get":
+        card = archive.get(args.id)
+        print(json.dumps(card, ensure_ascii=False, indent=2) if card else f"归档里没有 id {args.id}")
+    else:
+        print(f"已回收 {archive.compact() / 1024:.0f} KB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+"""进程级卡片缓存。"""
+
+import threading
+import time
+
+
+class CardCache:
+    """进程级卡片缓存：按 key 保存拉取结果，超过 TTL 或写入后失效，并统计命中/未命中次数。
+
+    key 为元组，第一个元素是表名，invalidate(table) 会清掉该表下的所有条目。
+    """
+
+    def __init__(self, ttl_seconds):
+        self.ttl_seconds = ttl_seconds
+        self.hits = 0
+        self.misses = 0
+        self._entries = {}       # key -> (拉取时间, 数据)
+        self._generations = {}   # table -> 失效次数，用于丢弃失效前发起的拉取结果
+        self._lock = threading.Lock()
+
+    def get(self, key, fetch):
+        table = key[0]
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and time.monotonic() - entry[0] < self.ttl_seconds:
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+            generation = self._generations.get(table, 0)
+        data = fetch()
+        with self._lock:
+            # 拉取期间如果有写入导致失效，这份结果可能已过时，不写回缓存
+            if self._generations.get(table, 0) == generation:
+                self._entries[key] = (time.monotonic(), data)
+        return data
+
+    def invalidate(self, table=None):
+        with self._lock:
+            if table is None:
+                tables = {k[0] for k in self._entries} | set(self._generations)
+            else:
+                tables = {table}
+            for t in tables:
+                self._generations[t] = self._generations.get(t, 0) + 1
+            self._entries = {k: v for k, v in self._entries.items() if k[0] not in tables}
+
+    def stats(self):
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / total if total else 0.0,
+                "entries": len(self._entries),
+            }
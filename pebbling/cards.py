@@ -0,0 +1,160 @@
+"""每日词卡 / 推敲词卡的数据访问层。
+
+界面和维护脚本都通过 CardRepository 读写卡片表；写入失败抛出 RuntimeError。
+"""
+
+import datetime
+from pathlib import Path
+
+from pebbling.dedupe import remove_duplicates
+from pebbling.hashing import daily_content_hash, tiqiao_content_hash, fetch_cards_by_hash
+from pebbling.paging import iter_cards, fetch_card_window, fetch_card_range, locate_card
+from pebbling.status import transition_card_status
+
+DAILY_TABLE = "daily_cards"
+TIQIAO_TABLE = "tiqiao_cards"
+CARD_TABLES = (DAILY_TABLE, TIQIAO_TABLE)
+# 规范状态，按审阅流程排序
+CARD_STATUSES = ("未审阅", "已审阅", "待推送", "已推送")
+DEFAULT_STATUS = CARD_STATUSES[0]
+# 统计和直方图里空状态（NULL 或空字符串）的显示名
+EMPTY_LABEL = "空状态"
+# 推敲词卡的文本字段；顺序与 content_hash 生成列的拼接顺序一致，不能调换
+TIQIAO_TEXT_FIELDS = ["orig_cn", "orig_en", "meaning", "recommend", "qtype"]
+# 仓库里每张卡片一个 JSON 文件的快照目录
+ROOT = Path(__file__).resolve().parent.parent
+SNAPSHOT_DIRS = {DAILY_TABLE: ROOT / "word_cards", TIQIAO_TABLE: ROOT / "tiqiao_cards"}
+# 服务端全文检索：supabase/migrations/20261017000700_card_search.sql 的 RPC 和两列生成列
+SEARCH_RPC = "search_cards"
+SEARCH_COLUMNS = ("search_text", "search_tsv")
+DEFAULT_SEARCH_LIMIT = 50
+
+
+def _check(res, action):
+    if hasattr(res, "error") and res.error:
+        raise RuntimeError(f"Supabase {action}失败: {res.error}")
+    return res
+
+
+def search_terms(query):
+    """查询按空白切成小写的词；每个词都要以子串出现在卡片里才算匹配。"""
+    return str(query or "").lower().split()
+
+
+class CardRepository:
+    """一张卡片表的读写入口；client 为 Supabase 客户端（或接口相同的替身）。"""
+
+    def __init__(self, client, table):
+        self.client = client
+        self.table = table
+
+    def query(self, status=None, limit=None, columns="*"):
+        """按 id 降序查询，返回 (cards, has_more)；limit 为 None 时分页取回全部匹配行。"""
+        if limit is None:
+            return list(iter_cards(self.client, self.table, columns=columns, status=status)), False
+        return fetch_card_window(self.client, self.table, limit, columns=columns, status=status)
+
+    def iter(self, status=None, columns="*"):
+        return iter_cards(self.client, self.table, columns=columns, status=status)
+
+    def page(self, offset, limit, status=None, columns="*"):
+        """返回 (rows, total)，用于按页码翻页。"""
+        return fetch_card_range(self.client, self.table, offset, limit, columns=columns, status=status)
+
+    def locate(self, card_id, status=None):
+        """card_id 在按 id 降序的列表中的位置，不存在时为 None。"""
+        return locate_card(self.client, self.table, card_id, status)
+
+    def search(self, query, status=None, limit=DEFAULT_SEARCH_LIMIT, offset=0):
+        """全文检索，按相关度排序，返回 (rows, total)；limit 为 None 时不分页。"""
+        if not search_terms(query):
+            return [], 0
+
+        def call(limit, offset):
+            res = _check(self.client.rpc(SEARCH_RPC, {
+                "p_table": self.table,
+                "p_query": query,
+                "p_statuses": [status] if isinstance(status, str) else (list(status) if status else None),
+                "p_limit": limit,
+                "p_offset": offset,
+            }).execute(), "搜索")
+            return res.data or []
+
+        results = call(limit, offset)
+        if not results and offset:
+            # 翻过了最后一页：取一行只为拿到总数
+            total = sum(row["total"] for row in call(1, 0))
+        else:
+            total = results[0]["total"] if results else 0
+        return [row["card"] for row in results], total
+
+    def insert(self, row):
+        return _check(self.client.table(self.table).insert(row).execute(), "插入").data
+
+    def update(self, card_id, fields):
+        return _check(self.client.table(self.table).update(fields).eq("id", card_id).execute(), "更新").data
+
+    def delete(self, card_id):
+        return _check(self.client.table(self.table).delete().eq("id", card_id).execute(), "删除").data
+
+    def transition(self, ids, from_statuses, to_status):
+        return transition_card_status(self.client, self.table, ids, from_statuses, to_status)
+
+    def remove_duplicates(self, dry_run=True):
+        return remove_duplicates(self.client, self.table, dry_run=dry_run)
+
+
+def daily_card_row(card_data, original=None):
+    """表单数据 -> daily_cards 行；编辑时 original 提供原卡片的 date。"""
+    default_date = (original or {}).get("date") or datetime.date.today().isoformat()
+    return {
+        "title": card_data.get("title", ""),
+        "status": card_data.get("status", DEFAULT_STATUS),
+        "date": card_data.get("date", default_date),
+        "data": card_data.get("data", {}),
+    }
+
+
+def tiqiao_card_row(card_data, original=None):
+    """表单数据 -> tiqiao_cards 行；编辑时 original 提供原卡片的 date。"""
+    default_date = (original or {}).get("date") or datetime.date.today().isoformat()
+    row = {
+        "status": card_data.get("status", DEFAULT_STATUS),
+        "date": card_data.get("date", default_date),
+    }
+    row.update({field: card_data.get(field, "") for field in TIQIAO_TEXT_FIELDS})
+    return row
+
+
+def card_content_hash(table, card):
+    """card 为 table 的一行，返回与数据库生成列 content_hash 相同的哈希。"""
+    if table == DAILY_TABLE:
+        return daily_content_hash(card.get("title"))
+    return tiqiao_content_hash(card.get(field) for field in TIQIAO_TEXT_FIELDS)
+
+
+def insert_new_cards(client, cards, table=DAILY_TABLE, dry_run=False):
+    """批内按内容哈希去重，再一次查询排除库里已有的卡片，剩下的一次批量插入，返回要插入/已插入的卡片。"""
+    by_hash = {}
+    for card in cards:
+        by_hash.setdefault(card_content_hash(table, card), card)
+    existing = {row["content_hash"] for row in fetch_cards_by_hash(client, table, list(by_hash), "content_hash")}
+    new_cards = [card for key, card in by_hash.items() if key not in existing]
+    if new_cards and not dry_run:
+        res = client.table(table).insert(new_cards).execute()
+        if hasattr(res, "error") and res.error:
+            raise RuntimeError(f"Supabase 批量插入失败: {res.error}")
+    return new_cards
+
+
+def daily_cards(client):
+    return CardRepository(client, DAILY_TABLE)
+
+
+def tiqiao_cards(client):
+    return CardRepository(client, TIQIAO_TABLE)
+
+
+def search_cards(client, query, table=DAILY_TABLE, status=None, limit=DEFAULT_SEARCH_LIMIT, offset=0):
+    """在 Supabase 上全文检索一张卡片表，返回 (rows, total)。"""
+    return CardRepository(client, table).search(query, status, limit, offset)
@@ -0,0 +1,28 @@
+"""Supabase 客户端工厂；supabase 包在第一次真正需要客户端时才导入。"""
+
+import threading
+
+from pebbling.config import load_secrets
+
+_clients = {}
+_lock = threading.Lock()
+
+
+def create_supabase_client(url, key):
+    """新建一个客户端。url / key 缺失时抛出 RuntimeError，提示去检查配置。"""
+    if not url or not key:
+        raise RuntimeError("缺少 Supabase 配置：请在 .streamlit/secrets.toml 的 [supabase] 中填写 url 和 key，"
+                           "或设置环境变量 SUPABASE_URL / SUPABASE_KEY")
+    from supabase import create_client
+
+    return create_client(url, key)
+
+
+def get_client(secrets=None):
+    """返回进程内共享的客户端；secrets 缺省时读取 load_secrets()。"""
+    config = (secrets if secrets is not None else load_secrets()).get("supabase", {})
+    key = (config.get("url"), config.get("key"))
+    with _lock:
+        if key not in _clients:
+            _clients[key] = create_supabase_client(*key)
+        return _clients[key]
@@ -0,0 +1,20 @@
+"""读取 .streamlit/secrets.toml，供不经过 Streamlit 运行的脚本使用。"""
+
+import os
+from pathlib import Path
+
+import toml
+
+# 默认读取项目根目录下的 .streamlit/secrets.toml，可用环境变量 PEBBLING_SECRETS 指定其他文件
+SECRETS_PATH = Path(__file__).resolve().parent.parent / ".streamlit" / "secrets.toml"
+
+
+def load_secrets(path=None):
+    """返回 secrets 字典；文件不存在时返回空配置，supabase 段可由环境变量补齐。"""
+    path = Path(path or os.getenv("PEBBLING_SECRETS") or SECRETS_PATH)
+    secrets = toml.load(path) if path.exists() else {}
+    supabase_config = secrets.setdefault("supabase", {})
+    # 与 Streamlit Cloud 等部署方式保持一致：环境变量 SUPABASE_URL / SUPABASE_KEY 兜底
+    supabase_config.setdefault("url", os.getenv("SUPABASE_URL"))
+    supabase_config.setdefault("key", os.getenv("SUPABASE_KEY"))
+    return secrets
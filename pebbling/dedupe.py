@@ -0,0 +1,48 @@
+"""按 content_hash 清理服务端的重复卡片，每组保留 id 最小的一张。"""
+
+from pebbling.paging import iter_cards, DEFAULT_PAGE_SIZE
+from pebbling.status import ID_CHUNK_SIZE
+
+
+def find_duplicate_groups(client, table, page_size=DEFAULT_PAGE_SIZE):
+    """分页扫描整张表，返回只含重复组的 {content_hash: [id, ...]}，组内 id 升序。"""
+    groups = {}
+    for card in iter_cards(client, table, page_size, columns="id,content_hash"):
+        content_hash = card.get("content_hash")
+        if content_hash:
+            groups.setdefault(content_hash, []).append(card["id"])
+    return {h: sorted(ids) for h, ids in groups.items() if len(ids) > 1}
+
+
+def delete_cards(client, table, ids, chunk_size=ID_CHUNK_SIZE, progress=None):
+    """分块删除，每块一次 delete ... in_("id") 请求，返回实际删除的行数。"""
+    ids = list(ids)
+    deleted = 0
+    for start in range(0, len(ids), chunk_size):
+        chunk = ids[start:start + chunk_size]
+        res = client.table(table).delete().in_("id", chunk).execute()
+        if hasattr(res, "error") and res.error:
+            raise RuntimeError(f"Supabase 删除失败: {res.error}")
+        deleted += len(res.data or [])
+        if progress:
+            progress(start + len(chunk), len(ids))
+    return deleted
+
+
+def remove_duplicates(client, table, dry_run=True, page_size=DEFAULT_PAGE_SIZE, progress=None):
+    """查找并（dry_run=False 时）删除重复卡片。
+
+    返回 {"groups": 重复组数, "duplicates": 待删除条数, "deleted": 实际删除条数,
+    "largest": 最大的几组 [(content_hash, [id, ...]), ...]}；dry_run 时 deleted 为 0。
+    """
+    groups = find_duplicate_groups(client, table, page_size)
+    losers = [card_id for ids in groups.values() for card_id in ids[1:]]
+    report = {
+        "groups": len(groups),
+        "duplicates": len(losers),
+        "deleted": 0,
+        "largest": sorted(groups.items(), key=lambda item: len(item[1]), reverse=True)[:10],
+    }
+    if not dry_run and losers:
+        report["deleted"] = delete_cards(client, table, losers, progress=progress)
+    return report
@@ -0,0 +1,59 @@
+"""按收件人的投递记录（card_deliveries）和增量推送。
+
+表和函数见 supabase/migrations/20261017000400_card_deliveries.sql；投递记录上线前就已推送的卡片
+由 20261017000800_card_deliveries_backfill.sql 补记为发给了所有人（ALL_RECIPIENTS）。
+"""
+
+from pebbling.paging import DEFAULT_PAGE_SIZE
+from pebbling.status import ID_CHUNK_SIZE
+
+DELIVERIES_TABLE = "card_deliveries"
+# 增量推送的候选卡片：已经放行推送的状态
+INCREMENTAL_STATUSES = ("待推送", "已推送")
+# 迁移补记的投递记录用的收件人：视为已经发给了所有人
+ALL_RECIPIENTS = "*"
+
+
+def record_deliveries(client, table, card_ids, recipients, push_job_id=None):
+    """记录 card_ids 已发给 recipients；重复记录会被忽略，重试同一块不会报错。"""
+    rows = [
+        {"table_name": table, "recipient": recipient, "card_id": card_id, "push_job_id": push_job_id}
+        for recipient in recipients for card_id in card_ids
+    ]
+    for start in range(0, len(rows), ID_CHUNK_SIZE):
+        res = client.table(DELIVERIES_TABLE).upsert(
+            rows[start:start + ID_CHUNK_SIZE], on_conflict="table_name,recipient,card_id", ignore_duplicates=True,
+        ).execute()
+        if hasattr(res, "error") and res.error:
+            raise RuntimeError(f"Supabase 记录投递失败: {res.error}")
+
+
+def undelivered_card_ids(client, table, recipient, statuses=INCREMENTAL_STATUSES, page_size=DEFAULT_PAGE_SIZE):
+    """recipient 还没收到的卡片 id（升序）；按 id 游标翻页调用 RPC，不会被 max-rows 截断。"""
+    ids = []
+    after_id = None
+    while True:
+        res = client.rpc("undelivered_card_ids", {
+            "p_table": table,
+            "p_recipient": recipient,
+            "p_statuses": list(statuses) if statuses else None,
+            "p_after_id": after_id,
+            "p_limit": page_size,
+        }).execute()
+        page = [row["id"] for row in (res.data or [])]
+        ids.extend(page)
+        if len(page) < page_size:
+            return ids
+        after_id = page[-1]
+
+
+def delivered_card_ids(client, table, card_ids, recipient):
+    """card_ids 中已经发给 recipient（或补记为发给所有人）的那部分，发信前用来去掉重复。"""
+    delivered = set()
+    card_ids = list(card_ids)
+    for start in range(0, len(card_ids), ID_CHUNK_SIZE):
+        res = (client.table(DELIVERIES_TABLE).select("card_id")
+               .eq("table_name", table).in_("recipient", [recipient, ALL_RECIPIENTS])
+               .in_("card_id", card_ids[start:start + ID_CHUNK_SIZE]).execute())
+        delivered.update(row["card_id"] for row in (res.data or []))
+    return delivered
@@ -0,0 +1,42 @@
+"""卡片内容哈希（去重键），与数据库中生成列 content_hash 的计算方式一致。
+
+见 supabase/migrations/20261017000100_card_content_hash.sql：
+连续空白合并为一个空格并去掉首尾空格；每日词卡只看标题且不区分大小写，
+推敲词卡按 pebbling.cards.TIQIAO_TEXT_FIELDS 的顺序看五个文本字段。
+"""
+
+import hashlib
+import re
+
+# in_ 过滤写在 URL 里，每个哈希 32 个字符，分块查询避免 URL 过长
+HASH_CHUNK_SIZE = 100
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalise_text(value):
+    return _WHITESPACE.sub(" ", "" if value is None else str(value)).strip(" ")
+
+
+def _md5(text):
+    return hashlib.md5(text.encode("utf-8")).hexdigest()
+
+
+def daily_content_hash(title):
+    return _md5(normalise_text(title).lower())
+
+
+def tiqiao_content_hash(values):
+    """values 为按 TIQIAO_TEXT_FIELDS 顺序排列的五个文本字段；按表选择字段见 pebbling.cards.card_content_hash。"""
+    return _md5("\x1f".join(normalise_text(value) for value in values))
+
+
+def fetch_cards_by_hash(client, table, hashes, columns="*"):
+    """按 content_hash 分块查询已有卡片，走索引，只返回命中的行。"""
+    hashes = list(dict.fromkeys(hashes))
+    rows = []
+    for start in range(0, len(hashes), HASH_CHUNK_SIZE):
+        chunk = hashes[start:start + HASH_CHUNK_SIZE]
+        res = client.table(table).select(columns).in_("content_hash", chunk).execute()
+        rows.extend(res.data or [])
+    return rows
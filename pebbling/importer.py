@@ -0,0 +1,145 @@
+"""Excel 批量导入：按内容哈希比对库里已有的卡片，只插入新卡片、更新有变化的卡片。
+
+同一份表格重复上传时只产生查询，不产生写入。
+"""
+
+import datetime
+
+from pebbling.cards import DEFAULT_STATUS, TIQIAO_TABLE, TIQIAO_TEXT_FIELDS, card_content_hash
+from pebbling.hashing import daily_content_hash, fetch_cards_by_hash
+
+DEFAULT_BATCH_SIZE = 500
+
+# Excel 列名 -> 规范化后的列名
+DAILY_IMPORT_COLUMNS = {
+    "Word": "title",
+    "Phonetic": "音标",
+    "Definition": "释义",
+    "Example": "例句",
+    "Note": "备注",
+    "Source URL": "source",
+    "Status": "status",
+}
+DAILY_DATA_FIELDS = ["音标", "释义", "例句", "备注", "source"]
+
+TIQIAO_IMPORT_COLUMNS = {
+    "原始中文": "orig_cn",
+    "原始英文": "orig_en",
+    "真实内涵": "meaning",
+    "推荐英文": "recommend",
+    "问题类型": "qtype",
+    "状态": "status",
+}
+
+
+def upload_file_id(uploaded_file):
+    """上传文件的标识，界面用它避免 rerun 时把同一次上传重复导入。
+
+    同一次上传的 file_id 不变；旧版 Streamlit 没有 file_id 时退回到文件名 + 大小。
+    """
+    return getattr(uploaded_file, "file_id", None) or (uploaded_file.name, uploaded_file.size)
+
+
+def _normalise_frame(df, columns):
+    # reindex 补齐缺失列，整列转字符串并去掉首尾空格
+    frame = df.reindex(columns=list(columns)).fillna("").rename(columns=columns)
+    for col in frame.columns:
+        frame[col] = frame[col].astype(str).str.strip()
+    return frame
+
+
+def normalise_daily_frame(df):
+    """规范化每日词卡表格，新增 key 列（标题的内容哈希）；无标题的行被丢弃，重复标题保留最后一行。"""
+    frame = _normalise_frame(df, DAILY_IMPORT_COLUMNS)
+    frame = frame[frame["title"] != ""].copy()
+    frame["key"] = frame["title"].map(daily_content_hash)
+    return frame.drop_duplicates("key", keep="last")
+
+
+def normalise_tiqiao_frame(df):
+    """规范化推敲词卡表格，新增 key 列（五个文本字段的内容哈希）；全空行被丢弃，重复内容只留一行。"""
+    frame = _normalise_frame(df, TIQIAO_IMPORT_COLUMNS)
+    frame = frame[(frame[TIQIAO_TEXT_FIELDS] != "").any(axis=1)].copy()
+    frame["key"] = [card_content_hash(TIQIAO_TABLE, row) for row in frame[TIQIAO_TEXT_FIELDS].to_dict("records")]
+    return frame.drop_duplicates("key", keep="last")
+
+
+def find_existing_by_hash(client, table, frame, columns):
+    """只查询与表格中哈希相同的已有卡片，返回 {content_hash: card}。"""
+    rows = fetch_cards_by_hash(client, table, frame["key"].tolist(), columns)
+    # 库里可能本来就有重复卡片，统一比对 id 最小的那一张
+    existing = {}
+    for row in sorted(rows, key=lambda r: r["id"]):
+        existing.setdefault(row["content_hash"], row)
+    return existing
+
+
+def plan_daily_import(frame, existing_by_key):
+    """按 key 与已有卡片比对，返回 (inserts, upserts, unchanged)。
+
+    已有卡片保留原 status 和 date，内容完全相同的不再写入。
+    existing_by_key 中的卡片需要包含 id、title、status、date、data。
+    """
+    today = datetime.date.today().isoformat()
+    inserts, upserts = [], []
+    unchanged = 0
+    for row in frame.to_dict("records"):
+        data = {field: row[field] for field in DAILY_DATA_FIELDS}
+        original = existing_by_key.get(row["key"])
+        if original and original.get("title") == row["title"] and (original.get("data") or {}) == data:
+            unchanged += 1
+        elif original:
+            upserts.append({
+                "id": original.get("id"),
+                "title": row["title"],
+                "status": original.get("status") or DEFAULT_STATUS,
+                "date": original.get("date") or today,
+                "data": data,
+            })
+        else:
+            inserts.append({
+                "title": row["title"],
+                "status": row["status"] or DEFAULT_STATUS,
+                "date": today,
+                "data": data,
+            })
+    return inserts, upserts, unchanged
+
+
+def plan_tiqiao_import(frame, existing_by_key):
+    """按 key 与已有卡片比对，返回 (inserts, upserts, unchanged)。
+
+    推敲词卡的哈希覆盖全部文本字段，命中即内容相同，所以不会产生更新。
+    """
+    today = datetime.date.today().isoformat()
+    inserts = []
+    unchanged = 0
+    for row in frame.to_dict("records"):
+        if row["key"] in existing_by_key:
+            unchanged += 1
+            continue
+        fields = {field: row[field] for field in TIQIAO_TEXT_FIELDS}
+        inserts.append({"status": row["status"] or DEFAULT_STATUS, "date": today, **fields})
+    return inserts, [], unchanged
+
+
+def write_import_plan(client, table, inserts, upserts, batch_size=DEFAULT_BATCH_SIZE, progress=None):
+    """分块批量写入，每块一次 insert / upsert 请求；progress(done, total) 用于汇报进度。
+
+    任一块失败会抛出异常，已经写入的块不会回滚。
+    """
+    total = len(inserts) + len(upserts)
+    done = 0
+    for rows, write in ((inserts, "insert"), (upserts, "upsert")):
+        for start in range(0, len(rows), batch_size):
+            chunk = rows[start:start + batch_size]
+            if write == "insert":
+                res = client.table(table).insert(chunk).execute()
+            else:
+                res = client.table(table).upsert(chunk, on_conflict="id").execute()
+            if hasattr(res, "error") and res.error:
+                raise RuntimeError(f"Supabase 批量{'插入' if write == 'insert' else '更新'}失败: {res.error}")
+            done += len(chunk)
+            if progress:
+                progress(done, total)
+    return len(inserts), len(upserts)
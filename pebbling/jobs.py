@@ -0,0 +1,245 @@
+"""后台邮件推送任务，表结构见 supabase/migrations/20261017000200_push_jobs.sql。
+
+每块发出后先记下 sent_ids，再流转状态并记下 updated_ids；中途失败后对同一任务再次执行
+run_push_job 即可续跑，已发送的卡片不会重发。执行期间每隔 HEARTBEAT_SECONDS 刷新 updated_at，
+超过 LEASE_SECONDS 没有心跳的任务才可以被别的进程认领。
+"""
+
+import datetime
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from pebbling.deliveries import record_deliveries, undelivered_card_ids, delivered_card_ids
+from pebbling.mailer import send_cards, DEFAULT_CARDS_PER_MAIL
+from pebbling.render import render_daily_digest, render_tiqiao_digest
+from pebbling.paging import iter_cards, apply_status_filter
+from pebbling.status import transition_card_status, ID_CHUNK_SIZE, UPDATED
+
+JOBS_TABLE = "push_jobs"
+PUSHED_STATUS = "已推送"
+
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+ACTIVE_STATUSES = (QUEUED, RUNNING)
+
+# 心跳间隔与租约：running 任务超过 LEASE_SECONDS 没有刷新 updated_at 才算中断
+HEARTBEAT_SECONDS = 60
+LEASE_SECONDS = 300
+
+STATUS_MODE = "status"
+INCREMENTAL_MODE = "incremental"
+
+# 每种卡片推送时取的列、正文渲染函数和邮件主题前缀
+PUSH_COLUMNS = {"daily_cards": "id,title,date,data,status", "tiqiao_cards": "*"}
+CARD_RENDERERS = {"daily_cards": render_daily_digest, "tiqiao_cards": render_tiqiao_digest}
+PUSH_SUBJECTS = {"daily_cards": "每日词卡推送", "tiqiao_cards": "推敲词卡推送"}
+
+
+def _now(offset_seconds=0):
+    now = datetime.datetime.now(datetime.timezone.utc)
+    return (now + datetime.timedelta(seconds=offset_seconds)).isoformat()
+
+
+def _update_job(client, job_id, **fields):
+    res = client.table(JOBS_TABLE).update({**fields, "updated_at": _now()}).eq("id", job_id).execute()
+    if hasattr(res, "error") and res.error:
+        raise RuntimeError(f"Supabase 更新推送任务失败: {res.error}")
+
+
+def _insert_job(client, table, from_status, subject, recipients, card_ids, mode):
+    res = client.table(JOBS_TABLE).insert({
+        "table_name": table,
+        "from_status": from_status,
+        "subject": subject,
+        "recipients": list(recipients),
+        "card_ids": card_ids,
+        "mode": mode,
+        "status": QUEUED,
+    }).execute()
+    if hasattr(res, "error") and res.error:
+        raise RuntimeError(f"Supabase 创建推送任务失败: {res.error}")
+    return res.data[0]
+
+
+def create_push_job(client, table, from_status, subject, recipients):
+    """把当前处于 from_status 的卡片 id 记入一条新任务，返回任务记录；没有卡片时返回 None。"""
+    card_ids = [card["id"] for card in iter_cards(client, table, columns="id", status=from_status)]
+    if not card_ids:
+        return None
+    return _insert_job(client, table, from_status, subject, recipients, card_ids, STATUS_MODE)
+
+
+def create_incremental_push_jobs(client, table, from_status, subject, recipients, statuses):
+    """每个收件人一条增量任务，只包含他还没收到、且状态属于 statuses 的卡片。
+
+    返回新建的任务记录列表；已经全部收到的收件人不建任务。
+    """
+    jobs = []
+    for recipient in recipients:
+        card_ids = undelivered_card_ids(client, table, recipient, statuses)
+        if card_ids:
+            jobs.append(_insert_job(client, table, from_status, subject, [recipient], card_ids, INCREMENTAL_MODE))
+    return jobs
+
+
+def get_job(client, job_id):
+    res = client.table(JOBS_TABLE).select("*").eq("id", job_id).limit(1).execute()
+    return res.data[0] if res.data else None
+
+
+def list_jobs(client, table, statuses=None, from_status=None, limit=20):
+    """按 id 降序列出某张表的推送任务，可按任务状态和 from_status 过滤。"""
+    query = client.table(JOBS_TABLE).select("*").eq("table_name", table).order("id", desc=True).limit(limit)
+    if statuses:
+        query = query.in_("status", list(statuses))
+    if from_status:
+        query = query.eq("from_status", from_status)
+    res = query.execute()
+    return res.data if res.data else []
+
+
+def is_stale(job, lease_seconds=LEASE_SECONDS):
+    """running / queued 任务超过租约没有心跳（updated_at 没刷新），说明执行者已经退出。"""
+    if job["status"] not in ACTIVE_STATUSES or not job.get("updated_at"):
+        return False
+    updated_at = datetime.datetime.fromisoformat(job["updated_at"].replace("Z", "+00:00"))
+    age = datetime.datetime.now(datetime.timezone.utc) - updated_at
+    return age.total_seconds() > lease_seconds
+
+
+def is_resumable(job, lease_seconds=LEASE_SECONDS):
+    """失败的任务和租约过期的 running / queued 任务可以续跑；有人正在执行的不行。"""
+    return job["status"] == FAILED or is_stale(job, lease_seconds)
+
+
+def claim_job(client, job_id, lease_seconds=LEASE_SECONDS):
+    """条件更新把任务改为 running，只有一个调用方能成功（返回 True）。
+
+    可认领的是 queued / failed 的任务，以及租约过期的 running 任务；
+    其他进程正在执行（心跳未过期）或已完成的任务返回 False。
+    """
+    fields = {"status": RUNNING, "error": None, "updated_at": _now()}
+    res = (client.table(JOBS_TABLE).update(fields)
+           .eq("id", job_id).in_("status", [QUEUED, FAILED]).execute())
+    if not res.data:
+        res = (client.table(JOBS_TABLE).update(fields)
+               .eq("id", job_id).eq("status", RUNNING).lt("updated_at", _now(-lease_seconds)).execute())
+    return bool(res.data)
+
+
+def fail_stale_job(client, job_id, lease_seconds=LEASE_SECONDS):
+    """把租约过期的 queued / running 任务标记为失败，之后可以续跑；任务恢复了心跳或已被认领时返回 False。"""
+    res = (client.table(JOBS_TABLE)
+           .update({"status": FAILED, "error": f"执行中断：超过 {lease_seconds} 秒没有心跳", "updated_at": _now()})
+           .eq("id", job_id).in_("status", list(ACTIVE_STATUSES)).lt("updated_at", _now(-lease_seconds))
+           .execute())
+    return bool(res.data)
+
+
+def _heartbeat(client, job_id, stop, interval):
+    while not stop.wait(interval):
+        try:
+            _update_job(client, job_id)
+        except Exception:
+            pass  # 偶尔一次心跳没写上不要紧，租约比心跳间隔长得多
+
+
+def _fetch_cards(client, table, ids, columns, status):
+    """按 id 分块取卡片，只保留仍处于 status 的，顺序与 ids 一致。"""
+    by_id = {}
+    for start in range(0, len(ids), ID_CHUNK_SIZE):
+        query = client.table(table).select(columns).in_("id", ids[start:start + ID_CHUNK_SIZE])
+        res = apply_status_filter(query, status).execute()
+        by_id.update({row["id"]: row for row in (res.data or [])})
+    return [by_id[card_id] for card_id in ids if card_id in by_id]
+
+
+def run_push_job(client, job_id, mail_sender, render, columns="*",
+                 cards_per_mail=DEFAULT_CARDS_PER_MAIL, on_progress=None):
+    """执行（或续跑）一条推送任务，返回最终的任务记录。
+
+    先用 claim_job 认领；任务不存在、已完成或正由别的进程执行时不发信，返回 None。
+    on_progress() 在每块卡片状态更新后调用，便于调用方让缓存失效。
+    """
+    if not claim_job(client, job_id):
+        return None
+    job = get_job(client, job_id)
+    table, from_status = job["table_name"], job["from_status"]
+    incremental = job.get("mode") == INCREMENTAL_MODE
+    sent_ids = list(job.get("sent_ids") or [])
+    updated_ids = list(job.get("updated_ids") or [])
+    stop = threading.Event()
+    threading.Thread(target=_heartbeat, args=(client, job_id, stop, HEARTBEAT_SECONDS),
+                     name=f"push-job-{job_id}-heartbeat", daemon=True).start()
+
+    def mark_pushed(ids):
+        results = transition_card_status(client, table, ids, from_status, PUSHED_STATUS)
+        updated_ids.extend(card_id for card_id, (outcome, _) in results.items() if outcome == UPDATED)
+        _update_job(client, job_id, updated_ids=updated_ids)
+        if on_progress:
+            on_progress()
+
+    try:
+        # 上次发出去了但没来得及改状态的卡片，只补做状态流转
+        updated = set(updated_ids)
+        unmarked = [card_id for card_id in sent_ids if card_id not in updated]
+        if unmarked:
+            mark_pushed(unmarked)
+
+        sent = set(sent_ids)
+        pending = [card_id for card_id in job.get("card_ids") or [] if card_id not in sent]
+        if incremental:
+            # 增量任务的候选卡片本来就跨多个状态；只去掉这期间已经发给该收件人的
+            delivered = delivered_card_ids(client, table, pending, job["recipients"][0])
+            cards = _fetch_cards(client, table, [i for i in pending if i not in delivered], columns, None)
+        else:
+            # 已经被别处改走状态（例如另一次推送）的卡片不再发送
+            cards = _fetch_cards(client, table, pending, columns, from_status)
+        sent_before = len(sent_ids)
+
+        def on_chunk_sent(done, total):
+            chunk_ids = [card["id"] for card in cards[len(sent_ids) - sent_before:done]]
+            sent_ids.extend(chunk_ids)
+            _update_job(client, job_id, sent_ids=sent_ids)
+            record_deliveries(client, table, chunk_ids, job["recipients"], job_id)
+            mark_pushed(chunk_ids)
+
+        _, error = send_cards(mail_sender, job["recipients"], job["subject"], cards, render,
+                              cards_per_mail, progress=on_chunk_sent)
+        if error:
+            raise error
+        _update_job(client, job_id, status=DONE)
+    except Exception as e:
+        _update_job(client, job_id, status=FAILED, error=f"{type(e).__name__} - {e}")
+    finally:
+        stop.set()
+    return get_job(client, job_id)
+
+
+class PushJobRunner:
+    """在后台线程池里执行推送任务；同一任务同时只会有一个线程在跑。"""
+
+    def __init__(self, max_workers=2):
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="push-job")
+        self._futures = {}
+        self._lock = threading.Lock()
+
+    def submit(self, client, job_id, mail_sender, render, columns="*",
+               cards_per_mail=DEFAULT_CARDS_PER_MAIL, on_progress=None):
+        """提交任务；任务已在执行时不重复提交，返回 False。"""
+        with self._lock:
+            if self.is_active(job_id):
+                return False
+            self._futures[job_id] = self._executor.submit(
+                run_push_job, client, job_id, mail_sender, render, columns, cards_per_mail, on_progress,
+            )
+            return True
+
+    def is_active(self, job_id):
+        future = self._futures.get(job_id)
+        return future is not None and not future.done()
+
+    def has_active(self):
+        return any(not future.done() for future in list(self._futures.values()))
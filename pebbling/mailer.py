@@ -0,0 +1,156 @@
+"""邮件推送：复用已登录的 SMTP 连接按块发信，临时性错误退避重连。
+
+本地调试可以指向不需要登录的 SMTP 替身：
+
+    [smtp]
+    host = "localhost"
+    port = 8025
+    ssl = false
+"""
+
+import smtplib
+import threading
+import time
+from email.mime.multipart import MIMEMultipart
+from email.mime.text import MIMEText
+
+DEFAULT_HOST = "smtp.feishu.cn"
+DEFAULT_PORT = 465
+DEFAULT_TIMEOUT_SECONDS = 30
+DEFAULT_RETRIES = 3
+DEFAULT_BACKOFF_SECONDS = 1.0
+# 每封邮件最多包含的卡片数，避免大批推送超出服务商的单封大小限制
+DEFAULT_CARDS_PER_MAIL = 50
+
+
+def _is_transient(error):
+    """连接断开、网络错误和 4xx 临时性响应值得重试；认证失败、收件人被拒等直接抛出。"""
+    if isinstance(error, (smtplib.SMTPServerDisconnected, smtplib.SMTPConnectError)):
+        return True
+    if isinstance(error, smtplib.SMTPResponseException):
+        return 400 <= error.smtp_code < 500
+    if isinstance(error, smtplib.SMTPException):
+        return False
+    return isinstance(error, OSError)
+
+
+class SmtpSender:
+    """可复用的 SMTP 发信器，线程安全；同一发件账号在进程内共用一个实例即可。"""
+
+    def __init__(self, sender, password, host=DEFAULT_HOST, port=DEFAULT_PORT, use_ssl=True,
+                 starttls=False, timeout=DEFAULT_TIMEOUT_SECONDS, retries=DEFAULT_RETRIES,
+                 backoff_seconds=DEFAULT_BACKOFF_SECONDS):
+        self.sender = sender
+        self.password = password
+        self.host = host
+        self.port = port
+        self.use_ssl = use_ssl
+        self.starttls = starttls
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff_seconds = backoff_seconds
+        self.connects = 0
+        self._conn = None
+        self._lock = threading.Lock()
+
+    def _connect(self):
+        if self.use_ssl:
+            conn = smtplib.SMTP_SSL(self.host, self.port, timeout=self.timeout)
+        else:
+            conn = smtplib.SMTP(self.host, self.port, timeout=self.timeout)
+            if self.starttls:
+                conn.starttls()
+        conn.ehlo_or_helo_if_needed()
+        # 本地替身通常不提供 AUTH，此时跳过登录
+        if self.password and conn.has_extn("auth"):
+            conn.login(self.sender, self.password)
+        self.connects += 1
+        return conn
+
+    def _close(self):
+        if self._conn is not None:
+            try:
+                self._conn.quit()
+            except (smtplib.SMTPException, OSError):
+                pass
+            self._conn = None
+
+    def _connection(self):
+        if self._conn is not None:
+            try:
+                if self._conn.noop()[0] == 250:
+                    return self._conn
+            except (smtplib.SMTPException, OSError):
+                pass
+            self._close()
+        self._conn = self._connect()
+        return self._conn
+
+    def send(self, msg, recipients):
+        """发送一封邮件；临时性错误会断开重连，并按 backoff_seconds * 2^n 退避后重试。"""
+        with self._lock:
+            for attempt in range(self.retries + 1):
+                try:
+                    self._connection().send_message(msg, from_addr=self.sender, to_addrs=list(recipients))
+                    return
+                except Exception as e:
+                    self._close()
+                    if attempt == self.retries or not _is_transient(e):
+                        raise
+                time.sleep(self.backoff_seconds * 2 ** attempt)
+
+    def close(self):
+        with self._lock:
+            self._close()
+
+
+def sender_from_config(sender, password, smtp_config=None):
+    """按 secrets.toml 的 [smtp] 段（host、port、ssl、starttls、timeout、retries、backoff_seconds）创建发信器。"""
+    smtp_config = smtp_config or {}
+    return SmtpSender(
+        sender, password,
+        host=smtp_config.get("host", DEFAULT_HOST),
+        port=int(smtp_config.get("port", DEFAULT_PORT)),
+        use_ssl=bool(smtp_config.get("ssl", True)),
+        starttls=bool(smtp_config.get("starttls", False)),
+        timeout=float(smtp_config.get("timeout", DEFAULT_TIMEOUT_SECONDS)),
+        retries=int(smtp_config.get("retries", DEFAULT_RETRIES)),
+        backoff_seconds=float(smtp_config.get("backoff_seconds", DEFAULT_BACKOFF_SECONDS)),
+    )
+
+
+def build_message(sender, recipients, subject, text, html=None):
+    """纯文本邮件；给出 html 时组装成 multipart/alternative，客户端优先显示 HTML。"""
+    msg = MIMEMultipart("alternative")
+    msg["From"] = sender
+    msg["To"] = ", ".join(recipients)
+    msg["Subject"] = subject
+    msg.attach(MIMEText(text, "plain", "utf-8"))
+    if html is not None:
+        msg.attach(MIMEText(html, "html", "utf-8"))
+    return msg
+
+
+def send_cards(mail_sender, recipients, subject, cards, render,
+               cards_per_mail=DEFAULT_CARDS_PER_MAIL, progress=None):
+    """把 cards 按 cards_per_mail 张一封拆开，经同一连接依次发送。
+
+    render(cards, heading) 返回 (纯文本, HTML)，见 pebbling/render.py。
+    多于一封时主题后追加 (k/n)。返回 (已发送的卡片, 错误)：全部成功时错误为 None；
+    中途失败会停止发送，调用方只应把已发送的卡片标记为已推送。
+    progress(done, total) 按已发送的卡片数汇报进度。
+    """
+    cards = list(cards)
+    chunks = [cards[start:start + cards_per_mail] for start in range(0, len(cards), cards_per_mail)]
+    sent = []
+    for number, chunk in enumerate(chunks, start=1):
+        part_subject = subject if len(chunks) == 1 else f"{subject} ({number}/{len(chunks)})"
+        msg = build_message(mail_sender.sender, recipients, part_subject, *render(chunk, part_subject))
+        try:
+            mail_sender.send(msg, recipients)
+        except Exception as e:
+            return sent, e
+        sent.extend(chunk)
+        if progress:
+            progress(len(sent), len(cards))
+    return sent, None
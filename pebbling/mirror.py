@@ -0,0 +1,465 @@
+"""Supabase 卡片表的本地 SQLite 镜像。
+
+sync 按 id 和 updated_at 水位拉增量（updated_at 见 supabase/migrations/20261017000600_card_updated_at.sql）；
+水位漏掉的删除和改动（迁移前的改动、提交晚于水位的并发事务）由定期的 reconcile 补齐。
+全文检索用 FTS5 trigram，SQLite 没有 FTS5 时改用 pebbling/search.py 的 CardSearchIndex。
+
+    python -m pebbling.mirror               # 增量同步一次
+    python -m pebbling.mirror --reconcile   # 同时比对删除和改动
+    python -m pebbling.mirror --info        # 只看本地各表行数和水位
+"""
+
+import argparse
+import datetime
+import json
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+from pebbling.cards import (
+    CardRepository, CARD_TABLES, EMPTY_LABEL, ROOT, SNAPSHOT_DIRS, SEARCH_COLUMNS, DEFAULT_SEARCH_LIMIT,
+    search_terms,
+)
+from pebbling.client import get_client
+from pebbling.config import load_secrets
+from pebbling.paging import iter_cards, DEFAULT_PAGE_SIZE
+from pebbling.search import SEARCH_FIELDS, CardSearchIndex, card_fields
+from pebbling.status import ID_CHUNK_SIZE, UPDATED
+
+DEFAULT_MIRROR_PATH = ROOT / ".cache" / "mirror.sqlite3"
+DEFAULT_SYNC_SECONDS = 30
+DEFAULT_RECONCILE_SECONDS = 600
+# FTS5 trigram 分词能用索引的最短词长
+TRIGRAM_MIN_LENGTH = 3
+# 服务端还没有 updated_at 列（迁移未执行）：Postgres 的 undefined_column
+MISSING_COLUMN_CODE = "42703"
+
+
+def _project(row, columns):
+    if columns == "*":
+        return row
+    return {column.strip(): row.get(column.strip()) for column in columns.split(",")}
+
+
+def _status_clause(status):
+    """与 paging.apply_status_filter 相同的语义：字符串等于，列表/元组属于，None 不过滤。"""
+    if status is None:
+        return "", []
+    if isinstance(status, str):
+        return " where status = ?", [status]
+    status = list(status)
+    return f" where status in ({','.join('?' * len(status))})", status
+
+
+class CardMirror:
+    """卡片表的本地镜像；同一个实例可以在多个线程里共用。"""
+
+    def __init__(self, path=DEFAULT_MIRROR_PATH, tables=CARD_TABLES, on_change=None):
+        self.path = Path(path)
+        self.tables = tables
+        self.on_change = on_change  # on_change(table)：同步带来了变化时调用
+        self.offline = False
+        self.last_error = ""
+        self._lock = threading.RLock()
+        self._thread = None
+        self._indexes = {}  # 表 -> CardSearchIndex，只在没有 FTS5 时使用
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        with self._lock, self._conn:
+            self._conn.execute("pragma journal_mode=wal")
+            self._conn.execute(
+                "create table if not exists sync_state ("
+                "table_name text primary key, max_id integer, updated_at text, synced_at text)"
+            )
+            for table in tables:
+                self._conn.execute(
+                    f"create table if not exists {table} (id integer primary key, status text, row text not null)"
+                )
+                self._conn.execute(f"create index if not exists {table}_status_id on {table} (status, id)")
+        self.fts = self._create_fts()
+
+    def _create_fts(self):
+        """每张表建一个 FTS5 表（rowid = 卡片 id，每个检索字段一列）；行数对不上时重建。没有 FTS5 时返回 False。"""
+        try:
+            with self._lock, self._conn:
+                for table in self.tables:
+                    columns = ", ".join(f"f{i}" for i in range(len(SEARCH_FIELDS[table])))
+                    self._conn.execute(
+                        f"create virtual table if not exists {table}_fts using fts5({columns}, tokenize='trigram')"
+                    )
+                    indexed = self._conn.execute(f"select count(*) from {table}_fts").fetchone()[0]
+                    if indexed != self._conn.execute(f"select count(*) from {table}").fetchone()[0]:
+                        self._conn.execute(f"delete from {table}_fts")
+                        rows = self._conn.execute(f"select id, row from {table}").fetchall()
+                        self._index_rows(table, [(card_id, json.loads(text)) for card_id, text in rows])
+        except sqlite3.OperationalError:
+            return False
+        return True
+
+    def _index_rows(self, table, rows):
+        """rows: [(id, 卡片)]；调用方持有锁并在事务中。"""
+        fields = len(SEARCH_FIELDS[table])
+        self._conn.executemany(
+            f"insert into {table}_fts (rowid, {', '.join(f'f{i}' for i in range(fields))}) "
+            f"values (?{', ?' * fields})",
+            [(card_id, *(str(text) for text in card_fields(table, card).values())) for card_id, card in rows],
+        )
+
+    def _unindex_ids(self, table, ids):
+        for start in range(0, len(ids), ID_CHUNK_SIZE):
+            chunk = ids[start:start + ID_CHUNK_SIZE]
+            self._conn.execute(f"delete from {table}_fts where rowid in ({','.join('?' * len(chunk))})", chunk)
+
+    def search_index(self, table):
+        """没有 FTS5 时用的进程内索引，第一次调用时用本地全部行建好。"""
+        with self._lock:
+            index = self._indexes.setdefault(table, CardSearchIndex(table))
+            index.ensure(lambda: [json.loads(r["row"]) for r in self._select(f"select row from {table}")])
+        return index
+
+    # --- 读 ---
+
+    def _select(self, sql, params=()):
+        with self._lock:
+            return self._conn.execute(sql, params).fetchall()
+
+    def query(self, table, status=None, limit=None, columns="*"):
+        """按 id 降序，返回 (cards, has_more)，与 CardRepository.query 相同。"""
+        where, params = _status_clause(status)
+        sql = f"select row from {table}{where} order by id desc"
+        if limit is not None:
+            sql += f" limit {int(limit) + 1}"
+        rows = [_project(json.loads(r["row"]), columns) for r in self._select(sql, params)]
+        if limit is not None and len(rows) > limit:
+            return rows[:limit], True
+        return rows, False
+
+    def page(self, table, offset, limit, status=None, columns="*"):
+        """返回 (rows, total)。"""
+        where, params = _status_clause(status)
+        total = self._select(f"select count(*) from {table}{where}", params)[0][0]
+        rows = self._select(f"select row from {table}{where} order by id desc limit ? offset ?",
+                            params + [int(limit), int(offset)])
+        return [_project(json.loads(r["row"]), columns) for r in rows], total
+
+    def locate(self, table, card_id, status=None):
+        """card_id 在按 id 降序的列表中的位置，不存在时为 None。"""
+        where, params = _status_clause(status)
+        found = self._select(f"select 1 from {table}{where}{' and' if where else ' where'} id = ?",
+                             params + [card_id])
+        if not found:
+            return None
+        return self._select(f"select count(*) from {table}{where}{' and' if where else ' where'} id > ?",
+                            params + [card_id])[0][0]
+
+    def rows(self, table, ids, columns="*"):
+        """按 ids 的顺序取回本地行，本地没有的跳过。"""
+        ids = list(ids)
+        found = {}
+        for start in range(0, len(ids), ID_CHUNK_SIZE):
+            chunk = ids[start:start + ID_CHUNK_SIZE]
+            found.update((r["id"], r["row"]) for r in self._select(
+                f"select id, row from {table} where id in ({','.join('?' * len(chunk))})", chunk))
+        return [_project(json.loads(found[card_id]), columns) for card_id in ids if card_id in found]
+
+    def search(self, table, query, status=None, limit=DEFAULT_SEARCH_LIMIT, offset=0, columns="*"):
+        """全文检索，按相关度（bm25，同分按 id 降序）排序，返回 (rows, total)，与 CardRepository.search 相同。"""
+        terms = search_terms(query)
+        if not terms:
+            return [], 0
+        if not self.fts:
+            return self._search_index(table, query, status, limit, offset, columns)
+        where, params = _status_clause(status)
+        conditions = [where[len(" where "):]] if where else []
+        indexed = [term for term in terms if len(term) >= TRIGRAM_MIN_LENGTH]
+        source = f"{table} c join {table}_fts on {table}_fts.rowid = c.id"
+        # 短词要对拼起来的表达式做 like：直接对 FTS5 的列 like 会被下推给 trigram 索引，不足 3 个字符时什么都匹配不到
+        text = " || ' ' || ".join(f"{table}_fts.f{i}" for i in range(len(SEARCH_FIELDS[table])))
+        if indexed:
+            conditions.append(f"{table}_fts match ?")
+            params.append(" ".join('"' + term.replace('"', '""') + '"' for term in indexed))
+        for term in terms:
+            if term not in indexed:
+                pattern = "%" + term.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+                conditions.append(f"({text}) like ? escape '\\'")
+                params.append(pattern)
+        sql_where = " where " + " and ".join(conditions)
+        total = self._select(f"select count(*) from {source}{sql_where}", params)[0][0]
+        weights = ", ".join(str(weight) for weight in SEARCH_FIELDS[table].values())
+        order = f"bm25({table}_fts, {weights}), c.id desc" if indexed else "c.id desc"
+        rows = self._select(f"select c.row from {source}{sql_where} order by {order} limit ? offset ?",
+                            params + [-1 if limit is None else int(limit), int(offset)])
+        return [_project(json.loads(r["row"]), columns) for r in rows], total
+
+    def _search_index(self, table, query, status, limit, offset, columns):
+        ids = self.search_index(table).search(query)
+        if status is not None and ids:
+            where, params = _status_clause(status)
+            allowed = set()
+            for start in range(0, len(ids), ID_CHUNK_SIZE):
+                chunk = ids[start:start + ID_CHUNK_SIZE]
+                allowed.update(r["id"] for r in self._select(
+                    f"select id from {table}{where} and id in ({','.join('?' * len(chunk))})", params + chunk))
+            ids = [card_id for card_id in ids if card_id in allowed]
+        page = ids[offset:] if limit is None else ids[offset:offset + int(limit)]
+        return self.rows(table, page, columns), len(ids)
+
+    def status_counts(self, table):
+        """{状态: 卡片数}，空状态记在 EMPTY_LABEL 下，与 stats.status_counts 相同。"""
+        counts = {}
+        for r in self._select(f"select status, count(*) as cards from {table} group by status"):
+            status = r["status"] or EMPTY_LABEL
+            counts[status] = counts.get(status, 0) + r["cards"]
+        return counts
+
+    def info(self, table):
+        state = self._state(table)
+        rows = self._select(f"select count(*) from {table}")[0][0]
+        return {"rows": rows, **state}
+
+    # --- 写 ---
+
+    def upsert_rows(self, table, rows):
+        """写入（覆盖）整行，返回内容确实有变化的行数。"""
+        if not rows:
+            return 0
+        # 服务端检索用的生成列不进镜像
+        rows = [{k: v for k, v in row.items() if k not in SEARCH_COLUMNS} for row in rows]
+        encoded = {row["id"]: json.dumps(row, ensure_ascii=False, sort_keys=True, default=str) for row in rows}
+        with self._lock, self._conn:
+            ids = list(encoded)
+            existing = {}
+            for start in range(0, len(ids), ID_CHUNK_SIZE):
+                chunk = ids[start:start + ID_CHUNK_SIZE]
+                existing.update(self._conn.execute(
+                    f"select id, row from {table} where id in ({','.join('?' * len(chunk))})", chunk
+                ).fetchall())
+            changed = [(card_id, json.loads(text).get("status"), text)
+                       for card_id, text in encoded.items() if existing.get(card_id) != text]
+            self._conn.executemany(f"insert or replace into {table} (id, status, row) values (?, ?, ?)", changed)
+            if self.fts:
+                self._unindex_ids(table, [card_id for card_id, _, _ in changed])
+                self._index_rows(table, [(card_id, json.loads(text)) for card_id, _, text in changed])
+            elif table in self._indexes:
+                self._indexes[table].add(json.loads(text) for _, _, text in changed)
+        return len(changed)
+
+    def update_fields(self, table, ids, fields):
+        """把 fields 合并进 ids 对应的本地行（服务端已经改过，这里只是写回）。"""
+        ids = list(ids)
+        rows = []
+        for start in range(0, len(ids), ID_CHUNK_SIZE):
+            chunk = ids[start:start + ID_CHUNK_SIZE]
+            rows += [{**json.loads(r["row"]), **fields} for r in self._select(
+                f"select row from {table} where id in ({','.join('?' * len(chunk))})", chunk)]
+        return self.upsert_rows(table, rows)
+
+    def delete_ids(self, table, ids):
+        ids = list(ids)
+        with self._lock, self._conn:
+            for start in range(0, len(ids), ID_CHUNK_SIZE):
+                chunk = ids[start:start + ID_CHUNK_SIZE]
+                self._conn.execute(f"delete from {table} where id in ({','.join('?' * len(chunk))})", chunk)
+            if self.fts:
+                self._unindex_ids(table, ids)
+            elif table in self._indexes:
+                self._indexes[table].remove(ids)
+        return len(ids)
+
+    def seed_from_snapshots(self, table, folder=None):
+        """本地表为空时用 JSON 快照垫底，返回载入的行数；不推进同步水位，联网后会被完整同步覆盖。"""
+        folder = Path(folder or SNAPSHOT_DIRS[table])
+        if self._select(f"select count(*) from {table}")[0][0] or not folder.is_dir():
+            return 0
+        rows = []
+        for path in sorted(folder.glob("*.json")):
+            row = json.loads(path.read_text(encoding="utf-8"))
+            if isinstance(row, dict) and row.get("id") is not None:
+                rows.append(row)
+        return self.upsert_rows(table, rows)
+
+    # --- 同步 ---
+
+    def _state(self, table):
+        r = self._select("select max_id, updated_at, synced_at from sync_state where table_name = ?", (table,))
+        return dict(r[0]) if r else {"max_id": None, "updated_at": None, "synced_at": None}
+
+    def sync(self, client, table, page_size=DEFAULT_PAGE_SIZE):
+        """拉取增量写入镜像，返回有变化的行数。本地还没同步过时拉全表。"""
+        state = self._state(table)
+        max_id, watermark = state["max_id"], state["updated_at"]
+        # 已有水位时按 id 升序扫 “新增或改过” 的行；没有 updated_at 列（迁移前）时只能拉新增的行
+        cursor = max_id if watermark is None else None
+        changed = 0
+        while True:
+            query = client.table(table).select("*").order("id").limit(page_size)
+            if watermark is not None:
+                query = query.or_(f'id.gt.{max_id or 0},updated_at.gt."{watermark}"')
+            if cursor is not None:
+                query = query.gt("id", cursor)
+            rows = query.execute().data or []
+            changed += self.upsert_rows(table, rows)
+            stamps = [row["updated_at"] for row in rows if row.get("updated_at")]
+            if rows:
+                max_id = max(max_id or 0, rows[-1]["id"])
+                cursor = rows[-1]["id"]
+            if stamps:
+                watermark = max([watermark] + stamps if watermark else stamps)
+            if len(rows) < page_size:
+                break
+        with self._lock, self._conn:
+            self._conn.execute(
+                "insert or replace into sync_state (table_name, max_id, updated_at, synced_at) values (?, ?, ?, ?)",
+                (table, max_id, watermark, datetime.datetime.now().isoformat(timespec="seconds")),
+            )
+        return changed
+
+    def reconcile(self, client, table):
+        """比对服务端的 (id, status, updated_at)：删掉服务端已不存在的行，重新拉取不一致或本地缺失的行。
+
+        updated_at 不一致的行就是增量同步漏掉的改动：提交晚于水位的并发事务，以及迁移前同步下来、
+        本地还没有 updated_at 的行。服务端还没有 updated_at 列时只比对 status。
+        """
+        try:
+            cards = list(iter_cards(client, table, columns="id,status,updated_at"))
+            stamp = "json_extract(row, '$.updated_at')"
+        except Exception as e:
+            if getattr(e, "code", None) != MISSING_COLUMN_CODE:
+                raise
+            cards = list(iter_cards(client, table, columns="id,status"))
+            stamp = "null"
+        remote = {card["id"]: (card.get("status"), card.get("updated_at")) for card in cards}
+        local = {r["id"]: (r["status"], r["stamp"])
+                 for r in self._select(f"select id, status, {stamp} as stamp from {table}")}
+        gone = [card_id for card_id in local if card_id not in remote]
+        stale = [card_id for card_id, version in remote.items() if local.get(card_id) != version]
+        changed = self.delete_ids(table, gone)
+        for start in range(0, len(stale), ID_CHUNK_SIZE):
+            res = client.table(table).select("*").in_("id", stale[start:start + ID_CHUNK_SIZE]).execute()
+            changed += self.upsert_rows(table, res.data or [])
+        return changed
+
+    def refresh(self, client, tables=None, reconcile=False):
+        """同步（可选比对）各表；失败时转为离线并返回 False，本地数据照常可读。"""
+        try:
+            for table in tables or self.tables:
+                changed = self.sync(client, table)
+                if reconcile:
+                    changed += self.reconcile(client, table)
+                if changed and self.on_change:
+                    self.on_change(table)
+        except Exception as e:
+            self.offline = True
+            self.last_error = f"{type(e).__name__} - {e}"
+            return False
+        self.offline = False
+        self.last_error = ""
+        return True
+
+    def start(self, client, interval=DEFAULT_SYNC_SECONDS, reconcile_interval=DEFAULT_RECONCILE_SECONDS):
+        """启动后台线程，每 interval 秒增量同步一次，每 reconcile_interval 秒比对一次；重复调用无副作用。"""
+        with self._lock:
+            if self._thread is not None:
+                return
+            self._thread = threading.Thread(
+                target=self._run, args=(client, interval, reconcile_interval), name="card-mirror", daemon=True
+            )
+        self._thread.start()
+
+    def _run(self, client, interval, reconcile_interval):
+        last_reconcile = time.monotonic()
+        while True:
+            time.sleep(interval)
+            due = time.monotonic() - last_reconcile >= reconcile_interval
+            if self.refresh(client, reconcile=due) and due:
+                last_reconcile = time.monotonic()
+
+
+class MirroredRepository(CardRepository):
+    """读走本地镜像、写穿透到 Supabase 的 CardRepository。离线时拒绝写入。"""
+
+    def __init__(self, client, table, mirror):
+        super().__init__(client, table)
+        self.mirror = mirror
+
+    def query(self, status=None, limit=None, columns="*"):
+        return self.mirror.query(self.table, status, limit, columns)
+
+    def iter(self, status=None, columns="*"):
+        return iter(self.mirror.query(self.table, status, None, columns)[0])
+
+    def page(self, offset, limit, status=None, columns="*"):
+        return self.mirror.page(self.table, offset, limit, status, columns)
+
+    def locate(self, card_id, status=None):
+        return self.mirror.locate(self.table, card_id, status)
+
+    def _write(self, action, write):
+        if self.mirror.offline:
+            raise RuntimeError(f"当前离线，只能查看本地镜像，暂不能{action}（{self.mirror.last_error}）")
+        try:
+            return write()
+        except RuntimeError:
+            raise
+        except Exception as e:
+            # 连接类错误：转为离线，界面按普通的写入失败处理
+            self.mirror.offline = True
+            self.mirror.last_error = f"{type(e).__name__} - {e}"
+            raise RuntimeError(f"Supabase {action}失败: {self.mirror.last_error}") from e
+
+    def search(self, query, status=None, limit=DEFAULT_SEARCH_LIMIT, offset=0):
+        return self.mirror.search(self.table, query, status, limit, offset)
+
+    def insert(self, row):
+        rows = self._write("插入", lambda: super(MirroredRepository, self).insert(row))
+        self.mirror.upsert_rows(self.table, rows or [])
+        return rows
+
+    def update(self, card_id, fields):
+        rows = self._write("更新", lambda: super(MirroredRepository, self).update(card_id, fields))
+        self.mirror.upsert_rows(self.table, rows or [])
+        return rows
+
+    def delete(self, card_id):
+        rows = self._write("删除", lambda: super(MirroredRepository, self).delete(card_id))
+        self.mirror.delete_ids(self.table, [card_id])
+        return rows
+
+    def transition(self, ids, from_statuses, to_status):
+        results = self._write("修改状态", lambda: super(MirroredRepository, self).transition(ids, from_statuses, to_status))
+        self.mirror.update_fields(self.table, [card_id for card_id, (result, _) in results.items() if result == UPDATED],
+                                  {"status": to_status})
+        return results
+
+    def remove_duplicates(self, dry_run=True):
+        report = self._write("删除重复卡片", lambda: super(MirroredRepository, self).remove_duplicates(dry_run))
+        if not dry_run and report["deleted"]:
+            self.mirror.reconcile(self.client, self.table)
+        return report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="同步卡片表的本地 SQLite 镜像")
+    parser.add_argument("--path", default=str(DEFAULT_MIRROR_PATH), help="镜像文件路径")
+    parser.add_argument("--reconcile", action="store_true", help="同时比对服务端的 id、状态和 updated_at，清掉已删除的行、补上漏掉的改动")
+    parser.add_argument("--info", action="store_true", help="只显示本地镜像的行数和水位，不联网")
+    parser.add_argument("--secrets", help="secrets.toml 路径，默认 .streamlit/secrets.toml")
+    args = parser.parse_args(argv)
+
+    mirror = CardMirror(args.path)
+    if not args.info:
+        started = time.perf_counter()
+        if not mirror.refresh(get_client(load_secrets(args.secrets)), reconcile=args.reconcile):
+            print(f"❌ 同步失败: {mirror.last_error}")
+        else:
+            print(f"✅ 同步完成，用时 {time.perf_counter() - started:.2f}s")
+    for table in mirror.tables:
+        info = mirror.info(table)
+        print(f"{table}: {info['rows']} 行，max_id={info['max_id']}，updated_at={info['updated_at']}，"
+              f"上次同步 {info['synced_at']}")
+
+
+if __name__ == "__main__":
+    main()
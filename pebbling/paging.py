@@ -0,0 +1,95 @@
+"""Supabase 卡片表的 keyset 分页。
+
+PostgREST 会按 max-rows（默认 1000）静默截断单次响应，所以整表读取必须分页。
+这里按 id 降序、用上一页最后一个 id 作为游标（keyset），不使用 offset，
+翻到多深都只是一次索引范围扫描。
+
+所有函数都接受 status（单个状态或状态列表）和 columns 参数，
+过滤和列投影在服务端完成，只传输真正需要的行和列。
+界面翻页另有 fetch_card_range / locate_card，按页码取数据和定位某个 id 所在页。
+"""
+
+# 单页行数，需不大于服务端的 max-rows，否则短页会被误判为最后一页
+DEFAULT_PAGE_SIZE = 500
+
+
+def apply_status_filter(query, status):
+    """把状态过滤下推到查询：字符串用 eq，列表/元组用 in_，None 不过滤。"""
+    if status is None:
+        return query
+    if isinstance(status, str):
+        return query.eq("status", status)
+    return query.in_("status", list(status))
+
+
+def apply_empty_status_filter(query):
+    """只保留状态为空（NULL 或空字符串）的行。"""
+    return query.or_("status.is.null,status.eq.")
+
+
+def fetch_card_page(client, table, page_size=DEFAULT_PAGE_SIZE, before_id=None, columns="*", status=None):
+    """按 id 降序取一页，返回 (rows, next_before_id)；没有下一页时游标为 None。
+
+    columns 必须包含 id。
+    """
+    query = client.table(table).select(columns).order("id", desc=True).limit(page_size)
+    query = apply_status_filter(query, status)
+    if before_id is not None:
+        query = query.lt("id", before_id)
+    res = query.execute()
+    rows = res.data if res.data else []
+    next_before_id = rows[-1]["id"] if len(rows) == page_size else None
+    return rows, next_before_id
+
+
+def iter_card_pages(client, table, page_size=DEFAULT_PAGE_SIZE, columns="*", status=None):
+    """逐页产出整张表的行（每次一个 list），内存占用只与 page_size 有关。"""
+    before_id = None
+    while True:
+        rows, before_id = fetch_card_page(client, table, page_size, before_id, columns, status)
+        if rows:
+            yield rows
+        if before_id is None:
+            return
+
+
+def iter_cards(client, table, page_size=DEFAULT_PAGE_SIZE, columns="*", status=None):
+    """逐行遍历整张表，供维护脚本流式处理所有卡片。"""
+    for rows in iter_card_pages(client, table, page_size, columns, status):
+        yield from rows
+
+
+def fetch_card_window(client, table, limit, page_size=DEFAULT_PAGE_SIZE, columns="*", status=None):
+    """取最新的 limit 行（按 id 降序，逐页拉取），返回 (rows, has_more)。"""
+    rows = []
+    before_id = None
+    # 多取一行用来判断后面是否还有数据
+    while len(rows) <= limit:
+        size = min(page_size, limit + 1 - len(rows))
+        page, before_id = fetch_card_page(client, table, size, before_id, columns, status)
+        rows.extend(page)
+        if before_id is None:
+            break
+    return rows[:limit], len(rows) > limit
+
+
+def fetch_card_range(client, table, offset, limit, columns="*", status=None):
+    """按 id 降序取第 offset 行起的 limit 行，同时返回匹配的总行数：(rows, total)。
+
+    用于界面上的页码跳转；offset 只在列表可见的页数范围内使用，整表遍历请用 iter_cards。
+    """
+    query = client.table(table).select(columns, count="exact").order("id", desc=True)
+    query = apply_status_filter(query, status).range(offset, offset + limit - 1)
+    res = query.execute()
+    return (res.data or []), (res.count or 0)
+
+
+def locate_card(client, table, card_id, status=None):
+    """返回 card_id 在按 id 降序的列表中的位置（从 0 开始）；卡片不存在或不属于 status 时返回 None。"""
+    found = apply_status_filter(client.table(table).select("id").eq("id", card_id), status).execute()
+    if not found.data:
+        return None
+    # 排在它前面的就是 id 更大的行，只做计数不取数据
+    query = client.table(table).select("id", count="exact", head=True).gt("id", card_id)
+    res = apply_status_filter(query, status).execute()
+    return res.count or 0
@@ -0,0 +1,160 @@
+"""推送邮件正文渲染：模块加载时编译好的纯文本 / HTML 模板，HTML 只用内联样式。
+
+    python -m pebbling.render --cards 1000   # 渲染基准测试
+"""
+
+import argparse
+import html
+import time
+from string import Template
+
+from pebbling.cards import TIQIAO_TEXT_FIELDS
+
+DAILY_TEXT = Template("""\
+【${title}】
+日期: ${date}
+音标: ${phonetic}
+释义: ${definition}
+例句: ${example}
+备注: ${note}
+来源: ${source}
+
+""")
+
+DAILY_HTML = Template("""\
+<div style="margin:0 0 16px;padding:12px 16px;border:1px solid #e5e6eb;border-radius:8px;">
+<div style="font-size:18px;font-weight:600;color:#1f2329;">${title}
+<span style="font-size:14px;font-weight:400;color:#646a73;margin-left:8px;">${phonetic}</span></div>
+<div style="margin-top:6px;color:#1f2329;">${definition}</div>
+<div style="margin-top:6px;color:#3370ff;font-style:italic;">${example}</div>
+<div style="margin-top:6px;font-size:12px;color:#8f959e;">${date} · ${note} ${source_link}</div>
+</div>
+""")
+
+TIQIAO_TEXT = Template("""\
+【推敲词卡】
+日期: ${date}
+原始中文: ${orig_cn}
+原始英文: ${orig_en}
+真实内涵: ${meaning}
+推荐英文: ${recommend}
+问题类型: ${qtype}
+
+""")
+
+TIQIAO_HTML = Template("""\
+<div style="margin:0 0 16px;padding:12px 16px;border:1px solid #e5e6eb;border-radius:8px;">
+<div style="font-size:16px;font-weight:600;color:#1f2329;">${orig_cn}</div>
+<div style="margin-top:6px;color:#646a73;">原始英文：<span style="text-decoration:line-through;">${orig_en}</span></div>
+<div style="margin-top:6px;color:#1f2329;">真实内涵：${meaning}</div>
+<div style="margin-top:6px;color:#00b42a;font-weight:600;">推荐英文：${recommend}</div>
+<div style="margin-top:6px;font-size:12px;color:#8f959e;">${date} · ${qtype}</div>
+</div>
+""")
+
+PAGE_HTML = Template("""\
+<!DOCTYPE html>
+<html><head><meta charset="utf-8"></head>
+<body style="margin:0;padding:16px;font-family:-apple-system,'PingFang SC','Microsoft YaHei',sans-serif;\
+font-size:14px;line-height:1.6;background:#f5f6f7;">
+<div style="max-width:680px;margin:0 auto;">
+<div style="font-size:20px;font-weight:600;color:#1f2329;margin-bottom:12px;">${heading}</div>
+""")
+PAGE_HTML_END = "</div></body></html>\n"
+
+
+def _value(card, data, field, legacy=None, default="-"):
+    # 新数据在 data 里，旧数据可能直接放在列上
+    return data.get(field) or card.get(legacy or field) or default
+
+
+def daily_fields(card):
+    data = card.get("data") or {}
+    return {
+        "title": card.get("title", ""),
+        "date": card.get("date") or "-",
+        "phonetic": _value(card, data, "音标", "phonetic"),
+        "definition": _value(card, data, "释义", "definition"),
+        "example": _value(card, data, "例句", "example"),
+        "note": _value(card, data, "备注", "note"),
+        "source": _value(card, data, "source", default=""),
+    }
+
+
+def tiqiao_fields(card):
+    data = card.get("data") or {}
+    fields = {name: _value(card, data, name) for name in TIQIAO_TEXT_FIELDS}
+    fields["date"] = card.get("date") or "-"
+    return fields
+
+
+def _escape_all(fields):
+    return {key: html.escape(str(value)) for key, value in fields.items()}
+
+
+def _daily_html(fields):
+    escaped = _escape_all(fields)
+    source = escaped["source"]
+    if fields["source"].startswith(("http://", "https://")):
+        escaped["source_link"] = f'· <a href="{source}" style="color:#8f959e;">来源</a>'
+    else:
+        escaped["source_link"] = f"· {source}" if source else ""
+    return DAILY_HTML.substitute(escaped)
+
+
+def _tiqiao_html(fields):
+    return TIQIAO_HTML.substitute(_escape_all(fields))
+
+
+def _render(cards, heading, to_fields, text_template, render_html):
+    text_parts = []
+    html_parts = [PAGE_HTML.substitute(heading=html.escape(heading))]
+    for card in cards:
+        fields = to_fields(card)
+        text_parts.append(text_template.substitute(fields))
+        html_parts.append(render_html(fields))
+    html_parts.append(PAGE_HTML_END)
+    return "".join(text_parts), "".join(html_parts)
+
+
+def render_daily_digest(cards, heading=""):
+    """渲染每日词卡摘要，返回 (纯文本, HTML)。"""
+    return _render(cards, heading, daily_fields, DAILY_TEXT, _daily_html)
+
+
+def render_tiqiao_digest(cards, heading=""):
+    """渲染推敲词卡摘要，返回 (纯文本, HTML)。"""
+    return _render(cards, heading, tiqiao_fields, TIQIAO_TEXT, _tiqiao_html)
+
+
+def _sample_cards(count):
+    daily = [{
+        "id": i, "title": f"word{i}", "date": "2026-10-17", "status": "待推送",
+        "data": {"音标": "/wɜːd/", "释义": "单词 <释义>", "例句": "A word & an example.", "备注": "",
+                 "source": f"https://example.com/word/{i}"},
+    } for i in range(count)]
+    tiqiao = [{
+        "id": i, "date": "2026-10-17", "status": "待推送", "orig_cn": f"推敲{i}", "orig_en": "original",
+        "meaning": "真实内涵", "recommend": "recommended", "qtype": "搭配",
+    } for i in range(count)]
+    return daily, tiqiao
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="推送邮件渲染基准测试")
+    parser.add_argument("--cards", type=int, default=1000, help="每封摘要的卡片数")
+    parser.add_argument("--repeat", type=int, default=20, help="重复次数，取平均")
+    args = parser.parse_args(argv)
+
+    daily, tiqiao = _sample_cards(args.cards)
+    for name, render, cards in (("daily", render_daily_digest, daily), ("tiqiao", render_tiqiao_digest, tiqiao)):
+        start = time.perf_counter()
+        for _ in range(args.repeat):
+            text, page = render(cards, f"{name} 基准测试")
+        elapsed = (time.perf_counter() - start) / args.repeat
+        print(f"{name}: {args.cards} 张卡片 {elapsed * 1000:.2f} ms/次，"
+              f"纯文本 {len(text) / 1024:.0f} KB，HTML {len(page) / 1024:.0f} KB")
+
+
+if __name__ == "__main__":
+    main()
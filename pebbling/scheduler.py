@@ -0,0 +1,199 @@
+"""定时推送：不打开网页也能按时推送卡片。
+
+    python -m pebbling.scheduler          # 常驻运行，睡到下一个计划时间再醒
+    python -m pebbling.scheduler --once   # 补跑今天已到点、还没跑过的任务后退出，适合 cron / launchd
+
+在 secrets.toml 中配置：
+
+    [schedule]
+    timezone = "Asia/Shanghai"   # 省略时用本机时区
+    retry_minutes = 15           # 当天失败的推送多久续跑一次
+
+    [[schedule.jobs]]
+    name = "daily-morning"       # 运行锁按 name + 日期区分
+    table = "daily_cards"        # 或 tiqiao_cards
+    from_status = "待推送"
+    at = "08:00"
+    recipients = ["someone@example.com"]   # 省略时用 [recipients] emails
+
+每个任务每天在 scheduled_runs 插入一行运行锁，多个调度进程同时到点也只有一个会发信。
+"""
+
+import argparse
+import datetime
+import sys
+import time
+from zoneinfo import ZoneInfo
+
+from pebbling.client import get_client
+from pebbling.config import load_secrets
+from pebbling.jobs import (
+    create_push_job, fail_stale_job, get_job, list_jobs, is_resumable, is_stale, run_push_job,
+    ACTIVE_STATUSES, CARD_RENDERERS, PUSH_COLUMNS, PUSH_SUBJECTS,
+)
+from pebbling.mailer import sender_from_config, DEFAULT_CARDS_PER_MAIL
+
+RUNS_TABLE = "scheduled_runs"
+SENDER_SECTIONS = {"daily_cards": "email_daily", "tiqiao_cards": "email_tiqiao"}
+DEFAULT_RETRY_MINUTES = 15
+# PostgreSQL 唯一约束冲突
+UNIQUE_VIOLATION = "23505"
+
+
+def load_schedule(secrets):
+    """解析 [[schedule.jobs]]，按时间排序返回；配置有误时抛出 ValueError。"""
+    default_recipients = secrets.get("recipients", {}).get("emails", [])
+    jobs = []
+    for entry in secrets.get("schedule", {}).get("jobs", []):
+        name = entry.get("name")
+        table = entry.get("table", "daily_cards")
+        if not name:
+            raise ValueError("计划任务缺少 name")
+        if table not in SENDER_SECTIONS:
+            raise ValueError(f"计划任务 {name} 的 table 无效: {table}")
+        try:
+            at = datetime.time.fromisoformat(entry["at"])
+        except (KeyError, ValueError):
+            raise ValueError(f"计划任务 {name} 的 at 应为 HH:MM")
+        recipients = list(entry.get("recipients") or default_recipients)
+        if not recipients:
+            raise ValueError(f"计划任务 {name} 没有收件人")
+        jobs.append({
+            "name": name,
+            "table": table,
+            "from_status": entry.get("from_status", "待推送"),
+            "at": at,
+            "recipients": recipients,
+        })
+    return sorted(jobs, key=lambda job: job["at"])
+
+
+def claim_run(client, job_name, run_date):
+    """插入当天的运行锁，成功返回 True；别的进程已经插入过时返回 False。"""
+    try:
+        client.table(RUNS_TABLE).insert({"job_name": job_name, "run_date": run_date.isoformat()}).execute()
+    except Exception as e:
+        if getattr(e, "code", None) == UNIQUE_VIOLATION:
+            return False
+        raise
+    return True
+
+
+def _run_filter(query, job_name, run_date):
+    return query.eq("job_name", job_name).eq("run_date", run_date.isoformat())
+
+
+def release_run(client, job_name, run_date):
+    """删掉当天的运行锁，让下次醒来的调度进程重新认领。"""
+    _run_filter(client.table(RUNS_TABLE).delete(), job_name, run_date).execute()
+
+
+def run_scheduled_job(client, secrets, job, run_date, log=print):
+    """执行某个计划任务当天的推送；当天已推送完成或别的进程正在推送时什么都不做。"""
+    name, table = job["name"], job["table"]
+    active = list_jobs(client, table, statuses=ACTIVE_STATUSES, from_status=job["from_status"])
+    live = []
+    for push_job in active:
+        # 执行者崩溃后任务会一直停在 queued / running；租约过期的先标记失败，不再挡住后面的推送
+        if is_stale(push_job) and fail_stale_job(client, push_job["id"]):
+            log(f"⚠️ {name}: 推送任务 #{push_job['id']} 超过租约没有心跳（最后更新 {push_job['updated_at']}），"
+                f"已标记为失败，可在界面上续跑")
+        else:
+            live.append(push_job)
+    if live:
+        # 界面或其他进程正在推送同一批卡片，等下次醒来再说
+        log(f"⏳ {name}: 推送任务 #{live[0]['id']} 正在执行（最后心跳 {live[0].get('updated_at')}），跳过本次")
+        return None
+
+    if claim_run(client, name, run_date):
+        try:
+            push_job = create_push_job(client, table, job["from_status"],
+                                       f"{PUSH_SUBJECTS[table]} {run_date}", job["recipients"])
+            if push_job is not None:
+                update = client.table(RUNS_TABLE).update({"push_job_id": push_job["id"]})
+                _run_filter(update, name, run_date).execute()
+        except Exception:
+            # 锁已插入但没记上 push_job_id：不释放的话之后每次醒来都读到空的任务 id，当天就不再推送了。
+            # 已经建出来的 queued 任务没人执行，超过租约后会被标记为失败，不会一直挡住下次认领
+            release_run(client, name, run_date)
+            raise
+        if push_job is None:
+            log(f"ℹ️ {name}: 没有状态为 '{job['from_status']}' 的卡片")
+            return None
+        job_id = push_job["id"]
+    else:
+        res = _run_filter(client.table(RUNS_TABLE).select("push_job_id"), name, run_date).execute()
+        job_id = res.data[0].get("push_job_id") if res.data else None
+        # 今天已经跑过：只有失败或中断的任务需要续跑，run_push_job 认领时保证只有一个进程能抢到
+        push_job = get_job(client, job_id) if job_id else None
+        if push_job is None or not is_resumable(push_job):
+            return None
+        log(f"🔁 {name}: 续跑推送任务 #{job_id}")
+
+    section = secrets[SENDER_SECTIONS[table]]
+    smtp_config = secrets.get("smtp", {})
+    mail_sender = sender_from_config(section["sender_email"], section["app_password"], smtp_config)
+    try:
+        result = run_push_job(client, job_id, mail_sender, CARD_RENDERERS[table], PUSH_COLUMNS[table],
+                              int(smtp_config.get("cards_per_mail", DEFAULT_CARDS_PER_MAIL)))
+    finally:
+        mail_sender.close()
+    if result is None:
+        log(f"⏳ {name}: 推送任务 #{job_id} 已被其他进程认领")
+        return None
+    sent = len(result.get("sent_ids") or [])
+    total = len(result.get("card_ids") or [])
+    if result.get("error"):
+        log(f"❌ {name}: 推送任务 #{job_id} 失败（已发送 {sent}/{total} 张）：{result['error']}")
+    else:
+        log(f"✅ {name}: 推送任务 #{job_id} 完成，发送 {sent}/{total} 张")
+    return result
+
+
+def run_due_jobs(client, secrets, jobs, now, log=print):
+    """执行今天已经到点的所有任务。"""
+    for job in jobs:
+        if job["at"] <= now.time():
+            try:
+                run_scheduled_job(client, secrets, job, now.date(), log)
+            except Exception as e:
+                log(f"❌ {job['name']}: {type(e).__name__} - {e}")
+
+
+def seconds_until_next(jobs, now):
+    """距离下一个计划时间的秒数（今天都过了就看明天第一个）。"""
+    today = [datetime.datetime.combine(now.date(), job["at"], now.tzinfo) for job in jobs]
+    upcoming = [t for t in today if t > now]
+    if not upcoming:
+        tomorrow = now.date() + datetime.timedelta(days=1)
+        upcoming = [datetime.datetime.combine(tomorrow, jobs[0]["at"], now.tzinfo)]
+    return (min(upcoming) - now).total_seconds()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Pebbling 定时推送")
+    parser.add_argument("--once", action="store_true", help="补跑今天已到点的任务后退出")
+    parser.add_argument("--secrets", help="secrets.toml 路径，默认 .streamlit/secrets.toml")
+    args = parser.parse_args(argv)
+
+    secrets = load_secrets(args.secrets)
+    jobs = load_schedule(secrets)
+    if not jobs:
+        print("❌ secrets.toml 中没有配置 [[schedule.jobs]]")
+        return 1
+    schedule_config = secrets.get("schedule", {})
+    tz = ZoneInfo(schedule_config["timezone"]) if schedule_config.get("timezone") else None
+    retry_seconds = float(schedule_config.get("retry_minutes", DEFAULT_RETRY_MINUTES)) * 60
+    client = get_client(secrets)
+
+    while True:
+        run_due_jobs(client, secrets, jobs, datetime.datetime.now(tz))
+        if args.once:
+            return 0
+        # 睡到下一个计划时间，但至少每 retry_minutes 醒一次，续跑当天失败的任务
+        wait = seconds_until_next(jobs, datetime.datetime.now(tz))
+        time.sleep(max(1.0, min(wait, retry_seconds)))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
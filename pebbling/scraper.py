@@ -0,0 +1,221 @@
+"""网页抓取（共用 Session、条件请求缓存、按站点限速）和 Merriam-Webster 页面解析。
+
+多个词源的抓取和入库见 pebbling/sources.py。
+
+    python -m pebbling.scraper                                   # 抓取今天的 Merriam-Webster
+    python -m pebbling.scraper --backfill 2026-10-01 2026-10-16  # 回填一段日期到缓存
+"""
+
+import argparse
+import datetime
+import json
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from urllib.parse import urlsplit
+
+import requests
+from bs4 import BeautifulSoup
+
+try:
+    import lxml  # noqa: F401
+    HTML_PARSER = "lxml"
+except ImportError:
+    HTML_PARSER = "html.parser"
+
+WOD_URL = "https://www.merriam-webster.com/word-of-the-day"
+DEFAULT_CACHE_DIR = Path(__file__).resolve().parent.parent / ".cache" / "pages"
+DEFAULT_TIMEOUT_SECONDS = 10
+# 对同一站点每秒最多发出的请求数，以及回填的并发线程数
+DEFAULT_RATE_PER_SECOND = 1.0
+DEFAULT_WORKERS = 4
+HEADERS = {"User-Agent": "Mozilla/5.0"}
+
+
+def word_url(date=None):
+    """某天的每日一词页面；date 为 None 时是今天的入口页。"""
+    return WOD_URL if date is None else f"{WOD_URL}/{date.isoformat()}"
+
+
+def _text(tag):
+    return tag.get_text().strip() if tag else ""
+
+
+def parse_word_of_the_day(html, url=WOD_URL):
+    """从页面 HTML 解析出 {title, phonetic, definition, example, source}，解析不到的字段为空字符串。"""
+    soup = BeautifulSoup(html, HTML_PARSER)
+
+    # 词条：优先 .word-and-pronunciation h1，其次 <title>
+    title = _text(soup.select_one(".word-and-pronunciation h1"))
+    if not title and soup.title:
+        m = re.search(r"Word of the Day: ([^|]+)", soup.title.get_text())
+        title = m.group(1).strip() if m else ""
+
+    definition_box = soup.select_one(".wod-definition-container")
+    definition = _text(soup.select_one(".wod-definition-container > p"))
+
+    # 例句以 // 开头，位于释义容器内；只在容器缺失时才退回扫描全页
+    example = ""
+    for ptag in (definition_box.find_all("p") if definition_box else soup.find_all("p")):
+        text = ptag.get_text().strip()
+        if text.startswith("//"):
+            example = text.lstrip("/").strip()
+            break
+
+    return {
+        "title": title,
+        "phonetic": _text(soup.select_one(".word-syllables")),
+        "definition": definition,
+        "example": example,
+        "source": url,
+    }
+
+
+def parse_wod_date(html):
+    """页面标注的日期（.w-a-date，如 "October 16, 2026"），找不到或格式不对时为 None。"""
+    text = _text(BeautifulSoup(html, HTML_PARSER).select_one(".w-a-date"))
+    try:
+        return datetime.datetime.strptime(text, "%B %d, %Y").date()
+    except ValueError:
+        return None
+
+
+def fetch_word_of_the_day(fetcher, date):
+    """抓取并解析 date 那天的每日一词；页面是别的日期的词时丢掉缓存并抛出 ValueError。"""
+    url = word_url(date)
+    cache_key = f"merriam_webster/{date.isoformat()}"
+    html = fetcher.fetch_html(url, cache_key, immutable=date < datetime.date.today())
+    published = parse_wod_date(html)
+    if published is not None and published != date:
+        fetcher.forget(cache_key)
+        raise ValueError(f"页面是 {published} 的每日一词，不是 {date}")
+    return parse_word_of_the_day(html, url)
+
+
+class RateLimiter:
+    """线程安全的最小间隔限速：所有调用方合计每秒不超过 rate_per_second 次。"""
+
+    def __init__(self, rate_per_second=DEFAULT_RATE_PER_SECOND):
+        self.interval = 1.0 / rate_per_second if rate_per_second else 0.0
+        self._next_at = 0.0
+        self._lock = threading.Lock()
+
+    def wait(self):
+        with self._lock:
+            now = time.monotonic()
+            wait = self._next_at - now
+            self._next_at = max(now, self._next_at) + self.interval
+        if wait > 0:
+            time.sleep(wait)
+
+
+class PageFetcher:
+    """带磁盘缓存和按域名限速的页面抓取器；同一个实例可以在多个线程里共用。"""
+
+    def __init__(self, cache_dir=DEFAULT_CACHE_DIR, rate_per_second=DEFAULT_RATE_PER_SECOND,
+                 timeout=DEFAULT_TIMEOUT_SECONDS, session=None):
+        self.cache_dir = Path(cache_dir)
+        self.rate_per_second = rate_per_second
+        self.timeout = timeout
+        self.session = session or requests.Session()
+        self.session.headers.update(HEADERS)
+        self.requests = 0
+        self.not_modified = 0
+        self.cache_hits = 0
+        self._limiters = {}
+        self._lock = threading.Lock()
+
+    def _limiter(self, url):
+        host = urlsplit(url).netloc
+        with self._lock:
+            if host not in self._limiters:
+                self._limiters[host] = RateLimiter(self.rate_per_second)
+            return self._limiters[host]
+
+    def fetch_html(self, url, cache_key, immutable=False):
+        """返回页面 HTML；immutable 的页面命中缓存不发请求，其余用条件请求校验缓存。"""
+        html_path = self.cache_dir / f"{cache_key}.html"
+        meta_path = self.cache_dir / f"{cache_key}.json"
+        if html_path.exists() and immutable:
+            self.cache_hits += 1
+            return html_path.read_text(encoding="utf-8")
+
+        headers = {}
+        if html_path.exists() and meta_path.exists():
+            meta = json.loads(meta_path.read_text(encoding="utf-8"))
+            if meta.get("etag"):
+                headers["If-None-Match"] = meta["etag"]
+            if meta.get("last_modified"):
+                headers["If-Modified-Since"] = meta["last_modified"]
+        self._limiter(url).wait()
+        res = self.session.get(url, headers=headers, timeout=self.timeout)
+        self.requests += 1
+        if res.status_code == 304:
+            self.not_modified += 1
+            return html_path.read_text(encoding="utf-8")
+        res.raise_for_status()
+        html_path.parent.mkdir(parents=True, exist_ok=True)
+        html_path.write_text(res.text, encoding="utf-8")
+        meta_path.write_text(json.dumps({
+            "url": res.url,
+            "etag": res.headers.get("ETag"),
+            "last_modified": res.headers.get("Last-Modified"),
+            "fetched_at": datetime.datetime.now().isoformat(timespec="seconds"),
+        }), encoding="utf-8")
+        return res.text
+
+    def forget(self, cache_key):
+        """删掉某个页面的缓存。"""
+        for suffix in (".html", ".json"):
+            (self.cache_dir / f"{cache_key}{suffix}").unlink(missing_ok=True)
+
+
+class MerriamWebsterScraper(PageFetcher):
+    """Merriam-Webster 每日一词；往日页面不会再变，按日期永久缓存。"""
+
+    def fetch(self, date=None):
+        """抓取并解析某天的每日一词，date 为 None 时是今天。"""
+        return fetch_word_of_the_day(self, date or datetime.date.today())
+
+    def backfill(self, start, end, workers=DEFAULT_WORKERS):
+        """并发抓取 [start, end] 之间的每一天，返回 {date: 结果}；失败的日期结果为异常对象。"""
+        dates = [start + datetime.timedelta(days=n) for n in range((end - start).days + 1)]
+
+        def fetch_one(date):
+            try:
+                return self.fetch(date)
+            except Exception as e:
+                return e
+
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            return dict(zip(dates, pool.map(fetch_one, dates)))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="抓取 Merriam-Webster 每日一词")
+    parser.add_argument("--backfill", nargs=2, metavar=("START", "END"), help="回填日期范围，YYYY-MM-DD")
+    parser.add_argument("--rate", type=float, default=DEFAULT_RATE_PER_SECOND, help="每秒最多请求数")
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS, help="并发线程数")
+    args = parser.parse_args(argv)
+
+    scraper = MerriamWebsterScraper(rate_per_second=args.rate)
+    if args.backfill:
+        start, end = (datetime.date.fromisoformat(d) for d in args.backfill)
+        results = scraper.backfill(start, end, args.workers)
+    else:
+        results = {datetime.date.today(): scraper.fetch()}
+
+    for date, result in sorted(results.items()):
+        if isinstance(result, Exception):
+            print(f"❌ {date}: {type(result).__name__} - {result}")
+        elif result["title"]:
+            print(f"✅ {date}: {result['title']}")
+        else:
+            print(f"⚠️ {date}: 页面中没有找到词条")
+    print(f"请求 {scraper.requests} 次，缓存命中 {scraper.cache_hits} 次，304 {scraper.not_modified} 次")
+
+
+if __name__ == "__main__":
+    main()
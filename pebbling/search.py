@@ -0,0 +1,208 @@
+"""卡片全文检索的字段定义、进程内倒排索引和命令行。
+
+检索有三处实现，字段和权重都以 SEARCH_FIELDS 为准：本地镜像的 FTS5 表（CardMirror.search）、
+没有 FTS5 时镜像改用的 CardSearchIndex，以及服务端的 search_cards RPC。
+
+    python -m pebbling.search 释义                     # 在本地镜像里搜每日词卡
+    python -m pebbling.search 释义 --memory            # 用进程内索引搜，对比耗时
+    python -m pebbling.search "make sense" --table tiqiao_cards --server
+"""
+
+import argparse
+import math
+import re
+import threading
+import time
+from bisect import bisect_left
+
+from pebbling.cards import DAILY_TABLE, TIQIAO_TABLE, CARD_TABLES, search_cards
+
+# 表 -> {字段: 权重}；每日词卡的释义、例句在 data 里
+SEARCH_FIELDS = {
+    DAILY_TABLE: {"title": 3, "释义": 1, "例句": 1},
+    TIQIAO_TABLE: {"orig_cn": 2, "orig_en": 2, "meaning": 1, "recommend": 2, "qtype": 1},
+}
+
+_RUN_RE = re.compile(r"[0-9a-zÀ-ɏ]+|[㐀-鿿豈-﫿]+")
+
+
+def _runs(text):
+    for run in _RUN_RE.findall(str(text or "").lower()):
+        yield run, run[0] >= "㐀"
+
+
+def index_terms(text):
+    """文档切词：英文单词；中文每个单字加每对相邻两字。"""
+    terms = []
+    for run, cjk in _runs(text):
+        if cjk:
+            terms.extend(run)
+            terms.extend(run[i:i + 2] for i in range(len(run) - 1))
+        else:
+            terms.append(run)
+    return terms
+
+
+def query_terms(text):
+    """查询切词，返回 [(词, 是否允许前缀匹配)]：英文单词按前缀匹配，中文用 bigram，只有一个字时用单字。"""
+    terms = []
+    for run, cjk in _runs(text):
+        if not cjk:
+            terms.append((run, True))
+        elif len(run) == 1:
+            terms.append((run, False))
+        else:
+            terms.extend((run[i:i + 2], False) for i in range(len(run) - 1))
+    return list(dict.fromkeys(terms))
+
+
+def card_fields(table, card):
+    """{字段: 文本}；字段缺省时也看 data 里的同名键（两张表的旧数据都有这种行）。"""
+    data = card.get("data") or {}
+    return {field: card.get(field) or data.get(field) or "" for field in SEARCH_FIELDS[table]}
+
+
+class CardSearchIndex:
+    """一张卡片表的倒排索引，可以在多个线程里共用。"""
+
+    def __init__(self, table):
+        self.table = table
+        self.weights = SEARCH_FIELDS[table]
+        self.stale = True
+        self._postings = {}   # 词 -> {id: 权重}
+        self._doc_terms = {}  # id -> 该卡片出现过的词，删除时用
+        self._vocabulary = None  # 排好序的词表，前缀匹配时按需重建
+        self._lock = threading.RLock()
+
+    def __len__(self):
+        return len(self._doc_terms)
+
+    def mark_stale(self):
+        self.stale = True
+
+    def ensure(self, load):
+        """索引过期时调用 load() 取全量卡片重建；重建期间再 mark_stale 会在下次搜索前再建一次。"""
+        with self._lock:
+            if not self.stale:
+                return
+            self.stale = False
+            self.build(load())
+
+    def build(self, cards):
+        with self._lock:
+            self._postings = {}
+            self._doc_terms = {}
+            self.add(cards)
+
+    def add(self, cards):
+        """加入或替换卡片（按 id）。"""
+        with self._lock:
+            for card in cards:
+                card_id = card.get("id")
+                if card_id is None:
+                    continue
+                self._remove(card_id)
+                weights = {}
+                for field, text in card_fields(self.table, card).items():
+                    for term in index_terms(text):
+                        weights[term] = weights.get(term, 0) + self.weights[field]
+                for term, weight in weights.items():
+                    self._postings.setdefault(term, {})[card_id] = weight
+                self._doc_terms[card_id] = tuple(weights)
+            self._vocabulary = None
+
+    def remove(self, ids):
+        with self._lock:
+            for card_id in ids:
+                self._remove(card_id)
+            self._vocabulary = None
+
+    def _remove(self, card_id):
+        for term in self._doc_terms.pop(card_id, ()):
+            postings = self._postings[term]
+            del postings[card_id]
+            if not postings:
+                del self._postings[term]
+
+    def _expand(self, term, prefix):
+        if not prefix:
+            return [term] if term in self._postings else []
+        if self._vocabulary is None:
+            self._vocabulary = sorted(self._postings)
+        start = bisect_left(self._vocabulary, term)
+        matches = []
+        for candidate in self._vocabulary[start:]:
+            if not candidate.startswith(term):
+                break
+            matches.append(candidate)
+        return matches
+
+    def search(self, query, limit=None):
+        """返回按相关度排序的卡片 id 列表（同分按 id 降序）；查询里没有可检索的词时为空。"""
+        terms = query_terms(query)
+        if not terms:
+            return []
+        with self._lock:
+            total = len(self._doc_terms) or 1
+            groups = []
+            for term, prefix in terms:
+                scores = {}
+                for matched in self._expand(term, prefix):
+                    postings = self._postings[matched]
+                    idf = 1 + math.log(total / len(postings))
+                    for card_id, weight in postings.items():
+                        scores[card_id] = scores.get(card_id, 0) + weight * idf
+                if not scores:
+                    return []
+                groups.append(scores)
+            groups.sort(key=len)
+            ranked = {card_id: score for card_id, score in groups[0].items()
+                      if all(card_id in group for group in groups[1:])}
+            for group in groups[1:]:
+                for card_id in ranked:
+                    ranked[card_id] += group[card_id]
+        ids = sorted(ranked, key=lambda card_id: (-ranked[card_id], -card_id))
+        return ids if limit is None else ids[:limit]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m pebbling.search", description="全文检索卡片")
+    parser.add_argument("query")
+    parser.add_argument("--table", choices=CARD_TABLES, default=DAILY_TABLE)
+    parser.add_argument("--status", help="只搜这个状态的卡片")
+    parser.add_argument("--limit", type=int, default=10)
+    engine = parser.add_mutually_exclusive_group()
+    engine.add_argument("--server", action="store_true", help="调用 Supabase 的 search_cards RPC，不读本地镜像")
+    engine.add_argument("--memory", action="store_true", help="在本地镜像的卡片上建进程内索引再搜索")
+    parser.add_argument("--path", help="本地镜像路径，默认与界面相同")
+    parser.add_argument("--secrets", help="secrets.toml 路径，默认 .streamlit/secrets.toml；只有 --server 用到")
+    args = parser.parse_args(argv)
+
+    if args.server:
+        from pebbling.client import get_client
+        from pebbling.config import load_secrets
+
+        client = get_client(load_secrets(args.secrets))
+        start = time.perf_counter()
+        cards, total = search_cards(client, args.query, args.table, args.status, args.limit)
+        where = "Supabase search_cards"
+    else:
+        from pebbling.mirror import CardMirror, DEFAULT_MIRROR_PATH
+
+        mirror = CardMirror(args.path or DEFAULT_MIRROR_PATH, [args.table])
+        if args.memory:
+            mirror.fts = False
+            start = time.perf_counter()
+            index = mirror.search_index(args.table)
+            print(f"{len(index)} 张卡片，建索引 {(time.perf_counter() - start) * 1000:.0f} ms")
+        start = time.perf_counter()
+        cards, total = mirror.search(args.table, args.query, args.status, args.limit)
+        where = "进程内索引" if args.memory else ("本地镜像 FTS5" if mirror.fts else "进程内索引（没有 FTS5）")
+    print(f"{where}：{(time.perf_counter() - start) * 1000:.2f} ms，命中 {total} 张")
+    for card in cards:
+        fields = card_fields(args.table, card)
+        print(f"  {card['id']}: " + " | ".join(str(text) for text in fields.values() if text)[:120])
+
+
+if __name__ == "__main__":
+    main()
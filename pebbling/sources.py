@@ -0,0 +1,215 @@
+"""多词源每日一词入库：并发抓取、解析、去重后一次批量插入。
+
+每个词源是一个 WordSource 子类，给出某天的页面地址和解析函数。
+
+    python -m pebbling.sources                 # 填充最近 7 天
+    python -m pebbling.sources --days 3 --sources merriam_webster,wordsmith --dry-run
+"""
+
+import argparse
+import datetime
+import re
+from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
+
+from bs4 import BeautifulSoup
+
+from pebbling.cards import DEFAULT_STATUS, insert_new_cards
+from pebbling.client import get_client
+from pebbling.config import load_secrets
+from pebbling.scraper import (
+    PageFetcher, fetch_word_of_the_day, parse_word_of_the_day, word_url, HTML_PARSER, DEFAULT_WORKERS,
+)
+
+
+def _meta(soup, prop):
+    tag = soup.find("meta", attrs={"property": prop}) or soup.find("meta", attrs={"name": prop})
+    return tag.get("content", "").strip() if tag else ""
+
+
+def _text(tag):
+    return tag.get_text(" ", strip=True) if tag else ""
+
+
+class WordSource(ABC):
+    """词源插件接口：name 用作缓存目录和命令行参数，label 写进卡片备注；子类必须实现 url 和 parse。"""
+
+    name = ""
+    label = ""
+
+    def supports(self, date):
+        """默认只有今天的页面；能按日期回看往日的词源需要覆盖。"""
+        return date == datetime.date.today()
+
+    @abstractmethod
+    def url(self, date):
+        """某天的页面地址。"""
+
+    @abstractmethod
+    def parse(self, html, url):
+        """返回 {title, phonetic, definition, example, source}，解析不到的字段为空字符串。"""
+
+    def fetch(self, fetcher, date):
+        url = self.url(date)
+        html = fetcher.fetch_html(url, f"{self.name}/{date.isoformat()}",
+                                  immutable=date < datetime.date.today())
+        return self.parse(html, url)
+
+
+class MerriamWebster(WordSource):
+    name = "merriam_webster"
+    label = "Merriam-Webster"
+
+    def supports(self, date):
+        return date <= datetime.date.today()
+
+    def url(self, date):
+        return word_url(date)
+
+    def parse(self, html, url):
+        return parse_word_of_the_day(html, url)
+
+    def fetch(self, fetcher, date):
+        # 带日期的页面，且核对页面上的日期，不用不带日期的入口页按本机日期缓存
+        return fetch_word_of_the_day(fetcher, date)
+
+
+class Wordsmith(WordSource):
+    """A.Word.A.Day：正文按 PRONUNCIATION: / MEANING: / USAGE: 标签分段。"""
+
+    name = "wordsmith"
+    label = "Wordsmith"
+
+    def url(self, date):
+        return "https://wordsmith.org/words/today.html"
+
+    @staticmethod
+    def _section(soup, label):
+        node = soup.find(string=re.compile(rf"^\s*{label}:?\s*$"))
+        if node is None:
+            return ""
+        following = node.find_parent().find_next_sibling()
+        return _text(following)
+
+    def parse(self, html, url):
+        soup = BeautifulSoup(html, HTML_PARSER)
+        title = _meta(soup, "og:title") or _text(soup.title)
+        title = re.sub(r"^A\.Word\.A\.Day\s*-+\s*", "", title).strip()
+        return {
+            "title": title,
+            "phonetic": self._section(soup, "PRONUNCIATION").strip("()"),
+            "definition": self._section(soup, "MEANING") or _meta(soup, "og:description"),
+            "example": self._section(soup, "USAGE"),
+            "source": url,
+        }
+
+
+class DictionaryCom(WordSource):
+    name = "dictionary_com"
+    label = "Dictionary.com"
+
+    def url(self, date):
+        return "https://www.dictionary.com/e/word-of-the-day/"
+
+    def parse(self, html, url):
+        soup = BeautifulSoup(html, HTML_PARSER)
+        item = soup.select_one(".otd-item-headword") or soup
+        title = _text(item.select_one(".otd-item-headword__word"))
+        if not title:
+            m = re.search(r"Word of the Day\s*[-–|:]\s*([^|]+)", _meta(soup, "og:title") or _text(soup.title))
+            title = m.group(1).strip() if m else ""
+        pos_block = item.select_one(".otd-item-headword__pos-blocks")
+        definitions = pos_block.find_all("p") if pos_block else []
+        # 第一个 <p> 是词性，第二个才是释义
+        definition = _text(definitions[1]) if len(definitions) > 1 else _meta(soup, "og:description")
+        return {
+            "title": title,
+            "phonetic": _text(item.select_one(".otd-item-headword__pronunciation")),
+            "definition": definition,
+            "example": _text(soup.select_one(".wotd-example-sentence, .otd-item-example__sentence")),
+            "source": url,
+        }
+
+
+SOURCES = {source.name: source for source in (MerriamWebster(), Wordsmith(), DictionaryCom())}
+
+
+def to_daily_card(word, source, date):
+    """规范成每日词卡的行结构，data 与手工录入、Excel 导入一致。"""
+    return {
+        "title": word["title"],
+        "status": DEFAULT_STATUS,
+        "date": date.isoformat(),
+        "data": {
+            "音标": word["phonetic"],
+            "释义": word["definition"],
+            "例句": word["example"],
+            "备注": f"{source.label} {date.isoformat()}",
+            "source": word["source"],
+        },
+    }
+
+
+def collect_words(fetcher, sources, dates, workers=DEFAULT_WORKERS):
+    """并发抓取每个词源在 dates 中支持的日期，返回 (cards, errors)。
+
+    cards 按 sources 的顺序、日期从新到旧排列，去重时排在前面的词源优先；
+    errors 为 [(词源名, 日期, 异常)]。
+    """
+    tasks = [(source, date) for source in sources for date in sorted(dates, reverse=True) if source.supports(date)]
+
+    def fetch_one(task):
+        source, date = task
+        try:
+            return source.fetch(fetcher, date)
+        except Exception as e:
+            return e
+
+    cards, errors = [], []
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        for (source, date), result in zip(tasks, pool.map(fetch_one, tasks)):
+            if isinstance(result, Exception):
+                errors.append((source.name, date, result))
+            elif result["title"]:
+                cards.append(to_daily_card(result, source, date))
+            else:
+                errors.append((source.name, date, ValueError("页面中没有找到词条")))
+    return cards, errors
+
+
+def fill_recent_days(client, fetcher, days=7, source_names=None, dry_run=False):
+    """抓取最近 days 天（含今天）所有词源的每日一词并入库，返回 (新卡片, 抓取错误)。"""
+    today = datetime.date.today()
+    dates = [today - datetime.timedelta(days=n) for n in range(days)]
+    sources = [SOURCES[name] for name in (source_names or SOURCES)]
+    cards, errors = collect_words(fetcher, sources, dates)
+    return insert_new_cards(client, cards, dry_run=dry_run), errors
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="从多个词源抓取每日一词并导入 daily_cards")
+    parser.add_argument("--days", type=int, default=7, help="最近几天（含今天），默认 7")
+    parser.add_argument("--sources", default=",".join(SOURCES), help=f"逗号分隔，可选 {', '.join(SOURCES)}")
+    parser.add_argument("--dry-run", action="store_true", help="只抓取和比对，不写入数据库")
+    parser.add_argument("--secrets", help="secrets.toml 路径，默认 .streamlit/secrets.toml")
+    args = parser.parse_args(argv)
+
+    names = [name.strip() for name in args.sources.split(",") if name.strip()]
+    unknown = [name for name in names if name not in SOURCES]
+    if unknown:
+        parser.error(f"未知词源: {', '.join(unknown)}")
+
+    secrets = load_secrets(args.secrets)
+    client = get_client(secrets)
+    fetcher = PageFetcher()
+    new_cards, errors = fill_recent_days(client, fetcher, args.days, names, args.dry_run)
+    for name, date, error in errors:
+        print(f"❌ {name} {date}: {type(error).__name__} - {error}")
+    for card in new_cards:
+        print(f"{'🔍' if args.dry_run else '✅'} {card['date']} {card['title']} ({card['data']['备注']})")
+    print(f"{'待新增' if args.dry_run else '新增'} {len(new_cards)} 条每日词卡；"
+          f"请求 {fetcher.requests} 次，缓存命中 {fetcher.cache_hits} 次，304 {fetcher.not_modified} 次")
+
+
+if __name__ == "__main__":
+    main()
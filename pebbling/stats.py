@@ -0,0 +1,95 @@
+"""卡片表的汇总计数：优先读 supabase/migrations/20261017000500_card_stats.sql 的聚合视图，没有时逐项 count。"""
+
+import datetime
+
+from pebbling.cards import CARD_STATUSES, EMPTY_LABEL
+from pebbling.deliveries import DELIVERIES_TABLE
+from pebbling.paging import apply_empty_status_filter
+
+STATUS_VIEW = "card_status_counts"
+DAILY_VIEW = "card_daily_counts"
+PUSH_VIEW = "card_push_daily_counts"
+# 回退计数时，不属于规范状态也不为空的卡片归到这一项
+OTHER_LABEL = "其他"
+DEFAULT_DAYS = 30
+# 表或视图不存在：Postgres 的 undefined_table，以及 PostgREST 在 schema cache 里找不到关系
+MISSING_RELATION_CODES = {"42P01", "PGRST205"}
+
+
+def _is_missing_relation(error):
+    return getattr(error, "code", None) in MISSING_RELATION_CODES
+
+
+def _count(query):
+    return query.execute().count or 0
+
+
+def _recent_days(days, today=None):
+    today = today or datetime.date.today()
+    return [(today - datetime.timedelta(days=n)).isoformat() for n in range(days - 1, -1, -1)]
+
+
+def status_counts(client, table):
+    """{状态: 卡片数}，空状态记在 EMPTY_LABEL 下。"""
+    try:
+        res = client.table(STATUS_VIEW).select("status,cards").eq("table_name", table).execute()
+    except Exception as e:
+        if not _is_missing_relation(e):
+            raise
+        return _status_counts_fallback(client, table)
+    counts = {}
+    for row in res.data or []:
+        status = row["status"] or EMPTY_LABEL
+        counts[status] = counts.get(status, 0) + row["cards"]
+    return counts
+
+
+def _status_counts_fallback(client, table):
+    def head():
+        return client.table(table).select("id", count="exact", head=True)
+
+    counts = {status: _count(head().eq("status", status)) for status in CARD_STATUSES}
+    counts[EMPTY_LABEL] = _count(apply_empty_status_filter(head()))
+    counts[OTHER_LABEL] = _count(head()) - sum(counts.values())
+    return {status: count for status, count in counts.items() if count}
+
+
+def daily_counts(client, table, days=DEFAULT_DAYS, today=None):
+    """最近 days 天每天新增的卡片数 {YYYY-MM-DD: 卡片数}，没有新增的日子为 0。"""
+    day_keys = _recent_days(days, today)
+    try:
+        res = (client.table(DAILY_VIEW).select("day,cards")
+               .eq("table_name", table).gte("day", day_keys[0]).lte("day", day_keys[-1]).execute())
+    except Exception as e:
+        if not _is_missing_relation(e):
+            raise
+        return {day: _count(client.table(table).select("id", count="exact", head=True).eq("date", day))
+                for day in day_keys}
+    counts = dict.fromkeys(day_keys, 0)
+    for row in res.data or []:
+        counts[str(row["day"])[:10]] = row["cards"]
+    return counts
+
+
+def push_counts(client, table, days=DEFAULT_DAYS, today=None):
+    """最近 days 天每天推送出去的卡片数 {YYYY-MM-DD: 卡片数}。
+
+    回退计数时按投递条数计（一张卡片发给两个收件人算两次）。
+    """
+    day_keys = _recent_days(days, today)
+    try:
+        res = (client.table(PUSH_VIEW).select("day,cards")
+               .eq("table_name", table).gte("day", day_keys[0]).lte("day", day_keys[-1]).execute())
+    except Exception as e:
+        if not _is_missing_relation(e):
+            raise
+        counts = {}
+        for day in day_keys:
+            next_day = (datetime.date.fromisoformat(day) + datetime.timedelta(days=1)).isoformat()
+            counts[day] = _count(client.table(DELIVERIES_TABLE).select("card_id", count="exact", head=True)
+                                 .eq("table_name", table).gte("sent_at", day).lt("sent_at", next_day))
+        return counts
+    counts = dict.fromkeys(day_keys, 0)
+    for row in res.data or []:
+        counts[str(row["day"])[:10]] = row["cards"]
+    return counts
@@ -0,0 +1,39 @@
+"""卡片状态的批量流转。"""
+
+from pebbling.paging import apply_status_filter
+
+# in_ 过滤会写进 URL，按块提交避免 URL 过长；每块只有一次请求
+ID_CHUNK_SIZE = 200
+
+UPDATED = "updated"
+SKIPPED = "skipped"
+FAILED = "failed"
+
+
+def transition_card_status(client, table, ids, from_statuses, to_status):
+    """把 ids 中当前状态仍属于 from_statuses 的卡片一次性改为 to_status。
+
+    每块 ids 只发一条 update ... in_("id", ...) 请求，并带上状态条件，
+    所以已经被别处改走状态的卡片不会被覆盖，重复执行也不会重复流转。
+    返回 {id: (结果, 说明)}，结果为 UPDATED、SKIPPED（状态已变或卡片不存在）或 FAILED。
+    """
+    results = {}
+    ids = list(dict.fromkeys(ids))  # 去重并保持顺序
+    for start in range(0, len(ids), ID_CHUNK_SIZE):
+        chunk = ids[start:start + ID_CHUNK_SIZE]
+        try:
+            query = client.table(table).update({"status": to_status}).in_("id", chunk)
+            res = apply_status_filter(query, from_statuses).execute()
+        except Exception as e:
+            results.update({card_id: (FAILED, f"{type(e).__name__} - {e}") for card_id in chunk})
+            continue
+        if hasattr(res, "error") and res.error:
+            results.update({card_id: (FAILED, str(res.error)) for card_id in chunk})
+            continue
+        updated_ids = {row.get("id") for row in (res.data or [])}
+        for card_id in chunk:
+            if card_id in updated_ids:
+                results[card_id] = (UPDATED, "")
+            else:
+                results[card_id] = (SKIPPED, "状态已变化或卡片不存在")
+    return results
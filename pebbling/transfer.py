@@ -0,0 +1,201 @@
+"""卡片的流式导出 / 导入：按块读写，内存占用只与块大小有关。
+
+    python -m pebbling.transfer export daily_cards daily_cards_import.csv
+    python -m pebbling.transfer export tiqiao_cards tiqiao.parquet --from supabase
+    python -m pebbling.transfer export daily_cards daily.jsonl --from archive
+    python -m pebbling.transfer load daily_cards --dry-run
+"""
+
+import argparse
+import csv
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+from pathlib import Path
+
+from pebbling.cards import (
+    DAILY_TABLE, TIQIAO_TABLE, CARD_TABLES, DEFAULT_STATUS, TIQIAO_TEXT_FIELDS, SNAPSHOT_DIRS,
+    daily_card_row, tiqiao_card_row, insert_new_cards,
+)
+from pebbling.client import get_client
+from pebbling.config import load_secrets
+from pebbling.paging import iter_card_pages
+
+DEFAULT_CHUNK_SIZE = 500
+DEFAULT_WORKERS = 8
+
+# 导出列名 -> 每日词卡 data 里的键
+DAILY_DATA_COLUMNS = {"phonetic": "音标", "definition": "释义", "example": "例句", "note": "备注", "source": "source"}
+# 平铺后的导出列，与原 export_*.py 生成的 CSV 一致
+EXPORT_FIELDS = {
+    DAILY_TABLE: ["title", *DAILY_DATA_COLUMNS, "status", "date"],
+    TIQIAO_TABLE: [*TIQIAO_TEXT_FIELDS, "status", "date"],
+}
+
+
+def flatten_card(table, card):
+    """把一行卡片平铺成导出列。"""
+    if table == DAILY_TABLE:
+        data = card.get("data") or {}
+        row = {"title": card.get("title", "")}
+        row.update({column: data.get(key, "") for column, key in DAILY_DATA_COLUMNS.items()})
+    else:
+        row = {field: card.get(field, "") for field in TIQIAO_TEXT_FIELDS}
+    row["status"] = card.get("status", DEFAULT_STATUS)
+    row["date"] = card.get("date", "")
+    return row
+
+
+def _read_json(path):
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def iter_folder_chunks(folder, chunk_size=DEFAULT_CHUNK_SIZE, workers=DEFAULT_WORKERS):
+    """逐块产出文件夹里的卡片（每块一个 list，按文件名排序），块内的文件并发读取。"""
+    names = sorted(entry.name for entry in os.scandir(folder) if entry.is_file() and entry.name.endswith(".json"))
+    paths = (os.path.join(folder, name) for name in names)
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        while True:
+            chunk = list(islice(paths, chunk_size))
+            if not chunk:
+                return
+            yield list(pool.map(_read_json, chunk))
+
+
+def iter_supabase_chunks(client, table, chunk_size=DEFAULT_CHUNK_SIZE):
+    """逐页产出 Supabase 表里的卡片（按 id 降序）。"""
+    return iter_card_pages(client, table, page_size=chunk_size)
+
+
+class CsvSink:
+    def __init__(self, path, fields):
+        self._file = open(path, "w", newline="", encoding="utf-8")
+        self._writer = csv.DictWriter(self._file, fieldnames=fields)
+        self._writer.writeheader()
+
+    def write(self, rows):
+        self._writer.writerows(rows)
+
+    def close(self):
+        self._file.close()
+
+
+class JsonlSink:
+    def __init__(self, path, fields):
+        self._file = open(path, "w", encoding="utf-8")
+
+    def write(self, rows):
+        self._file.writelines(json.dumps(row, ensure_ascii=False) + "\n" for row in rows)
+
+    def close(self):
+        self._file.close()
+
+
+class ParquetSink:
+    """每块写成一个 row group；需要可选依赖 pyarrow。"""
+
+    def __init__(self, path, fields):
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise RuntimeError("导出 Parquet 需要安装 pyarrow：pip install pyarrow") from None
+        self._pa = pa
+        self._schema = pa.schema([(field, pa.string()) for field in fields])
+        self._writer = pq.ParquetWriter(str(path), self._schema)
+
+    def write(self, rows):
+        columns = {field: [None if row.get(field) is None else str(row[field]) for row in rows]
+                   for field in self._schema.names}
+        self._writer.write_table(self._pa.table(columns, schema=self._schema))
+
+    def close(self):
+        self._writer.close()
+
+
+SINKS = {"csv": CsvSink, "jsonl": JsonlSink, "parquet": ParquetSink}
+
+
+def export_cards(chunks, table, path, fmt=None, progress=None):
+    """把 chunks（卡片块的迭代器）平铺后逐块写到 path，格式缺省时按扩展名判断，返回写出的行数。"""
+    fmt = fmt or Path(path).suffix.lstrip(".").lower()
+    if fmt not in SINKS:
+        raise ValueError(f"不支持的导出格式: {fmt}（可选 {', '.join(SINKS)}）")
+    sink = SINKS[fmt](path, EXPORT_FIELDS[table])
+    written = 0
+    try:
+        for chunk in chunks:
+            sink.write([flatten_card(table, card) for card in chunk])
+            written += len(chunk)
+            if progress:
+                progress(written)
+    finally:
+        sink.close()
+    return written
+
+
+def load_folder(client, table, folder=None, batch_size=DEFAULT_CHUNK_SIZE, workers=DEFAULT_WORKERS,
+                dry_run=False, progress=None):
+    """把 JSON 文件夹按批导入 Supabase，库里已有（content_hash 相同）的卡片跳过，返回 (读取数, 新增数)。
+
+    文件里的 id、content_hash 等服务端字段不会写入，新卡片由数据库分配 id。
+    """
+    to_row = daily_card_row if table == DAILY_TABLE else tiqiao_card_row
+    read = inserted = 0
+    for chunk in iter_folder_chunks(folder or SNAPSHOT_DIRS[table], batch_size, workers):
+        rows = [to_row(card) for card in chunk]
+        if table == DAILY_TABLE:
+            rows = [row for row in rows if (row["title"] or "").strip()]
+        else:
+            rows = [row for row in rows if any(str(row[field] or "").strip() for field in TIQIAO_TEXT_FIELDS)]
+        read += len(chunk)
+        inserted += len(insert_new_cards(client, rows, table, dry_run))
+        if progress:
+            progress(read, inserted)
+    return read, inserted
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m pebbling.transfer", description="卡片的流式导出 / 导入")
+    parser.add_argument("--secrets", help="secrets.toml 路径，默认 .streamlit/secrets.toml")
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS, help="并发读取文件的线程数")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE, help="每块行数（也是导入的批大小）")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    export_parser = subparsers.add_parser("export", help="导出到 CSV / JSONL / Parquet")
+    export_parser.add_argument("table", choices=CARD_TABLES)
+    export_parser.add_argument("output", help="输出文件，扩展名决定格式")
+    export_parser.add_argument("--from", dest="source", choices=["folder", "archive", "supabase"],
+                               default="folder")
+    export_parser.add_argument("--folder", help="JSON 文件夹，默认仓库里对应的快照目录")
+    export_parser.add_argument("--archive", help="归档根目录，默认 archive/")
+    export_parser.add_argument("--format", choices=list(SINKS), help="覆盖按扩展名判断的格式")
+
+    load_parser = subparsers.add_parser("load", help="把 JSON 文件夹导入 Supabase")
+    load_parser.add_argument("table", choices=CARD_TABLES)
+    load_parser.add_argument("--folder", help="JSON 文件夹，默认仓库里对应的快照目录")
+    load_parser.add_argument("--dry-run", action="store_true", help="只比对，不写入")
+    args = parser.parse_args(argv)
+
+    if args.command == "export":
+        if args.source == "supabase":
+            client = get_client(load_secrets(args.secrets))
+            chunks = iter_supabase_chunks(client, args.table, args.chunk_size)
+        elif args.source == "archive":
+            from pebbling.archive import DEFAULT_ARCHIVE_DIR, CardArchive
+
+            chunks = CardArchive(args.table, args.archive or DEFAULT_ARCHIVE_DIR).iter_chunks(args.chunk_size)
+        else:
+            chunks = iter_folder_chunks(args.folder or SNAPSHOT_DIRS[args.table], args.chunk_size, args.workers)
+        count = export_cards(chunks, args.table, args.output, args.format)
+        print(f"已导出 {count} 条 {args.table} 到 {args.output}")
+    else:
+        client = get_client(load_secrets(args.secrets))
+        read, inserted = load_folder(client, args.table, args.folder, args.chunk_size, args.workers, args.dry_run)
+        print(f"读取 {read} 个文件，{'待新增' if args.dry_run else '新增'} {inserted} 条 {args.table}")
+
+
+if __name__ == "__main__":
+    main()
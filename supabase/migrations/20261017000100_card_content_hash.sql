@@ -0,0 +1,25 @@
+-- 卡片内容哈希：写入时由数据库计算并建索引，导入和去重按哈希查找，不再整表比对。
+-- 规范化规则必须与 pebbling/hashing.py 保持一致：
+--   连续空白合并为一个空格，去掉首尾空格；每日词卡标题再转小写。
+
+alter table daily_cards
+  add column if not exists content_hash text
+  generated always as (
+    md5(lower(btrim(regexp_replace(coalesce(title, ''), '\s+', ' ', 'g'))))
+  ) stored;
+
+create index if not exists daily_cards_content_hash_idx on daily_cards (content_hash);
+
+alter table tiqiao_cards
+  add column if not exists content_hash text
+  generated always as (
+    md5(
+      btrim(regexp_replace(coalesce(orig_cn, ''), '\s+', ' ', 'g')) || E'\x1f' ||
+      btrim(regexp_replace(coalesce(orig_en, ''), '\s+', ' ', 'g')) || E'\x1f' ||
+      btrim(regexp_replace(coalesce(meaning, ''), '\s+', ' ', 'g')) || E'\x1f' ||
+      btrim(regexp_replace(coalesce(recommend, ''), '\s+', ' ', 'g')) || E'\x1f' ||
+      btrim(regexp_replace(coalesce(qtype, ''), '\s+', ' ', 'g'))
+    )
+  ) stored;
+
+create index if not exists tiqiao_cards_content_hash_idx on tiqiao_cards (content_hash);
@@ -0,0 +1,20 @@
+-- 邮件推送任务：界面只负责提交，后台线程执行并逐块回写进度（见 pebbling/jobs.py）。
+-- card_ids 是提交时选中的卡片，sent_ids / updated_ids 记录已发信、已改为“已推送”的卡片，
+-- 进程中断后按 card_ids - sent_ids 续跑，同一张卡片不会重复发送。
+
+create table if not exists push_jobs (
+  id bigint generated by default as identity primary key,
+  table_name text not null check (table_name in ('daily_cards', 'tiqiao_cards')),
+  from_status text not null,
+  subject text not null,
+  recipients jsonb not null default '[]'::jsonb,
+  card_ids jsonb not null default '[]'::jsonb,
+  sent_ids jsonb not null default '[]'::jsonb,
+  updated_ids jsonb not null default '[]'::jsonb,
+  status text not null default 'queued' check (status in ('queued', 'running', 'done', 'failed')),
+  error text,
+  created_at timestamptz not null default now(),
+  updated_at timestamptz not null default now()
+);
+
+create index if not exists push_jobs_table_status_idx on push_jobs (table_name, status, id desc);
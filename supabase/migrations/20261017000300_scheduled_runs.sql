@@ -0,0 +1,10 @@
+-- 定时推送的运行锁（见 pebbling/scheduler.py）：每个计划任务每天只能插入一行，
+-- 多个调度进程同时到点时只有插入成功的那个会真正发信。
+
+create table if not exists scheduled_runs (
+  job_name text not null,
+  run_date date not null,
+  push_job_id bigint references push_jobs (id),
+  created_at timestamptz not null default now(),
+  primary key (job_name, run_date)
+);
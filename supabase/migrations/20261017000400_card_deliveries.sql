@@ -0,0 +1,52 @@
+-- 按收件人记录投递：每张卡片发给每个收件人都记一行，增量推送只挑收件人还没收到的卡片。
+-- 主键 (table_name, recipient, card_id) 同时就是 NOT EXISTS 反连接要走的索引。
+
+create table if not exists card_deliveries (
+  table_name text not null check (table_name in ('daily_cards', 'tiqiao_cards')),
+  recipient text not null,
+  card_id bigint not null,
+  push_job_id bigint references push_jobs (id) on delete set null,
+  sent_at timestamptz not null default now(),
+  primary key (table_name, recipient, card_id)
+);
+
+create index if not exists card_deliveries_sent_at_idx on card_deliveries (table_name, sent_at);
+
+-- 按状态筛选候选卡片、再按 id 翻页
+create index if not exists daily_cards_status_id_idx on daily_cards (status, id);
+create index if not exists tiqiao_cards_status_id_idx on tiqiao_cards (status, id);
+
+alter table push_jobs
+  add column if not exists mode text not null default 'status'
+  check (mode in ('status', 'incremental'));
+
+-- 收件人尚未收到的卡片 id，按 id 升序；p_after_id 作为翻页游标（PostgREST 同样会按 max-rows 截断结果）
+create or replace function undelivered_card_ids(
+  p_table text,
+  p_recipient text,
+  p_statuses text[] default null,
+  p_after_id bigint default null,
+  p_limit integer default 1000
+)
+returns table (id bigint)
+language plpgsql
+stable
+as $$
+begin
+  if p_table not in ('daily_cards', 'tiqiao_cards') then
+    raise exception 'unknown card table: %', p_table;
+  end if;
+  return query execute format(
+    'select c.id from %I c
+      where ($1::text[] is null or c.status = any($1))
+        and ($3::bigint is null or c.id > $3)
+        and not exists (
+          select 1 from card_deliveries d
+           where d.table_name = %L and d.recipient = $2 and d.card_id = c.id
+        )
+      order by c.id
+      limit $4',
+    p_table, p_table)
+  using p_statuses, p_recipient, p_after_id, p_limit;
+end;
+$$;
@@ -0,0 +1,31 @@
+-- 状态分布和每日新增 / 推送数的聚合视图：计数在数据库里完成，界面和脚本只取回几十行汇总。
+-- security_invoker 让视图按调用者的权限（和 RLS）读底表。
+
+create index if not exists daily_cards_date_idx on daily_cards (date);
+create index if not exists tiqiao_cards_date_idx on tiqiao_cards (date);
+
+-- 每张表每个状态的卡片数；status 原样保留（NULL、空字符串和不规范的写法各自一行）
+create or replace view card_status_counts
+with (security_invoker = true) as
+  select 'daily_cards'::text as table_name, status, count(*)::bigint as cards
+    from daily_cards group by status
+  union all
+  select 'tiqiao_cards'::text, status, count(*)::bigint
+    from tiqiao_cards group by status;
+
+-- 每天新增的卡片数，按卡片的 date 字段
+create or replace view card_daily_counts
+with (security_invoker = true) as
+  select 'daily_cards'::text as table_name, date as day, count(*)::bigint as cards
+    from daily_cards group by date
+  union all
+  select 'tiqiao_cards'::text, date, count(*)::bigint
+    from tiqiao_cards group by date;
+
+-- 每天推送出去的卡片数（同一张卡片发给多个收件人只算一次）和投递条数
+create or replace view card_push_daily_counts
+with (security_invoker = true) as
+  select table_name, sent_at::date as day,
+         count(distinct card_id)::bigint as cards, count(*)::bigint as deliveries
+    from card_deliveries
+   group by table_name, sent_at::date;
@@ -0,0 +1,28 @@
+-- 本地镜像的增量同步水位：每次 update 都由触发器刷新 updated_at，
+-- 镜像只需拉取 id 更大或 updated_at 不早于上次水位的行（见 pebbling/mirror.py）。
+
+create or replace function set_updated_at()
+returns trigger
+language plpgsql
+as $$
+begin
+  new.updated_at = now();
+  return new;
+end;
+$$;
+
+alter table daily_cards add column if not exists updated_at timestamptz not null default now();
+alter table tiqiao_cards add column if not exists updated_at timestamptz not null default now();
+
+drop trigger if exists daily_cards_set_updated_at on daily_cards;
+create trigger daily_cards_set_updated_at
+  before update on daily_cards
+  for each row execute function set_updated_at();
+
+drop trigger if exists tiqiao_cards_set_updated_at on tiqiao_cards;
+create trigger tiqiao_cards_set_updated_at
+  before update on tiqiao_cards
+  for each row execute function set_updated_at();
+
+create index if not exists daily_cards_updated_at_idx on daily_cards (updated_at);
+create index if not exists tiqiao_cards_updated_at_idx on tiqiao_cards (updated_at);
@@ -0,0 +1,76 @@
+-- 卡片全文检索：两张卡片表各加两列生成列和对应的 GIN 索引，search_cards RPC 按相关度分页返回。
+-- search_text：被检索字段拼成的纯文本，pg_trgm 索引加速 ilike '%词%'，中文没有分词也能子串匹配；
+-- search_tsv：按字段加权（A 高于 B）的 tsvector，只用于给英文单词排序。
+-- 字段与 pebbling/search.py 的 SEARCH_FIELDS 一致；本地镜像用 SQLite FTS5 做同样的事（pebbling/mirror.py）。
+
+create extension if not exists pg_trgm;
+
+alter table daily_cards
+  add column if not exists search_text text generated always as (
+    coalesce(title, '') || ' ' || coalesce(data->>'释义', '') || ' ' || coalesce(data->>'例句', '')
+  ) stored,
+  add column if not exists search_tsv tsvector generated always as (
+    setweight(to_tsvector('simple', coalesce(title, '')), 'A') ||
+    setweight(to_tsvector('simple', coalesce(data->>'释义', '') || ' ' || coalesce(data->>'例句', '')), 'B')
+  ) stored;
+
+alter table tiqiao_cards
+  add column if not exists search_text text generated always as (
+    coalesce(orig_cn, '') || ' ' || coalesce(orig_en, '') || ' ' || coalesce(meaning, '') || ' ' ||
+    coalesce(recommend, '') || ' ' || coalesce(qtype, '')
+  ) stored,
+  add column if not exists search_tsv tsvector generated always as (
+    setweight(to_tsvector('simple', coalesce(orig_cn, '') || ' ' || coalesce(orig_en, '') || ' ' ||
+                                    coalesce(recommend, '')), 'A') ||
+    setweight(to_tsvector('simple', coalesce(meaning, '') || ' ' || coalesce(qtype, '')), 'B')
+  ) stored;
+
+create index if not exists daily_cards_search_text_idx on daily_cards using gin (search_text gin_trgm_ops);
+create index if not exists daily_cards_search_tsv_idx on daily_cards using gin (search_tsv);
+create index if not exists tiqiao_cards_search_text_idx on tiqiao_cards using gin (search_text gin_trgm_ops);
+create index if not exists tiqiao_cards_search_tsv_idx on tiqiao_cards using gin (search_tsv);
+
+-- 按空白切开的每个词都必须以子串出现（不区分大小写）；排序：ts_rank + 整个查询与文本的 word_similarity，
+-- 同分按 id 降序。total 是不计分页的匹配总数，card 是去掉两列生成列的整行。
+-- 每个词单独生成一个 ilike 条件（%L 转义），这样每个条件都能走 trigram 索引。
+create or replace function search_cards(
+  p_table text,
+  p_query text,
+  p_statuses text[] default null,
+  p_limit integer default 50,
+  p_offset integer default 0
+)
+returns table (id bigint, rank real, total bigint, card jsonb)
+language plpgsql
+stable
+as $$
+declare
+  conditions text;
+begin
+  if p_table not in ('daily_cards', 'tiqiao_cards') then
+    raise exception 'unknown card table: %', p_table;
+  end if;
+  select string_agg(
+           format('c.search_text ilike %L',
+                  '%' || replace(replace(replace(term, '\', '\\'), '%', '\%'), '_', '\_') || '%'),
+           ' and ')
+    into conditions
+    from regexp_split_to_table(btrim(coalesce(p_query, '')), '\s+') as term
+   where term <> '';
+  if conditions is null then
+    return;
+  end if;
+  return query execute format(
+    'select c.id::bigint,
+            (ts_rank(c.search_tsv, plainto_tsquery(''simple'', $1)) + word_similarity($1, c.search_text))::real,
+            count(*) over (),
+            to_jsonb(c) - ''search_text'' - ''search_tsv''
+       from %I c
+      where ($2::text[] is null or c.status = any($2))
+        and %s
+      order by 2 desc, c.id desc
+      limit $3 offset $4',
+    p_table, conditions)
+  using p_query, p_statuses, p_limit, p_offset;
+end;
+$$;
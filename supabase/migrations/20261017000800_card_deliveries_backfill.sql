@@ -0,0 +1,41 @@
+-- card_deliveries 上线前推送过的卡片没有投递记录，第一次增量推送会把它们重发给每个收件人。
+-- 这些卡片当时发给了谁已经无从查起：把当前“已推送”的卡片记为发给了所有人（recipient = '*'），
+-- 增量推送对任何收件人都跳过它们（见 pebbling/deliveries.py 的 ALL_RECIPIENTS）。
+
+insert into card_deliveries (table_name, recipient, card_id)
+select 'daily_cards', '*', id from daily_cards where status = '已推送'
+on conflict do nothing;
+
+insert into card_deliveries (table_name, recipient, card_id)
+select 'tiqiao_cards', '*', id from tiqiao_cards where status = '已推送'
+on conflict do nothing;
+
+create or replace function undelivered_card_ids(
+  p_table text,
+  p_recipient text,
+  p_statuses text[] default null,
+  p_after_id bigint default null,
+  p_limit integer default 1000
+)
+returns table (id bigint)
+language plpgsql
+stable
+as $$
+begin
+  if p_table not in ('daily_cards', 'tiqiao_cards') then
+    raise exception 'unknown card table: %', p_table;
+  end if;
+  return query execute format(
+    'select c.id from %I c
+      where ($1::text[] is null or c.status = any($1))
+        and ($3::bigint is null or c.id > $3)
+        and not exists (
+          select 1 from card_deliveries d
+           where d.table_name = %L and d.recipient in ($2, ''*'') and d.card_id = c.id
+        )
+      order by c.id
+      limit $4',
+    p_table, p_table)
+  using p_statuses, p_recipient, p_after_id, p_limit;
+end;
+$$;
@@ -0,0 +1,189 @@
+"""测试用的内存版 Supabase 客户端，只实现 pebbling 里用到的那部分查询接口。"""
+
+import copy
+import itertools
+import operator
+
+_COMPARISONS = {"eq": operator.eq, "gt": operator.gt, "lt": operator.lt}
+# 表或视图不存在时 PostgREST 返回的错误码
+MISSING_RELATION = "42P01"
+
+
+class FakeError(Exception):
+    def __init__(self, code, message):
+        super().__init__(message)
+        self.code = code
+
+
+class Result:
+    def __init__(self, data, count=None):
+        self.data = data
+        self.count = count
+        self.error = None
+
+
+class Query:
+    def __init__(self, client, table):
+        self.client = client
+        self.table = table
+        self.filters = []
+        self.op = "select"
+        self.payload = None
+        self._order = []
+        self._limit = None
+        self._offset = 0
+        self.columns = "*"
+        self.count = None
+        self.head = False
+
+    def select(self, *columns, count=None, head=False):
+        self.columns = ",".join(columns) or "*"
+        self.count = count
+        self.head = head
+        return self
+
+    def _filter(self, predicate):
+        self.filters.append(predicate)
+        return self
+
+    def eq(self, column, value):
+        return self._filter(lambda row: row.get(column) == value)
+
+    def in_(self, column, values):
+        values = list(values)
+        return self._filter(lambda row: row.get(column) in values)
+
+    def lt(self, column, value):
+        return self._filter(lambda row: row.get(column) is not None and row[column] < value)
+
+    def gt(self, column, value):
+        return self._filter(lambda row: row.get(column) is not None and row[column] > value)
+
+    def gte(self, column, value):
+        return self._filter(lambda row: row.get(column) is not None and row[column] >= value)
+
+    def lte(self, column, value):
+        return self._filter(lambda row: row.get(column) is not None and row[column] <= value)
+
+    def or_(self, conditions):
+        """只支持逗号连接的简单条件：列.eq/gt/lt.值、列.is.null。"""
+        predicates = [_condition(*condition.split(".", 2)) for condition in conditions.split(",")]
+        return self._filter(lambda row: any(predicate(row) for predicate in predicates))
+
+    def order(self, column, desc=False):
+        self._order.append((column, desc))
+        return self
+
+    def limit(self, n):
+        self._limit = n
+        return self
+
+    def range(self, start, end):
+        self._offset, self._limit = start, end - start + 1
+        return self
+
+    def insert(self, rows):
+        self.op, self.payload = "insert", rows
+        return self
+
+    def update(self, values):
+        self.op, self.payload = "update", values
+        return self
+
+    def upsert(self, rows, on_conflict="id", ignore_duplicates=False):
+        self.op, self.payload = "upsert", rows
+        self.on_conflict = [column.strip() for column in on_conflict.split(",")]
+        self.ignore_duplicates = ignore_duplicates
+        return self
+
+    def delete(self):
+        self.op = "delete"
+        return self
+
+    def _project(self, row):
+        if self.columns == "*":
+            return copy.deepcopy(row)
+        return {column.strip(): copy.deepcopy(row.get(column.strip())) for column in self.columns.split(",")}
+
+    def _matching(self):
+        rows = self.client.tables.setdefault(self.table, [])
+        return [row for row in rows if all(predicate(row) for predicate in self.filters)]
+
+    def execute(self):
+        if self.table in self.client.missing:
+            raise FakeError(MISSING_RELATION, f'relation "{self.table}" does not exist')
+        rows = self.client.tables.setdefault(self.table, [])
+        if self.op != "select":
+            self.client.writes.append((self.table, self.op, copy.deepcopy(self.payload)))
+        if self.op == "insert":
+            new_rows = self.payload if isinstance(self.payload, list) else [self.payload]
+            inserted = [{"id": next(self.client.ids), **copy.deepcopy(row)} for row in new_rows]
+            rows.extend(inserted)
+            return Result(copy.deepcopy(inserted))
+        if self.op == "upsert":
+            written = []
+            for row in self.payload if isinstance(self.payload, list) else [self.payload]:
+                existing = [old for old in rows if all(old.get(k) == row.get(k) for k in self.on_conflict)]
+                if existing and self.ignore_duplicates:
+                    continue
+                if existing:
+                    existing[0].update(copy.deepcopy(row))
+                    written.append(existing[0])
+                else:
+                    rows.append({"id": next(self.client.ids), **copy.deepcopy(row)})
+                    written.append(rows[-1])
+            return Result(copy.deepcopy(written))
+        matched = self._matching()
+        if self.op == "update":
+            for row in matched:
+                row.update(copy.deepcopy(self.payload))
+            return Result(copy.deepcopy(matched))
+        if self.op == "delete":
+            self.client.tables[self.table] = [row for row in rows if all(row is not m for m in matched)]
+            return Result(copy.deepcopy(matched))
+        for column, desc in reversed(self._order):
+            matched.sort(key=lambda row: row.get(column), reverse=desc)
+        count = len(matched) if self.count else None
+        if self.head:
+            return Result([], count)
+        end = None if self._limit is None else self._offset + self._limit
+        matched = matched[self._offset:end]
+        return Result([self._project(row) for row in matched], count)
+
+
+def _condition(column, op, value):
+    if op == "is":
+        return lambda row: row.get(column) is None
+    value = value.strip('"')
+
+    def compare(row):
+        current = row.get(column)
+        return current is not None and _COMPARISONS[op](current, type(current)(value))
+    return compare
+
+
+class Rpc:
+    def __init__(self, client, name, params):
+        self.client = client
+        self.name = name
+        self.params = params
+
+    def execute(self):
+        self.client.rpc_calls.append((self.name, self.params))
+        return Result(self.client.rpcs[self.name](**self.params))
+
+
+class FakeClient:
+    def __init__(self, tables=None, rpcs=None, missing=()):
+        self.tables = tables or {}
+        self.rpcs = rpcs or {}
+        self.missing = set(missing)  # 查询时报“关系不存在”的表或视图
+        self.rpc_calls = []
+        self.writes = []  # (表, 操作, 写入的内容)，按执行顺序
+        self.ids = itertools.count(1)
+
+    def table(self, name):
+        return Query(self, name)
+
+    def rpc(self, name, params=None):
+        return Rpc(self, name, params or {})
@@ -0,0 +1,71 @@
+import json
+
+from pebbling.archive import CardArchive
+
+
+def card(card_id, date, title="word"):
+    return {"id": card_id, "date": date, "title": title}
+
+
+def reopen(archive):
+    """丢掉索引文件后重新打开，强制从数据文件重建。"""
+    archive.close()
+    (archive.path / "index.json").unlink()
+    return CardArchive(archive.table, archive.path.parent)
+
+
+def test_append_get_scan(tmp_path):
+    with CardArchive("daily_cards", tmp_path) as archive:
+        archive.append([card(1, "2025-05-01"), card(2, "2025-06-01")])
+        archive.append([card(1, "2025-05-01", "updated")])
+        assert len(archive) == 2
+        assert archive.get(1)["title"] == "updated"
+        assert [c["id"] for c in archive.scan()] == [1, 2]
+
+
+def test_move_to_earlier_month_survives_rebuild(tmp_path):
+    archive = CardArchive("daily_cards", tmp_path)
+    archive.append([card(1, "2025-06-01")])
+    archive.append([card(1, "2025-05-01", "moved")])
+    archive = reopen(archive)
+    assert len(archive) == 1
+    assert archive.get(1)["title"] == "moved"
+    assert [c["title"] for c in archive.scan()] == ["moved"]
+    archive.close()
+
+
+def test_move_out_and_back_survives_rebuild(tmp_path):
+    archive = CardArchive("daily_cards", tmp_path)
+    archive.append([card(1, "2025-05-01", "v1")])
+    archive.append([card(1, "2025-06-01", "v2")])
+    archive.append([card(1, "2025-05-01", "v3")])
+    archive = reopen(archive)
+    assert len(archive) == 1
+    assert archive.get(1)["title"] == "v3"
+    archive.close()
+
+
+def test_delete_survives_rebuild_and_compact(tmp_path):
+    archive = CardArchive("daily_cards", tmp_path)
+    archive.append([card(1, "2025-06-01"), card(2, "2025-06-02")])
+    archive.append([card(1, "2025-05-01")])
+    archive.delete([1])
+    archive = reopen(archive)
+    assert 1 not in archive and archive.get(2) is not None
+    archive.compact()
+    archive = reopen(archive)
+    assert [c["id"] for c in archive.scan()] == [2]
+    archive.close()
+
+
+def test_size_mismatch_triggers_rebuild(tmp_path):
+    archive = CardArchive("daily_cards", tmp_path)
+    archive.append([card(1, "2025-05-01")])
+    archive.close()
+    # 手工追加一行（序号比已有的都大），索引里记的文件大小与实际不符
+    with open(archive.path / "2025-04.jsonl", "a", encoding="utf-8") as f:
+        f.write(json.dumps({"seq": 99, "card": card(1, "2025-04-01", "manual")}) + "\n")
+    with CardArchive("daily_cards", tmp_path) as archive:
+        assert archive.get(1)["title"] == "manual"
+        archive.append([card(2, "2025-05-02")])
+        assert archive.get(2) is not None
@@ -0,0 +1,66 @@
+import pebbling.cache
+from pebbling.cache import CardCache
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def fetcher(*results):
+    calls = []
+    results = list(results)
+
+    def fetch():
+        calls.append(1)
+        return results.pop(0)
+    return fetch, calls
+
+
+def test_hits_until_ttl_expires(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(pebbling.cache.time, "monotonic", clock)
+    cache = CardCache(ttl_seconds=60)
+    fetch, calls = fetcher(["old"], ["new"])
+
+    assert cache.get(("daily_cards", "all"), fetch) == ["old"]
+    clock.now += 59
+    assert cache.get(("daily_cards", "all"), fetch) == ["old"]
+    clock.now += 1
+    assert cache.get(("daily_cards", "all"), fetch) == ["new"]
+    assert len(calls) == 2
+    assert cache.stats() == {"hits": 1, "misses": 2, "hit_rate": 1 / 3, "entries": 1}
+
+
+def test_invalidate_only_clears_that_table():
+    cache = CardCache(ttl_seconds=60)
+    daily, daily_calls = fetcher(["d1"], ["d2"])
+    tiqiao, tiqiao_calls = fetcher(["t1"])
+    cache.get(("daily_cards", "all"), daily)
+    cache.get(("tiqiao_cards", "all"), tiqiao)
+
+    cache.invalidate("daily_cards")
+
+    assert cache.get(("daily_cards", "all"), daily) == ["d2"]
+    assert cache.get(("tiqiao_cards", "all"), tiqiao) == ["t1"]
+    assert (len(daily_calls), len(tiqiao_calls)) == (2, 1)
+
+
+def test_result_fetched_across_invalidate_is_not_cached():
+    cache = CardCache(ttl_seconds=60)
+    key = ("daily_cards", "all")
+
+    def stale_fetch():
+        # 拉取过程中另一处写入了这张表
+        cache.invalidate("daily_cards")
+        return ["stale"]
+
+    assert cache.get(key, stale_fetch) == ["stale"]
+    assert cache.stats()["entries"] == 0
+    fresh, calls = fetcher(["fresh"])
+    assert cache.get(key, fresh) == ["fresh"]
+    assert cache.get(key, fresh) == ["fresh"]
+    assert len(calls) == 1
@@ -0,0 +1,40 @@
+from fake_supabase import FakeClient
+
+from pebbling.cards import card_content_hash
+from pebbling.dedupe import find_duplicate_groups, remove_duplicates
+
+
+def dedupe_client():
+    titles = ["serendipity", "Serendipity ", "ephemeral", "a  priori", "ephemeral", "A priori", "serendipity"]
+    rows = [{"id": i, "title": title} for i, title in enumerate(titles, start=1)]
+    for row in rows:
+        # 模拟数据库的 content_hash 生成列
+        row["content_hash"] = card_content_hash("daily_cards", row)
+    return FakeClient({"daily_cards": rows})
+
+
+def remaining_ids(client):
+    return sorted(row["id"] for row in client.tables["daily_cards"])
+
+
+def test_groups_span_pages_and_keep_ids_sorted():
+    groups = find_duplicate_groups(dedupe_client(), "daily_cards", page_size=2)
+    assert sorted(groups.values()) == [[1, 2, 7], [3, 5], [4, 6]]
+
+
+def test_dry_run_reports_without_deleting():
+    client = dedupe_client()
+    report = remove_duplicates(client, "daily_cards", page_size=2)
+
+    assert (report["groups"], report["duplicates"], report["deleted"]) == (3, 4, 0)
+    assert report["largest"][0][1] == [1, 2, 7]
+    assert remaining_ids(client) == [1, 2, 3, 4, 5, 6, 7]
+
+
+def test_delete_keeps_smallest_id_per_group():
+    client = dedupe_client()
+    report = remove_duplicates(client, "daily_cards", dry_run=False, page_size=2)
+
+    assert report["deleted"] == 4
+    assert remaining_ids(client) == [1, 3, 4]
+    assert remove_duplicates(client, "daily_cards")["groups"] == 0
@@ -0,0 +1,13 @@
+from fake_supabase import FakeClient
+
+from pebbling.deliveries import ALL_RECIPIENTS, DELIVERIES_TABLE, delivered_card_ids
+
+
+def test_backfilled_deliveries_count_for_every_recipient():
+    client = FakeClient({DELIVERIES_TABLE: [
+        {"table_name": "daily_cards", "recipient": ALL_RECIPIENTS, "card_id": 1},
+        {"table_name": "daily_cards", "recipient": "a@example.com", "card_id": 2},
+        {"table_name": "tiqiao_cards", "recipient": ALL_RECIPIENTS, "card_id": 3},
+    ]})
+    assert delivered_card_ids(client, "daily_cards", [1, 2, 3], "a@example.com") == {1, 2}
+    assert delivered_card_ids(client, "daily_cards", [1, 2, 3], "b@example.com") == {1}
@@ -0,0 +1,97 @@
+"""content_hash 的 Python 实现必须与迁移里生成列的 SQL 表达式逐字节一致，去重和导入都依赖这一点。
+
+这里把迁移文件里的表达式原样取出，在 sqlite 里按 Postgres 的语义注册 md5 / btrim / regexp_replace 执行。
+"""
+
+import hashlib
+import re
+import sqlite3
+from pathlib import Path
+
+import pytest
+
+from pebbling.cards import DAILY_TABLE, TIQIAO_TABLE, TIQIAO_TEXT_FIELDS, card_content_hash
+
+MIGRATION = Path(__file__).resolve().parent.parent / "supabase/migrations/20261017000100_card_content_hash.sql"
+COLUMNS = {DAILY_TABLE: ["title"], TIQIAO_TABLE: list(TIQIAO_TEXT_FIELDS)}
+# Postgres 正则里的 \s 是 [[:space:]]，只测 ASCII 空白
+PG_CLASSES = {r"\s": r"[ \t\n\r\f\v]"}
+
+
+def sql_expression(table):
+    sql = MIGRATION.read_text(encoding="utf-8")
+    match = re.search(rf"alter table {table}\b.*?generated always as \((.*?)\)\s*stored;", sql, re.S)
+    assert match, f"迁移里没有 {table} 的 content_hash"
+    # E'\x1f' 是 Postgres 的转义字符串，sqlite 里写成 char(31)
+    return re.sub(r"E'\\x([0-9a-f]{2})'", lambda m: f"char({int(m.group(1), 16)})", match.group(1))
+
+
+def regexp_replace(text, pattern, replacement, flags=""):
+    for pg_class, python_class in PG_CLASSES.items():
+        pattern = pattern.replace(pg_class, python_class)
+    return re.sub(pattern, replacement, text, count=0 if "g" in flags else 1)
+
+
+@pytest.fixture
+def db():
+    conn = sqlite3.connect(":memory:")
+    conn.create_function("md5", 1, lambda text: hashlib.md5(text.encode("utf-8")).hexdigest())
+    conn.create_function("btrim", 1, lambda text: text.strip(" "))
+    conn.create_function("regexp_replace", 4, regexp_replace)
+    conn.create_function("lower", 1, str.lower)
+    for table, columns in COLUMNS.items():
+        conn.execute(f"create table {table} ({', '.join(columns)})")
+    yield conn
+    conn.close()
+
+
+def sql_hash(db, table, card):
+    columns = COLUMNS[table]
+    db.execute(f"delete from {table}")
+    db.execute(f"insert into {table} values ({', '.join('?' * len(columns))})", [card.get(c) for c in columns])
+    return db.execute(f"select {sql_expression(table)} from {table}").fetchone()[0]
+
+
+@pytest.mark.parametrize("title", [
+    "serendipity",
+    "  Serendipity ",
+    "SERENDIPITY\t",
+    "a   priori",
+    "a\t\n priori",
+    "",
+    None,
+])
+def test_daily_hash_matches_sql(db, title):
+    card = {"title": title}
+    assert card_content_hash(DAILY_TABLE, card) == sql_hash(db, DAILY_TABLE, card)
+
+
+def test_daily_hash_collapses_whitespace_and_ignores_case(db):
+    hashes = {card_content_hash(DAILY_TABLE, {"title": title}) for title in ["A  Priori", " a\tpriori\n", "a priori"]}
+    assert len(hashes) == 1
+    assert hashes == {sql_hash(db, DAILY_TABLE, {"title": "A\n\npriori "})}
+
+
+TIQIAO_CARDS = [
+    {"orig_cn": "推敲", "orig_en": "Deliberate", "meaning": "反复斟酌", "recommend": "weigh", "qtype": "词"},
+    {"orig_cn": "  推  敲 ", "orig_en": "deliberate\t", "meaning": "反复\n斟酌", "recommend": "", "qtype": None},
+    {"orig_cn": None, "orig_en": None, "meaning": None, "recommend": None, "qtype": None},
+]
+
+
+@pytest.mark.parametrize("card", TIQIAO_CARDS)
+def test_tiqiao_hash_matches_sql(db, card):
+    assert card_content_hash(TIQIAO_TABLE, card) == sql_hash(db, TIQIAO_TABLE, card)
+
+
+def test_tiqiao_hash_keeps_case_and_field_order(db):
+    card = dict(TIQIAO_CARDS[0])
+    swapped = {**card, "orig_cn": card["meaning"], "meaning": card["orig_cn"]}
+    lowered = {**card, "orig_en": card["orig_en"].lower()}
+    # 只有值相同、字段换位的两张卡片不能算重复；推敲词卡区分大小写
+    for other in (swapped, lowered):
+        assert card_content_hash(TIQIAO_TABLE, other) != card_content_hash(TIQIAO_TABLE, card)
+        assert card_content_hash(TIQIAO_TABLE, other) == sql_hash(db, TIQIAO_TABLE, other)
+    # 相邻字段的内容挪位也不会拼出同一个哈希
+    shifted = {**card, "orig_cn": card["orig_cn"] + card["orig_en"], "orig_en": ""}
+    assert card_content_hash(TIQIAO_TABLE, shifted) != card_content_hash(TIQIAO_TABLE, card)
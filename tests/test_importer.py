@@ -0,0 +1,100 @@
+import datetime
+from types import SimpleNamespace
+
+import pandas as pd
+from fake_supabase import FakeClient
+
+from pebbling.cards import DEFAULT_STATUS, card_content_hash
+from pebbling.importer import (
+    find_existing_by_hash, normalise_daily_frame, normalise_tiqiao_frame, plan_daily_import, plan_tiqiao_import,
+    upload_file_id, write_import_plan,
+)
+
+DAILY_COLUMNS = "id,content_hash,title,status,date,data"
+TODAY = datetime.date.today().isoformat()
+
+
+def daily_sheet(*rows):
+    return pd.DataFrame([{"Word": title, "Definition": definition, "Status": status}
+                         for title, definition, status in rows])
+
+
+def daily_data(definition):
+    return {"音标": "", "释义": definition, "例句": "", "备注": "", "source": ""}
+
+
+def with_content_hash(client, table):
+    """模拟数据库的 content_hash 生成列。"""
+    for row in client.tables[table]:
+        row["content_hash"] = card_content_hash(table, row)
+    return client
+
+
+def import_daily(client, sheet):
+    frame = normalise_daily_frame(sheet)
+    return plan_daily_import(frame, find_existing_by_hash(client, "daily_cards", frame, DAILY_COLUMNS))
+
+
+def existing_daily_client():
+    return with_content_hash(FakeClient({"daily_cards": [
+        {"id": 1, "title": "serendipity", "status": "已审阅", "date": "2026-01-01", "data": daily_data("意外发现")},
+        {"id": 2, "title": "lagniappe", "status": "待推送", "date": "2026-01-02", "data": daily_data("赠品")},
+    ]}), "daily_cards")
+
+
+def test_daily_plan_skips_unchanged_rows():
+    inserts, upserts, unchanged = import_daily(existing_daily_client(), daily_sheet(("serendipity", "意外发现", "")))
+    assert (inserts, upserts, unchanged) == ([], [], 1)
+
+
+def test_daily_plan_updates_by_content_hash_and_keeps_status_and_date():
+    # 标题大小写、空白不同也是同一个哈希
+    inserts, upserts, unchanged = import_daily(existing_daily_client(),
+                                               daily_sheet(("  Lagniappe ", "商家额外赠送的小礼物", "未审阅")))
+    assert inserts == [] and unchanged == 0
+    assert upserts == [{"id": 2, "title": "Lagniappe", "status": "待推送", "date": "2026-01-02",
+                        "data": daily_data("商家额外赠送的小礼物")}]
+
+
+def test_daily_plan_inserts_new_titles_with_default_status():
+    sheet = daily_sheet(("quokka", "短尾矮袋鼠", ""), ("", "没有标题的行", ""), ("quokka", "短尾袋鼠", ""))
+    inserts, upserts, unchanged = import_daily(existing_daily_client(), sheet)
+    # 无标题的行丢弃；表格里重复的标题保留最后一行
+    assert inserts == [{"title": "quokka", "status": DEFAULT_STATUS, "date": TODAY, "data": daily_data("短尾袋鼠")}]
+    assert upserts == [] and unchanged == 0
+
+
+def test_tiqiao_plan_matches_all_text_fields():
+    existing = {"orig_cn": "有道理", "orig_en": "make sense", "meaning": "", "recommend": "make sense", "qtype": "搭配"}
+    client = with_content_hash(FakeClient({"tiqiao_cards": [{"id": 1, "status": "已审阅", **existing}]}),
+                               "tiqiao_cards")
+    sheet = pd.DataFrame([
+        {"原始中文": "有道理", "原始英文": "make  sense", "推荐英文": "make sense", "问题类型": "搭配"},
+        {"原始中文": "有道理", "原始英文": "make sense", "推荐英文": "sounds right", "问题类型": "搭配"},
+    ])
+    frame = normalise_tiqiao_frame(sheet)
+    existing_by_key = find_existing_by_hash(client, "tiqiao_cards", frame, "id,content_hash")
+    inserts, upserts, unchanged = plan_tiqiao_import(frame, existing_by_key)
+    assert unchanged == 1 and upserts == []
+    assert [row["recommend"] for row in inserts] == ["sounds right"]
+    assert inserts[0]["status"] == DEFAULT_STATUS
+
+
+def test_reimporting_the_same_sheet_writes_nothing():
+    client = FakeClient({"daily_cards": []})
+    sheet = daily_sheet(("serendipity", "意外发现", ""), ("quokka", "短尾袋鼠", "待推送"))
+    inserts, upserts, _ = import_daily(client, sheet)
+    assert write_import_plan(client, "daily_cards", inserts, upserts, batch_size=1) == (2, 0)
+    assert len(client.writes) == 2
+    with_content_hash(client, "daily_cards")
+
+    inserts, upserts, unchanged = import_daily(client, sheet)
+    assert (inserts, upserts, unchanged) == ([], [], 2)
+    assert write_import_plan(client, "daily_cards", inserts, upserts) == (0, 0)
+    assert len(client.writes) == 2
+
+
+def test_upload_file_id_is_stable_for_one_upload():
+    upload = SimpleNamespace(file_id="f1", name="cards.xlsx", size=10)
+    assert upload_file_id(upload) == "f1"
+    assert upload_file_id(SimpleNamespace(name="cards.xlsx", size=10)) == ("cards.xlsx", 10)
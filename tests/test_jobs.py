@@ -0,0 +1,203 @@
+import threading
+import time
+
+from fake_supabase import FakeClient
+
+import pebbling.jobs as jobs
+from pebbling.deliveries import DELIVERIES_TABLE, ALL_RECIPIENTS
+from pebbling.jobs import (
+    JOBS_TABLE, LEASE_SECONDS, QUEUED, RUNNING, DONE, FAILED, INCREMENTAL_MODE, PUSHED_STATUS,
+    claim_job, is_resumable, is_stale, run_push_job, _now,
+)
+
+
+def job_row(status, updated_at=None):
+    return {
+        "id": 1, "table_name": "daily_cards", "from_status": "待推送", "subject": "s",
+        "recipients": ["a@example.com"], "card_ids": [1, 2], "status": status,
+        "updated_at": updated_at or _now(),
+    }
+
+
+def client_with(job):
+    return FakeClient({JOBS_TABLE: [job]})
+
+
+def test_claim_is_compare_and_set():
+    client = client_with(job_row(QUEUED))
+    assert claim_job(client, 1)
+    assert client.tables[JOBS_TABLE][0]["status"] == RUNNING
+    # 第二个调用方（例如另一个进程点了续跑）认领不到
+    assert not claim_job(client, 1)
+
+
+def test_claim_failed_job_clears_error():
+    job = {**job_row(FAILED), "error": "boom"}
+    client = client_with(job)
+    assert claim_job(client, 1)
+    assert client.tables[JOBS_TABLE][0]["error"] is None
+
+
+def test_done_job_cannot_be_claimed():
+    assert not claim_job(client_with(job_row(DONE)), 1)
+
+
+def test_running_job_with_fresh_heartbeat_is_not_resumable():
+    job = job_row(RUNNING)
+    assert not is_stale(job)
+    assert not is_resumable(job)
+    assert not claim_job(client_with(job), 1)
+
+
+def test_running_job_with_expired_lease_is_resumable():
+    job = job_row(RUNNING, _now(-LEASE_SECONDS - 60))
+    assert is_stale(job)
+    assert is_resumable(job)
+    assert claim_job(client_with(job), 1)
+
+
+def test_failed_job_is_resumable():
+    assert is_resumable(job_row(FAILED))
+
+
+class RecordingSender:
+    """记下每封信的卡片 id；fail_on 里的第 n 封（从 1 起）抛出异常。"""
+
+    sender = "me@example.com"
+
+    def __init__(self, fail_on=(), on_send=None):
+        self.mails = []
+        self.fail_on = set(fail_on)
+        self.on_send = on_send
+        self.attempts = 0
+
+    def send(self, msg, recipients):
+        self.attempts += 1
+        if self.on_send:
+            self.on_send()
+        if self.attempts in self.fail_on:
+            raise OSError("连接被重置")
+        body = msg.get_payload()[0].get_payload(decode=True).decode("utf-8")
+        self.mails.append((list(recipients), [int(card_id) for card_id in body.split()]))
+
+    def close(self):
+        pass
+
+
+def render(cards, heading):
+    return " ".join(str(card["id"]) for card in cards), None
+
+
+def card(card_id, status="待推送"):
+    return {"id": card_id, "title": f"word{card_id}", "status": status}
+
+
+def push_client(job, cards, deliveries=()):
+    return FakeClient({JOBS_TABLE: [job], "daily_cards": cards, DELIVERIES_TABLE: list(deliveries)})
+
+
+def statuses(client):
+    return {row["id"]: row["status"] for row in client.tables["daily_cards"]}
+
+
+def delivered(client):
+    return sorted((row["recipient"], row["card_id"]) for row in client.tables[DELIVERIES_TABLE])
+
+
+def test_run_push_job_does_not_send_when_claimed_elsewhere():
+    sender = RecordingSender()
+    client = client_with(job_row(RUNNING))
+    assert run_push_job(client, 1, sender, render) is None
+    assert sender.attempts == 0
+    assert client.tables[JOBS_TABLE][0]["status"] == RUNNING
+
+
+def test_run_push_job_sends_chunks_and_marks_pushed():
+    job = {**job_row(QUEUED), "card_ids": [1, 2, 3, 4]}
+    # 卡片 3 在建任务之后被改走了状态，不再发送
+    client = push_client(job, [card(1), card(2), card(3, "已审阅"), card(4)])
+    sender = RecordingSender()
+    result = run_push_job(client, 1, sender, render, cards_per_mail=2)
+    assert result["status"] == DONE and result["error"] is None
+    assert sender.mails == [(["a@example.com"], [1, 2]), (["a@example.com"], [4])]
+    assert result["sent_ids"] == [1, 2, 4] and result["updated_ids"] == [1, 2, 4]
+    assert statuses(client) == {1: PUSHED_STATUS, 2: PUSHED_STATUS, 3: "已审阅", 4: PUSHED_STATUS}
+    assert delivered(client) == [("a@example.com", 1), ("a@example.com", 2), ("a@example.com", 4)]
+
+
+def test_sent_ids_are_saved_before_cards_are_marked_pushed():
+    client = push_client(job_row(QUEUED), [card(1), card(2)])
+    run_push_job(client, 1, RecordingSender(), render, cards_per_mail=1)
+    steps = []
+    for table, op, payload in client.writes:
+        if table == JOBS_TABLE and op == "update":
+            steps += [key for key in ("sent_ids", "updated_ids") if key in payload]
+        elif table == DELIVERIES_TABLE:
+            steps.append("deliveries")
+        elif table == "daily_cards":
+            steps.append("status")
+    # 每块：先记 sent_ids（重跑时不会重发），再记投递、改状态，最后记 updated_ids
+    assert steps == ["sent_ids", "deliveries", "status", "updated_ids"] * 2
+
+
+def test_failed_send_keeps_progress_and_resume_skips_sent_cards():
+    client = push_client({**job_row(QUEUED), "card_ids": [1, 2, 3]}, [card(1), card(2), card(3)])
+    result = run_push_job(client, 1, RecordingSender(fail_on={2}), render, cards_per_mail=1)
+    assert result["status"] == FAILED and "OSError" in result["error"]
+    assert result["sent_ids"] == [1]
+    assert statuses(client) == {1: PUSHED_STATUS, 2: "待推送", 3: "待推送"}
+
+    sender = RecordingSender()
+    result = run_push_job(client, 1, sender, render, cards_per_mail=1)
+    assert result["status"] == DONE
+    assert [ids for _, ids in sender.mails] == [[2], [3]]
+    assert result["sent_ids"] == [1, 2, 3]
+
+
+def test_resume_only_marks_cards_sent_before_the_crash():
+    # 上次发出了卡片 1，但进程在改状态之前退出
+    job = {**job_row(RUNNING, _now(-LEASE_SECONDS - 60)), "sent_ids": [1], "updated_ids": []}
+    client = push_client(job, [card(1), card(2)])
+    sender = RecordingSender()
+    result = run_push_job(client, 1, sender, render)
+    assert result["status"] == DONE
+    assert sender.mails == [(["a@example.com"], [2])]
+    assert statuses(client) == {1: PUSHED_STATUS, 2: PUSHED_STATUS}
+    assert result["updated_ids"] == [1, 2]
+
+
+def test_incremental_job_skips_cards_already_delivered():
+    job = {**job_row(QUEUED), "mode": INCREMENTAL_MODE, "card_ids": [1, 2, 3, 4]}
+    deliveries = [
+        {"id": 100, "table_name": "daily_cards", "recipient": "a@example.com", "card_id": 1},
+        {"id": 101, "table_name": "daily_cards", "recipient": ALL_RECIPIENTS, "card_id": 2},
+        {"id": 102, "table_name": "daily_cards", "recipient": "b@example.com", "card_id": 3},
+    ]
+    client = push_client(job, [card(1), card(2), card(3, PUSHED_STATUS), card(4)], deliveries)
+    sender = RecordingSender()
+    result = run_push_job(client, 1, sender, render)
+    assert result["status"] == DONE
+    # 卡片 3 已推送给别人，增量任务照样发给 a；状态只流转仍是 from_status 的卡片
+    assert sender.mails == [(["a@example.com"], [3, 4])]
+    assert result["updated_ids"] == [4]
+    assert ("a@example.com", 3) in delivered(client) and ("a@example.com", 4) in delivered(client)
+
+
+def test_heartbeat_refreshes_lease_while_sending(monkeypatch):
+    monkeypatch.setattr(jobs, "HEARTBEAT_SECONDS", 0.01)
+    client = push_client(job_row(QUEUED), [card(1)])
+    seen = []
+
+    def slow_send():
+        before = client.tables[JOBS_TABLE][0]["updated_at"]
+        time.sleep(0.1)
+        seen.append((before, client.tables[JOBS_TABLE][0]["updated_at"]))
+
+    run_push_job(client, 1, RecordingSender(on_send=slow_send), render)
+    before, after = seen[0]
+    assert after > before
+    finished = client.tables[JOBS_TABLE][0]["updated_at"]
+    time.sleep(0.05)
+    # 任务结束后心跳线程退出
+    assert client.tables[JOBS_TABLE][0]["updated_at"] == finished
+    assert not any(thread.name == "push-job-1-heartbeat" for thread in threading.enumerate())
@@ -0,0 +1,145 @@
+import email
+import email.policy
+import smtplib
+import socketserver
+import threading
+
+import pytest
+
+import pebbling.mailer as mailer
+from pebbling.mailer import SmtpSender, build_message, send_cards
+
+
+class SmtpSink(socketserver.ThreadingTCPServer):
+    """本地 SMTP 替身：不要求登录，收下的邮件存在 messages 里。
+
+    data_replies 里预先放的应答码会依次用来回应 DATA 结束（例如 451 模拟服务器暂时繁忙），
+    用完之后一律回 250。
+    """
+
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self):
+        super().__init__(("127.0.0.1", 0), SmtpHandler)
+        self.messages = []
+        self.connections = 0
+        self.data_replies = []
+        self.lock = threading.Lock()
+
+    @property
+    def port(self):
+        return self.server_address[1]
+
+
+class SmtpHandler(socketserver.StreamRequestHandler):
+    def reply(self, line):
+        self.wfile.write(line.encode("ascii") + b"\r\n")
+
+    def handle(self):
+        server = self.server
+        with server.lock:
+            server.connections += 1
+        self.reply("220 localhost sink")
+        recipients = []
+        while True:
+            line = self.rfile.readline()
+            if not line:
+                return
+            command = line.decode("ascii", "replace").strip().upper()
+            if command.startswith("EHLO"):
+                self.reply("250-localhost")
+                self.reply("250 8BITMIME")
+            elif command.startswith("RCPT"):
+                recipients.append(command)
+                self.reply("250 OK")
+            elif command == "DATA":
+                self.reply("354 End data with <CR><LF>.<CR><LF>")
+                data = b""
+                while not data.endswith(b"\r\n.\r\n"):
+                    chunk = self.rfile.readline()
+                    if not chunk:
+                        return
+                    data += chunk
+                with server.lock:
+                    code = server.data_replies.pop(0) if server.data_replies else 250
+                    if code == 250:
+                        server.messages.append((recipients, data))
+                self.reply(f"{code} {'OK' if code == 250 else 'try again later'}")
+                recipients = []
+            elif command == "QUIT":
+                self.reply("221 Bye")
+                return
+            else:  # HELO / MAIL / NOOP / RSET
+                self.reply("250 OK")
+
+
+@pytest.fixture
+def sink():
+    server = SmtpSink()
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def sleeps(monkeypatch):
+    calls = []
+    monkeypatch.setattr(mailer.time, "sleep", calls.append)
+    return calls
+
+
+def make_sender(sink, retries=3):
+    return SmtpSender("me@example.com", "", host="127.0.0.1", port=sink.port, use_ssl=False,
+                      timeout=5, retries=retries, backoff_seconds=0.5)
+
+
+def render(cards, heading):
+    return "\n".join(cards), None
+
+
+def test_batched_mails_reuse_one_connection(sink, sleeps):
+    sender = make_sender(sink)
+    cards = [f"card {n}" for n in range(5)]
+    progress = []
+    sent, error = send_cards(sender, ["a@example.com", "b@example.com"], "推送", cards, render,
+                             cards_per_mail=2, progress=lambda done, total: progress.append(done))
+    sender.close()
+    assert error is None and sent == cards
+    assert len(sink.messages) == 3
+    subject = email.message_from_bytes(sink.messages[-1][1], policy=email.policy.default)["Subject"]
+    assert subject == "推送 (3/3)"
+    assert progress == [2, 4, 5]
+    assert sink.connections == 1 and sender.connects == 1
+    assert sleeps == []
+
+
+def test_transient_errors_are_retried_with_backoff(sink, sleeps):
+    sink.data_replies = [451, 451]
+    sender = make_sender(sink)
+    sender.send(build_message(sender.sender, ["a@example.com"], "s", "body"), ["a@example.com"])
+    sender.close()
+    assert len(sink.messages) == 1
+    assert sleeps == [0.5, 1.0]
+    # 每次临时性错误后断开重连
+    assert sender.connects == 3
+
+
+def test_retries_exhausted_raises(sink, sleeps):
+    sink.data_replies = [451, 451]
+    sender = make_sender(sink, retries=1)
+    with pytest.raises(smtplib.SMTPDataError):
+        sender.send(build_message(sender.sender, ["a@example.com"], "s", "body"), ["a@example.com"])
+    assert sleeps == [0.5]
+    assert sink.messages == []
+
+
+def test_permanent_errors_are_not_retried(sink, sleeps):
+    sink.data_replies = [550]
+    sender = make_sender(sink)
+    sent, error = send_cards(sender, ["a@example.com"], "推送", ["card"], render)
+    sender.close()
+    assert sent == [] and isinstance(error, smtplib.SMTPDataError) and error.smtp_code == 550
+    assert sleeps == []
@@ -0,0 +1,54 @@
+from fake_supabase import FakeClient
+
+from pebbling.mirror import CardMirror
+
+
+def card(card_id, title, updated_at, status="未审阅"):
+    return {"id": card_id, "title": title, "status": status, "data": {}, "updated_at": updated_at}
+
+
+def local(mirror, card_id):
+    rows = mirror.rows("daily_cards", [card_id])
+    return rows[0] if rows else None
+
+
+def synced(tmp_path, cards):
+    client = FakeClient({"daily_cards": cards})
+    mirror = CardMirror(tmp_path / "mirror.sqlite3", ["daily_cards"])
+    mirror.sync(client, "daily_cards")
+    return client, mirror
+
+
+def test_sync_pulls_rows_changed_after_the_watermark(tmp_path):
+    client, mirror = synced(tmp_path, [card(1, "ox", "2026-10-17T08:00:00"), card(2, "yak", "2026-10-17T09:00:00")])
+    client.tables["daily_cards"][0].update(title="oxen", updated_at="2026-10-17T10:00:00")
+    client.tables["daily_cards"].append(card(3, "gnu", "2026-10-17T10:00:00"))
+    assert mirror.sync(client, "daily_cards") == 2
+    assert local(mirror, 1)["title"] == "oxen" and local(mirror, 3)["title"] == "gnu"
+
+
+def test_reconcile_repairs_content_edits_the_watermark_missed(tmp_path):
+    client, mirror = synced(tmp_path, [card(1, "ox", "2026-10-17T08:00:00"), card(2, "yak", "2026-10-17T09:00:00")])
+    # 并发事务在水位之前取了 updated_at、之后才提交：增量同步看不到，状态也没变
+    client.tables["daily_cards"][0].update(title="oxen", updated_at="2026-10-17T08:30:00")
+    assert mirror.sync(client, "daily_cards") == 0
+    assert local(mirror, 1)["title"] == "ox"
+    assert mirror.reconcile(client, "daily_cards") == 1
+    assert local(mirror, 1)["title"] == "oxen"
+    assert mirror.reconcile(client, "daily_cards") == 0
+
+
+def test_reconcile_refetches_rows_synced_before_updated_at_existed(tmp_path):
+    client, mirror = synced(tmp_path, [{"id": 1, "title": "ox", "status": "未审阅", "data": {}}])
+    # 迁移前改了标题，迁移给所有行补上同一个 updated_at；增量同步只会拉 id 更大的新行
+    client.tables["daily_cards"][0].update(title="oxen", updated_at="2026-10-17T08:00:00")
+    assert mirror.sync(client, "daily_cards") == 0
+    mirror.reconcile(client, "daily_cards")
+    assert local(mirror, 1)["title"] == "oxen"
+
+
+def test_reconcile_drops_rows_deleted_on_the_server(tmp_path):
+    client, mirror = synced(tmp_path, [card(1, "ox", "2026-10-17T08:00:00"), card(2, "yak", "2026-10-17T09:00:00")])
+    del client.tables["daily_cards"][0]
+    mirror.reconcile(client, "daily_cards")
+    assert local(mirror, 1) is None and local(mirror, 2)["title"] == "yak"
@@ -0,0 +1,50 @@
+from fake_supabase import FakeClient
+
+from pebbling.paging import fetch_card_range, fetch_card_window, iter_card_pages, iter_cards, locate_card
+
+
+def cards_client(n=7):
+    statuses = ["未审阅", "已审阅"]
+    return FakeClient({"daily_cards": [{"id": i, "title": f"word{i}", "status": statuses[i % 2]}
+                                       for i in range(1, n + 1)]})
+
+
+def test_iter_cards_walks_every_page_by_id_desc():
+    client = cards_client(7)
+    pages = list(iter_card_pages(client, "daily_cards", page_size=3, columns="id"))
+    assert [[row["id"] for row in page] for page in pages] == [[7, 6, 5], [4, 3, 2], [1]]
+
+
+def test_iter_cards_stops_after_exactly_full_last_page():
+    client = cards_client(6)
+    # 最后一页正好满页时，还要再查一次空页才知道到了末尾
+    pages = list(iter_card_pages(client, "daily_cards", page_size=3, columns="id"))
+    assert [[row["id"] for row in page] for page in pages] == [[6, 5, 4], [3, 2, 1]]
+
+
+def test_iter_cards_filters_status_server_side():
+    client = cards_client(7)
+    rows = list(iter_cards(client, "daily_cards", page_size=2, columns="id,status", status="已审阅"))
+    assert [row["id"] for row in rows] == [7, 5, 3, 1]
+    assert rows[0] == {"id": 7, "status": "已审阅"}
+
+
+def test_fetch_card_window_reports_has_more():
+    client = cards_client(7)
+    rows, has_more = fetch_card_window(client, "daily_cards", limit=5, page_size=2)
+    assert [row["id"] for row in rows] == [7, 6, 5, 4, 3]
+    assert has_more
+    rows, has_more = fetch_card_window(client, "daily_cards", limit=7, page_size=2)
+    assert len(rows) == 7
+    assert not has_more
+
+
+def test_fetch_card_range_and_locate_card_agree():
+    client = cards_client(7)
+    rows, total = fetch_card_range(client, "daily_cards", offset=2, limit=2, columns="id")
+    assert rows == [{"id": 5}, {"id": 4}]
+    assert total == 7
+    assert locate_card(client, "daily_cards", 5) == 2
+    assert locate_card(client, "daily_cards", 4, status="已审阅") is None
+    assert locate_card(client, "daily_cards", 3, status="已审阅") == 2
+    assert locate_card(client, "daily_cards", 99) is None
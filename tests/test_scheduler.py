@@ -0,0 +1,51 @@
+import datetime
+
+import pytest
+
+from fake_supabase import FakeClient
+
+import pebbling.scheduler as scheduler
+from pebbling.jobs import JOBS_TABLE, LEASE_SECONDS, RUNNING, FAILED, _now
+
+SCHEDULE = {"name": "daily-morning", "table": "daily_cards", "from_status": "待推送",
+            "at": datetime.time(8), "recipients": ["a@example.com"]}
+
+
+def client_with_job(updated_at):
+    return FakeClient({JOBS_TABLE: [{
+        "id": 1, "table_name": "daily_cards", "from_status": "待推送", "status": RUNNING,
+        "card_ids": [1], "recipients": ["a@example.com"], "updated_at": updated_at,
+    }]})
+
+
+def test_skips_while_another_process_holds_the_lease():
+    client = client_with_job(_now())
+    logs = []
+    assert scheduler.run_scheduled_job(client, {}, SCHEDULE, datetime.date(2026, 10, 18), logs.append) is None
+    assert client.tables[JOBS_TABLE][0]["status"] == RUNNING
+    assert "#1 正在执行" in logs[0]
+
+
+def test_stale_job_is_failed_instead_of_blocking(monkeypatch):
+    client = client_with_job(_now(-LEASE_SECONDS - 60))
+    monkeypatch.setattr(scheduler, "claim_run", lambda *args: False)
+    logs = []
+    scheduler.run_scheduled_job(client, {}, SCHEDULE, datetime.date(2026, 10, 18), logs.append)
+    job = client.tables[JOBS_TABLE][0]
+    assert job["status"] == FAILED and "没有心跳" in job["error"]
+    assert "已标记为失败" in logs[0]
+
+
+def test_run_lock_released_when_creating_the_push_job_fails(monkeypatch):
+    client = FakeClient({"daily_cards": [{"id": 1, "status": "待推送"}]})
+
+    def broken(*args):
+        raise RuntimeError("Supabase 创建推送任务失败")
+
+    monkeypatch.setattr(scheduler, "create_push_job", broken)
+    run_date = datetime.date(2026, 10, 18)
+    with pytest.raises(RuntimeError):
+        scheduler.run_scheduled_job(client, {}, SCHEDULE, run_date, print)
+    # 锁已删掉，下次醒来可以重新认领，而不是读到空的 push_job_id 就此放弃
+    assert client.tables[scheduler.RUNS_TABLE] == []
+    assert scheduler.claim_run(client, SCHEDULE["name"], run_date)
@@ -0,0 +1,175 @@
+import datetime
+from pathlib import Path
+
+import pytest
+import requests
+
+from pebbling.scraper import PageFetcher, fetch_word_of_the_day, parse_word_of_the_day, word_url
+from pebbling.sources import SOURCES, DictionaryCom, Wordsmith, WordSource, collect_words
+
+FIXTURES = Path(__file__).parent / "fixtures"
+
+
+def fixture(name):
+    return (FIXTURES / name).read_text(encoding="utf-8")
+
+
+class FakeResponse:
+    def __init__(self, status_code=200, text="", headers=None, url=""):
+        self.status_code = status_code
+        self.text = text
+        self.headers = headers or {}
+        self.url = url
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise requests.HTTPError(f"{self.status_code} Error", response=self)
+
+
+class FakeSession:
+    """按 URL 返回预设响应，记下每次请求带的请求头。"""
+
+    def __init__(self, responses):
+        self.headers = {}
+        self.responses = responses
+        self.requests = []
+
+    def get(self, url, headers=None, timeout=None):
+        self.requests.append((url, headers or {}))
+        return self.responses[url]
+
+
+def test_parse_word_of_the_day():
+    word = parse_word_of_the_day(fixture("merriam_webster_2026-10-16.html"), "https://example.com/wod")
+    assert word == {
+        "title": "lagniappe",
+        "phonetic": "LAN-yap",
+        "definition": "Lagniappe is a small gift given to a customer by a merchant at the time of a purchase.",
+        "example": "The baker tossed in an extra roll as lagniappe.",
+        "source": "https://example.com/wod",
+    }
+
+
+def test_parse_word_of_the_day_falls_back_to_page_title():
+    html = "<html><head><title>Word of the Day: Quixotic | Merriam-Webster</title></head><body></body></html>"
+    word = parse_word_of_the_day(html)
+    assert word["title"] == "Quixotic"
+    assert word["phonetic"] == word["definition"] == word["example"] == ""
+
+
+def test_parse_word_of_the_day_missing_elements():
+    word = parse_word_of_the_day("<html><body><p>// only a stray example</p></body></html>")
+    # 没有释义容器时才扫描全页找例句
+    assert word["title"] == "" and word["definition"] == ""
+    assert word["example"] == "only a stray example"
+
+
+def test_parse_wordsmith():
+    word = Wordsmith().parse(fixture("wordsmith_today.html"), "https://wordsmith.org/words/today.html")
+    assert word["title"] == "quotidian"
+    assert word["phonetic"] == "kwo-TID-ee-uhn"
+    assert word["definition"] == "adjective: 1. Occurring every day. 2. Commonplace; ordinary."
+    assert word["example"] == '"The quotidian commute had its own small pleasures."'
+
+
+def test_parse_wordsmith_without_sections_uses_meta_description():
+    html = ('<html><head><meta property="og:title" content="A.Word.A.Day -- quotidian">'
+            '<meta property="og:description" content="Occurring every day."></head><body></body></html>')
+    word = Wordsmith().parse(html, "u")
+    assert word["title"] == "quotidian"
+    assert word["definition"] == "Occurring every day."
+    assert word["phonetic"] == word["example"] == ""
+
+
+def test_parse_dictionary_com():
+    word = DictionaryCom().parse(fixture("dictionary_com_today.html"), "u")
+    assert word["title"] == "serendipity"
+    assert word["phonetic"] == "[ ser-uhn-dip-i-tee ]"
+    assert word["definition"] == "an aptitude for making desirable discoveries by accident."
+    assert word["example"].startswith("By pure serendipity")
+
+
+def test_parse_dictionary_com_falls_back_to_meta():
+    html = ('<html><head><meta property="og:title" content="Word of the Day - serendipity | Dictionary.com">'
+            '<meta property="og:description" content="a happy accident."></head><body></body></html>')
+    word = DictionaryCom().parse(html, "u")
+    assert word["title"] == "serendipity"
+    assert word["definition"] == "a happy accident."
+
+
+def test_incomplete_source_fails_when_instantiated():
+    class NoParser(WordSource):
+        name = "no_parser"
+
+        def url(self, date):
+            return "https://example.com/"
+
+    with pytest.raises(TypeError):
+        NoParser()
+
+
+def test_fetch_html_raises_on_http_error(tmp_path):
+    session = FakeSession({"https://example.com/a": FakeResponse(503)})
+    fetcher = PageFetcher(tmp_path, rate_per_second=0, session=session)
+    with pytest.raises(requests.HTTPError):
+        fetcher.fetch_html("https://example.com/a", "example/a")
+    assert not (tmp_path / "example" / "a.html").exists()
+
+
+def test_fetch_html_revalidates_cache_with_etag(tmp_path):
+    url = "https://example.com/a"
+    session = FakeSession({url: FakeResponse(200, "<html>v1</html>", {"ETag": '"v1"'}, url)})
+    fetcher = PageFetcher(tmp_path, rate_per_second=0, session=session)
+    assert fetcher.fetch_html(url, "example/a") == "<html>v1</html>"
+    session.responses[url] = FakeResponse(304)
+    assert fetcher.fetch_html(url, "example/a") == "<html>v1</html>"
+    assert session.requests[-1][1]["If-None-Match"] == '"v1"'
+    assert fetcher.not_modified == 1
+
+
+def test_collect_words_reports_errors_and_empty_pages(tmp_path):
+    today = datetime.date.today()
+    session = FakeSession({
+        Wordsmith().url(today): FakeResponse(200, fixture("wordsmith_today.html")),
+        DictionaryCom().url(today): FakeResponse(200, "<html><body>maintenance</body></html>"),
+    })
+    fetcher = PageFetcher(tmp_path, rate_per_second=0, session=session)
+    cards, errors = collect_words(fetcher, [SOURCES["wordsmith"], SOURCES["dictionary_com"]], [today])
+    assert [card["title"] for card in cards] == ["quotidian"]
+    assert cards[0]["data"]["释义"].startswith("adjective")
+    assert [(name, str(error)) for name, _, error in errors] == [("dictionary_com", "页面中没有找到词条")]
+
+
+def test_collect_words_keeps_going_after_fetch_failure(tmp_path):
+    today = datetime.date.today()
+    session = FakeSession({
+        Wordsmith().url(today): FakeResponse(500),
+        DictionaryCom().url(today): FakeResponse(200, fixture("dictionary_com_today.html")),
+    })
+    fetcher = PageFetcher(tmp_path, rate_per_second=0, session=session)
+    cards, errors = collect_words(fetcher, [SOURCES["wordsmith"], SOURCES["dictionary_com"]], [today])
+    assert [card["title"] for card in cards] == ["serendipity"]
+    assert errors[0][0] == "wordsmith" and isinstance(errors[0][2], requests.HTTPError)
+
+
+def test_fetch_word_of_the_day_uses_dated_page(tmp_path):
+    date = datetime.date(2026, 10, 16)
+    url = word_url(date)
+    session = FakeSession({url: FakeResponse(200, fixture("merriam_webster_2026-10-16.html"), url=url)})
+    fetcher = PageFetcher(tmp_path, rate_per_second=0, session=session)
+    assert SOURCES["merriam_webster"].fetch(fetcher, date)["title"] == "lagniappe"
+    assert session.requests[0][0] == url
+    # 往日页面按日期永久缓存，不再请求
+    assert fetch_word_of_the_day(fetcher, date)["title"] == "lagniappe"
+    assert len(session.requests) == 1
+
+
+def test_fetch_word_of_the_day_rejects_page_for_another_date(tmp_path):
+    date = datetime.date(2026, 10, 17)
+    url = word_url(date)
+    # 站点还没发布这一天，返回的是前一天的词
+    session = FakeSession({url: FakeResponse(200, fixture("merriam_webster_2026-10-16.html"), url=url)})
+    fetcher = PageFetcher(tmp_path, rate_per_second=0, session=session)
+    with pytest.raises(ValueError):
+        fetch_word_of_the_day(fetcher, date)
+    assert not (tmp_path / "merriam_webster" / "2026-10-17.html").exists()
@@ -0,0 +1,172 @@
+import pytest
+from fake_supabase import FakeClient
+
+from pebbling.cards import SEARCH_RPC, CardRepository, search_cards
+from pebbling.mirror import CardMirror
+from pebbling.search import CardSearchIndex, index_terms, query_terms
+
+DAILY_CARDS = [
+    {"id": 1, "title": "serendipity", "status": "未审阅",
+     "data": {"释义": "意外发现珍奇事物的本领", "例句": "It was pure serendipity."}},
+    {"id": 2, "title": "lagniappe", "status": "待推送",
+     "data": {"释义": "商家额外赠送的小礼物", "例句": "a serendipity of sorts"}},
+    {"id": 3, "title": "ox", "status": "未审阅", "data": {"释义": "牛", "例句": "The ox is strong."}},
+    {"id": 4, "title": "100% sure", "status": "未审阅", "data": {"释义": "百分之百", "例句": "snake_case"}},
+]
+
+
+@pytest.fixture(params=[True, False], ids=["fts5", "memory"])
+def mirror(request, tmp_path):
+    mirror = CardMirror(tmp_path / "mirror.sqlite3", ["daily_cards", "tiqiao_cards"])
+    if request.param and not mirror.fts:
+        pytest.skip("SQLite 没有编译 FTS5")
+    mirror.fts = request.param
+    mirror.upsert_rows("daily_cards", DAILY_CARDS)
+    return mirror
+
+
+def ids(result):
+    rows, _ = result
+    return [row["id"] for row in rows]
+
+
+def test_long_term_ranks_title_above_example(mirror):
+    rows, total = mirror.search("daily_cards", "Serendipity")
+    assert total == 2
+    assert [row["id"] for row in rows] == [1, 2]
+
+
+@pytest.mark.parametrize("query, expected", [
+    ("ox", [3]),              # 不足 3 个字符的英文
+    ("牛", [3]),              # 单个中文字符
+    ("礼物", [2]),            # 两个中文字符
+    ("意外发现", [1]),        # 超过 trigram 长度的中文
+    ("珍奇 本领", [1]),       # 多个词之间是“与”
+    ("意外 礼物", []),
+])
+def test_short_and_cjk_queries(mirror, query, expected):
+    assert sorted(ids(mirror.search("daily_cards", query))) == expected
+
+
+def test_like_wildcards_match_literally(mirror):
+    # 进程内索引只收字母、数字和中文，标点检索不到
+    expected = [4] if mirror.fts else []
+    assert ids(mirror.search("daily_cards", "%")) == expected
+    assert ids(mirror.search("daily_cards", "_")) == expected
+
+
+def test_status_filter_and_paging(mirror):
+    assert ids(mirror.search("daily_cards", "serendipity", status="待推送")) == [2]
+    rows, total = mirror.search("daily_cards", "serendipity", limit=1, offset=1)
+    assert len(rows) == 1 and total == 2
+    assert mirror.search("daily_cards", "   ") == ([], 0)
+
+
+def test_index_follows_updates_and_deletes(mirror):
+    mirror.upsert_rows("daily_cards", [{**DAILY_CARDS[2], "title": "quokka"}])
+    assert ids(mirror.search("daily_cards", "quokka")) == [3]
+    assert ids(mirror.search("daily_cards", "ox")) == [3]  # 例句里还有 ox
+    mirror.delete_ids("daily_cards", [3])
+    assert ids(mirror.search("daily_cards", "quokka")) == []
+    assert ids(mirror.search("daily_cards", "牛")) == []
+
+
+def test_memory_index_built_once_from_local_rows(tmp_path):
+    mirror = CardMirror(tmp_path / "mirror.sqlite3", ["daily_cards"])
+    mirror.fts = False
+    mirror.upsert_rows("daily_cards", DAILY_CARDS)
+    index = mirror.search_index("daily_cards")
+    assert len(index) == 4
+    assert mirror.search_index("daily_cards") is index
+    mirror.upsert_rows("daily_cards", [{"id": 5, "title": "quokka", "status": "未审阅", "data": {}}])
+    assert len(index) == 5 and ids(mirror.search("daily_cards", "quok")) == [5]
+
+
+def test_index_terms_split_words_and_cjk_bigrams():
+    assert index_terms("Make sense 意外发现") == ["make", "sense", "意", "外", "发", "现", "意外", "外发", "发现"]
+    assert query_terms("Mak 意外发现 牛") == [
+        ("mak", True), ("意外", False), ("外发", False), ("发现", False), ("牛", False),
+    ]
+
+
+def test_card_search_index_prefix_and_and():
+    index = CardSearchIndex("daily_cards")
+    index.build(DAILY_CARDS)
+    assert index.search("seren") == [1, 2]
+    assert index.search("seren 礼物") == [2]
+    assert index.search("外发") == [1]
+    assert index.search("发外") == []
+    assert index.search("!!") == []
+    assert index.search("serendipity", limit=1) == [1]
+
+
+def test_card_search_index_add_replaces_and_remove():
+    index = CardSearchIndex("daily_cards")
+    index.build(DAILY_CARDS)
+    index.add([{**DAILY_CARDS[0], "title": "quokka"}])
+    assert index.search("quokka") == [1]
+    # 旧标题的词已经撤下，例句里的还在
+    assert index.search("serendipity") == [2, 1]
+    index.remove([1, 2])
+    assert index.search("serendipity") == [] and len(index) == 2
+
+
+def test_card_search_index_ensure_rebuilds_only_when_stale():
+    loads = []
+
+    def load():
+        loads.append(1)
+        return DAILY_CARDS
+
+    index = CardSearchIndex("daily_cards")
+    index.ensure(load)
+    index.ensure(load)
+    assert len(loads) == 1
+    index.mark_stale()
+    index.ensure(load)
+    assert len(loads) == 2 and len(index) == 4
+
+
+def test_fts_index_rebuilt_when_out_of_sync(tmp_path):
+    path = tmp_path / "mirror.sqlite3"
+    mirror = CardMirror(path, ["daily_cards"])
+    if not mirror.fts:
+        pytest.skip("SQLite 没有编译 FTS5")
+    mirror.upsert_rows("daily_cards", DAILY_CARDS)
+    with mirror._conn:
+        mirror._conn.execute("delete from daily_cards_fts")
+    reopened = CardMirror(path, ["daily_cards"])
+    assert ids(reopened.search("daily_cards", "lagniappe")) == [2]
+
+
+def rpc_client(rows):
+    def search(p_table, p_query, p_statuses, p_limit, p_offset):
+        matched = [row for row in rows if p_statuses is None or row["card"]["status"] in p_statuses]
+        page = matched[p_offset:] if p_limit is None else matched[p_offset:p_offset + p_limit]
+        return [{**row, "total": len(matched)} for row in page]
+    return FakeClient(rpcs={SEARCH_RPC: search})
+
+
+RPC_ROWS = [{"id": card["id"], "rank": 1.0, "card": card} for card in DAILY_CARDS[:2]]
+
+
+def test_repository_search_calls_rpc():
+    client = rpc_client(RPC_ROWS)
+    cards, total = CardRepository(client, "daily_cards").search("serendipity", status="待推送", limit=10)
+    assert [card["id"] for card in cards] == [2] and total == 1
+    assert client.rpc_calls == [(SEARCH_RPC, {
+        "p_table": "daily_cards", "p_query": "serendipity", "p_statuses": ["待推送"],
+        "p_limit": 10, "p_offset": 0,
+    })]
+
+
+def test_repository_search_past_last_page_still_reports_total():
+    client = rpc_client(RPC_ROWS)
+    cards, total = search_cards(client, "serendipity", limit=10, offset=20)
+    assert cards == [] and total == 2
+
+
+def test_repository_search_blank_query_skips_rpc():
+    client = rpc_client(RPC_ROWS)
+    assert CardRepository(client, "daily_cards").search("  ") == ([], 0)
+    assert client.rpc_calls == []
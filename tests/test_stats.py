@@ -0,0 +1,52 @@
+import datetime
+
+from fake_supabase import FakeClient
+
+from pebbling.cards import EMPTY_LABEL
+from pebbling.stats import DAILY_VIEW, OTHER_LABEL, PUSH_VIEW, STATUS_VIEW, daily_counts, push_counts, status_counts
+
+TODAY = datetime.date(2026, 10, 17)
+CARDS = [
+    {"id": 1, "status": "未审阅", "date": "2026-10-17"},
+    {"id": 2, "status": "未审阅", "date": "2026-10-17"},
+    {"id": 3, "status": "已推送", "date": "2026-10-15"},
+    {"id": 4, "status": None, "date": "2026-10-15"},
+    {"id": 5, "status": "", "date": "2026-09-01"},
+    {"id": 6, "status": " 已审阅", "date": "2026-10-16"},
+]
+VIEWS = (STATUS_VIEW, DAILY_VIEW, PUSH_VIEW)
+
+
+def test_status_counts_from_view():
+    client = FakeClient({STATUS_VIEW: [
+        {"table_name": "daily_cards", "status": "未审阅", "cards": 2},
+        {"table_name": "daily_cards", "status": None, "cards": 1},
+        {"table_name": "daily_cards", "status": "", "cards": 1},
+        {"table_name": "tiqiao_cards", "status": "未审阅", "cards": 5},
+    ]})
+    assert status_counts(client, "daily_cards") == {"未审阅": 2, EMPTY_LABEL: 2}
+
+
+def test_status_counts_fallback_when_view_missing():
+    client = FakeClient({"daily_cards": CARDS}, missing=VIEWS)
+    assert status_counts(client, "daily_cards") == {"未审阅": 2, "已推送": 1, EMPTY_LABEL: 2, OTHER_LABEL: 1}
+
+
+def test_daily_counts_view_and_fallback_agree():
+    view_client = FakeClient({DAILY_VIEW: [
+        {"table_name": "daily_cards", "day": "2026-10-17", "cards": 2},
+        {"table_name": "daily_cards", "day": "2026-10-15", "cards": 2},
+    ]})
+    expected = {"2026-10-15": 2, "2026-10-16": 1, "2026-10-17": 2}
+    assert daily_counts(FakeClient({"daily_cards": CARDS}, missing=VIEWS), "daily_cards", 3, TODAY) == expected
+    assert daily_counts(view_client, "daily_cards", 3, TODAY) == {**expected, "2026-10-16": 0}
+
+
+def test_push_counts_fallback_counts_deliveries_per_day():
+    client = FakeClient({"card_deliveries": [
+        {"table_name": "daily_cards", "card_id": 1, "sent_at": "2026-10-16T08:00:00+00:00"},
+        {"table_name": "daily_cards", "card_id": 1, "sent_at": "2026-10-16T23:59:59+00:00"},
+        {"table_name": "daily_cards", "card_id": 2, "sent_at": "2026-10-17T00:00:00+00:00"},
+        {"table_name": "tiqiao_cards", "card_id": 3, "sent_at": "2026-10-17T09:00:00+00:00"},
+    ]}, missing=VIEWS)
+    assert push_counts(client, "daily_cards", 2, TODAY) == {"2026-10-16": 2, "2026-10-17": 1}
@@ -0,0 +1,46 @@
+from fake_supabase import FakeClient
+
+import pebbling.status
+from pebbling.status import FAILED, SKIPPED, UPDATED, transition_card_status
+
+
+def status_client():
+    return FakeClient({"daily_cards": [
+        {"id": 1, "status": "未审阅"},
+        {"id": 2, "status": "已审阅"},
+        {"id": 3, "status": "已推送"},
+        {"id": 4, "status": None},
+    ]})
+
+
+def statuses(client):
+    return {row["id"]: row["status"] for row in client.tables["daily_cards"]}
+
+
+def test_only_cards_still_in_from_status_move():
+    client = status_client()
+    results = transition_card_status(client, "daily_cards", [1, 2, 99, 1], "未审阅", "已审阅")
+
+    assert results == {1: (UPDATED, ""), 2: (SKIPPED, "状态已变化或卡片不存在"), 99: (SKIPPED, "状态已变化或卡片不存在")}
+    assert statuses(client) == {1: "已审阅", 2: "已审阅", 3: "已推送", 4: None}
+    # 重复执行不会再改动
+    assert transition_card_status(client, "daily_cards", [1], "未审阅", "已审阅")[1][0] == SKIPPED
+
+
+def test_from_statuses_list_and_one_request_per_chunk(monkeypatch):
+    monkeypatch.setattr(pebbling.status, "ID_CHUNK_SIZE", 2)
+    client = status_client()
+    results = transition_card_status(client, "daily_cards", [1, 2, 3, 4], ["未审阅", "已审阅"], "已推送")
+
+    assert [results[i][0] for i in (1, 2, 3, 4)] == [UPDATED, UPDATED, SKIPPED, SKIPPED]
+    assert statuses(client) == {1: "已推送", 2: "已推送", 3: "已推送", 4: None}
+    assert [op for _, op, _ in client.writes] == ["update", "update"]
+
+
+def test_failed_request_marks_its_chunk():
+    class BrokenClient(FakeClient):
+        def table(self, name):
+            raise ConnectionError("timeout")
+
+    results = transition_card_status(BrokenClient(), "daily_cards", [1, 2], "未审阅", "已审阅")
+    assert results == {1: (FAILED, "ConnectionError - timeout"), 2: (FAILED, "ConnectionError - timeout")}
@@ -0,0 +1,70 @@
+import csv
+import json
+
+from fake_supabase import FakeClient
+
+from pebbling.cards import card_content_hash
+from pebbling.transfer import EXPORT_FIELDS, export_cards, iter_folder_chunks, iter_supabase_chunks, load_folder
+
+
+def daily_card(title, definition, date="2026-10-17"):
+    return {"title": title, "status": "未审阅", "date": date,
+            "data": {"音标": "", "释义": definition, "例句": "", "备注": "", "source": ""}}
+
+
+def write_folder(folder, cards):
+    folder.mkdir()
+    for i, card in enumerate(cards):
+        (folder / f"{i:03d}.json").write_text(json.dumps(card, ensure_ascii=False), encoding="utf-8")
+    return folder
+
+
+def test_export_folder_to_csv_in_chunks(tmp_path):
+    folder = write_folder(tmp_path / "daily", [daily_card(f"word{i}", f"释义{i}") for i in range(5)])
+    progress = []
+    written = export_cards(iter_folder_chunks(folder, chunk_size=2), "daily_cards", tmp_path / "daily.csv",
+                           progress=progress.append)
+
+    assert written == 5
+    assert progress == [2, 4, 5]
+    with open(tmp_path / "daily.csv", newline="", encoding="utf-8") as f:
+        rows = list(csv.DictReader(f))
+    assert list(rows[0]) == EXPORT_FIELDS["daily_cards"]
+    assert [row["title"] for row in rows] == [f"word{i}" for i in range(5)]
+    assert rows[3]["definition"] == "释义3"
+
+
+def test_export_supabase_to_jsonl(tmp_path):
+    client = FakeClient({"tiqiao_cards": [
+        {"id": 1, "orig_cn": "推敲", "orig_en": "deliberate", "meaning": "斟酌", "recommend": "", "qtype": "词",
+         "status": "已审阅", "date": "2026-10-16"},
+        {"id": 2, "orig_cn": "琢磨", "orig_en": "ponder", "meaning": "", "recommend": "", "qtype": "词",
+         "status": "未审阅", "date": "2026-10-17"},
+    ]})
+    assert export_cards(iter_supabase_chunks(client, "tiqiao_cards", 1), "tiqiao_cards", tmp_path / "t.jsonl") == 2
+
+    lines = (tmp_path / "t.jsonl").read_text(encoding="utf-8").splitlines()
+    rows = [json.loads(line) for line in lines]
+    assert [row["orig_cn"] for row in rows] == ["琢磨", "推敲"]
+    assert list(rows[0]) == EXPORT_FIELDS["tiqiao_cards"]
+
+
+def test_load_folder_skips_existing_and_blank_cards(tmp_path):
+    existing = {"id": 10, **daily_card("Serendipity", "旧释义", "2026-01-01")}
+    existing["content_hash"] = card_content_hash("daily_cards", existing)
+    client = FakeClient({"daily_cards": [existing]})
+    folder = write_folder(tmp_path / "daily", [
+        {"id": 1, "content_hash": "x", **daily_card("serendipity ", "意外发现")},
+        daily_card("ephemeral", "短暂的"),
+        daily_card("  ", "没有标题"),
+        daily_card("Ephemeral", "重复"),
+    ])
+
+    assert load_folder(client, "daily_cards", folder, dry_run=True) == (4, 1)
+    assert client.writes == []
+
+    assert load_folder(client, "daily_cards", folder) == (4, 1)
+    inserted = client.writes[0][2]
+    assert [card["title"] for card in inserted] == ["ephemeral"]
+    # 服务端字段不写入
+    assert "id" not in inserted[0] and "content_hash" not in inserted[0]